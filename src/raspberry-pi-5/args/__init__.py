@@ -12,6 +12,9 @@ class Args:
     SERIAL = 'serial'
     IP = 'ip'
     PORT = 'port'
+    MESSAGES = 'messages'
+    RATE = 'rate'
+    PROCESSING_RATE = 'processing_rate'
 
     @classmethod
     def get_attribute_name(cls, attribute: str) -> str:
@@ -92,4 +95,30 @@ class Args:
         Add port argument to the parser.
         """
         parser.add_argument(f"--{cls.PORT}", dest=cls.PORT, type=int, default=default,
-                            help="Set the port for the server")
\ No newline at end of file
+                            help="Set the port for the server")
+
+    @classmethod
+    def add_messages_argument(cls, parser, default: int = 10000) -> None:
+        """
+        Add number of messages argument to the parser.
+        """
+        parser.add_argument(f"--{cls.MESSAGES}", dest=cls.MESSAGES, type=int, default=default,
+                            help="Set the number of messages to send")
+
+    @classmethod
+    def add_rate_argument(cls, parser, default: float = 0.0) -> None:
+        """
+        Add messages rate argument to the parser.
+        """
+        parser.add_argument(f"--{cls.RATE}", dest=cls.RATE, type=float, default=default,
+                            help="Set the messages per second to send, 0 to send them as fast as possible")
+
+    @classmethod
+    def add_processing_rate_argument(cls, parser, default: float = 0.0) -> None:
+        """
+        Add processing rate argument to the parser.
+        """
+        parser.add_argument(f"--{cls.PROCESSING_RATE.replace('_', '-')}", dest=cls.PROCESSING_RATE, type=float,
+                            default=default,
+                            help="Set the messages per second processed by the receiver, 0 to process them as fast as "
+                                 "they arrive")
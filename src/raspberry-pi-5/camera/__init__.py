@@ -1,11 +1,10 @@
 import io
 from multiprocessing import Lock
 from time import sleep
+from typing import Optional
 
-from PIL.Image import Image
-from picamera2 import Picamera2
-from picamera2.encoders import H264Encoder
-from picamera2.outputs import FileOutput
+import numpy as np
+from PIL.Image import Image, fromarray
 
 from log import Logger
 from utils import check_type
@@ -24,6 +23,15 @@ class Camera:
     FORMAT = 'jpeg'
     ADJUST_DURATION = 0.02
 
+    # Streaming settings. Picamera2 names the formats after the little endian pixel word, so BGR888 frames are stored as
+    # R, G, B bytes
+    STREAM_FORMAT = 'BGR888'
+    STREAM_NAME = 'main'
+    STREAM_BUFFER_COUNT = 4
+
+    # Low resolution stream, scaled by the ISP. Only the Raspberry Pi 5 supports RGB formats on it
+    LORES_NAME = 'lores'
+
     def __init__(self, logger: Logger, width=WIDTH, height=HEIGHT, video_config=None):
         """
         Initialize the camera with the specified width, height, and video configuration.
@@ -46,6 +54,9 @@ class Camera:
         # Log
         self.__logger.log("Initializing camera...")
 
+        # Imported here, so the camera package modules that don't use the camera load without Picamera2 installed
+        from picamera2 import Picamera2
+
         # Configure the camera and video settings
         self.__picam2 = Picamera2()
         self.__config = self.__picam2.create_still_configuration(main={"size": (width, height)})
@@ -53,8 +64,12 @@ class Camera:
         self.__video_config = video_config
         self.__started_preview = False
 
+        # Initialize the streaming configuration
+        self.__stream_config = None
+        self.__streaming = False
+
     def record_video(self, width=WIDTH, height=HEIGHT, duration=10, file_path='video.h264',
-                     encoder=H264Encoder()) -> None:
+                     encoder=None) -> None:
         """
         Record a video with the camera.
 
@@ -63,14 +78,24 @@ class Camera:
             height (int): Height of the video.
             duration (int): Duration of the video in seconds.
             file_path (str): Path to save the recorded video file.
-            encoder: Encoder to use for video recording, default is H264Encoder.
+            encoder: Encoder to use for video recording. Default is None (a new H264Encoder).
         """
+        from picamera2.encoders import H264Encoder
+        from picamera2.outputs import FileOutput
+
+        # Create the default encoder
+        if encoder is None:
+            encoder = H264Encoder()
+
         with self.__lock:
             # Stop the camera preview if it is running
             if self.__started_preview:
                 self.__picam2.stop_preview()
                 self.__started_preview = False
 
+            # Stop the camera stream if it is running
+            self.__stop_stream()
+
             # Configure the camera for video recording
             if not self.__video_config:
                 self.__video_config = self.__picam2.create_video_configuration(main={"size": (width, height)},
@@ -168,6 +193,10 @@ class Camera:
         Returns:
             Image: Captured image as a PIL Image.
         """
+        # Wrap the raw frame if the camera is streaming, without encoding it
+        if self.is_streaming():
+            return fromarray(self.capture_array())
+
         # Capture an image stream
         image_stream = self.capture_image_stream(adjust_duration, stop_preview)
 
@@ -175,6 +204,107 @@ class Camera:
         image_stream.seek(0)
         return Image.open(image_stream)
 
+    def start_stream(self, width=WIDTH, height=HEIGHT, buffer_count=STREAM_BUFFER_COUNT,
+                     lores_size: Optional[tuple[int, int]] = None) -> None:
+        """
+        Start the camera in streaming mode, it keeps running and the frames are captured as raw RGB arrays.
+
+        Args:
+            width (int): Width of the frames.
+            height (int): Height of the frames.
+            buffer_count (int): Number of buffers allocated for the stream.
+            lores_size (tuple[int, int]|None): Width and height of the low resolution stream, usually the model input
+                size, or None to disable it.
+        """
+        with self.__lock:
+            # Check if the stream is already started
+            if self.__streaming:
+                return
+
+            # Stop the camera preview if it is running
+            if self.__started_preview:
+                self.__picam2.stop_preview()
+                self.__started_preview = False
+
+            # Configure the camera for streaming. With queue disabled, the captures wait for the next frame instead of
+            # returning one buffered before the request
+            lores = {"size": tuple(lores_size), "format": self.STREAM_FORMAT} if lores_size else None
+            self.__stream_config = self.__picam2.create_video_configuration(
+                main={"size": (width, height), "format": self.STREAM_FORMAT},
+                lores=lores,
+                buffer_count=buffer_count,
+                queue=False
+            )
+            self.__picam2.configure(self.__stream_config)
+
+            # Start the camera
+            self.__picam2.start()
+            self.__streaming = True
+
+        # Log
+        if lores_size:
+            self.__logger.log(f"Camera stream started at {width}x{height} with lores at {lores_size[0]}x{lores_size[1]}.")
+        else:
+            self.__logger.log(f"Camera stream started at {width}x{height}.")
+
+    def __stop_stream(self) -> bool:
+        """
+        Stop the camera stream and restore the still configuration. The lock must be held.
+
+        Returns:
+            bool: True if the stream was running, False otherwise.
+        """
+        if not self.__streaming:
+            return False
+
+        self.__picam2.stop()
+        self.__picam2.configure(self.__config)
+        self.__streaming = False
+        return True
+
+    def stop_stream(self) -> None:
+        """
+        Stop the camera stream.
+        """
+        with self.__lock:
+            stopped = self.__stop_stream()
+
+        # Log
+        if stopped:
+            self.__logger.log("Camera stream stopped.")
+
+    def is_streaming(self) -> bool:
+        """
+        Check if the camera is streaming.
+
+        Returns:
+            bool: True if the camera is streaming, False otherwise.
+        """
+        with self.__lock:
+            return self.__streaming
+
+    def capture_array(self, name=STREAM_NAME) -> np.ndarray:
+        """
+        Capture the next frame of the stream as a raw RGB array.
+
+        Args:
+            name (str): Name of the stream to capture.
+        Returns:
+            np.ndarray: Captured frame with shape (height, width, 3).
+        """
+        with self.__lock:
+            if not self.__streaming:
+                raise RuntimeError("Camera stream is not started.")
+
+            # Copy the frame out of the request and give its buffers back to the camera as soon as possible
+            request = self.__picam2.capture_request()
+            try:
+                frame = request.make_array(name)
+            finally:
+                request.release()
+
+        return frame
+
     def start_preview(self) -> None:
         """
         Start the camera preview.
@@ -208,6 +338,9 @@ class Camera:
         # Stop the camera preview
         self.stop_preview()
 
+        # Stop the camera stream
+        self.stop_stream()
+
         # Stop the camera
         self.__picam2.close()
 
@@ -0,0 +1,276 @@
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from time import monotonic, sleep
+from typing import Optional
+
+import numpy as np
+
+from utils import check_type
+
+
+class FrameRing:
+    """
+    Ring buffer of frames in shared memory, written by a single process and read by any number of processes.
+
+    The shared memory block holds a header followed by the preallocated frame slots. The header keeps the id of the
+    latest complete frame, and for each slot a sequence counter, the frame id and the timestamp. The writer makes the
+    slot counter odd while it writes a frame and even when it's done, and then publishes the frame id, so no lock is
+    needed. Readers get read-only views of the slots, and can check afterward that the slot was not reused while they
+    were reading it. The writer doesn't wait for the readers, so readers that keep a frame for longer than slots - 1
+    newer frames take to be written, such as the object detection pipeline, make one copy of each frame they read.
+    """
+    # Default number of frame slots
+    SLOTS = 4
+
+    # Default frame shape and type
+    SHAPE = (640, 640, 3)
+    DTYPE = np.uint8
+
+    # Header layout: latest frame id, then the sequence counter, frame id and timestamp of each slot
+    HEADER_DTYPE = np.int64
+    HEADER_LATEST_IDX = 0
+    HEADER_SLOT_FIELDS = 3
+
+    # Frame id published before the first frame is written
+    NO_FRAME_ID = -1
+
+    # Time between the checks for a new frame while waiting
+    POLL_INTERVAL = 0.001
+
+    def __init__(self, shape: tuple[int, ...] = SHAPE, dtype=DTYPE, slots: int = SLOTS, name: Optional[str] = None):
+        """
+        Initialize the frame ring, creating the shared memory block or attaching to an existing one.
+
+        Args:
+            shape (tuple[int, ...]): Shape of each frame.
+            dtype: Type of the frame elements.
+            slots (int): Number of frame slots. Readers must be done with a frame before slots - 1 newer frames are
+                written.
+            name (str|None): Name of the shared memory block to attach to, or None to create a new one.
+        """
+        # Check the type of the shape and the number of slots
+        check_type(shape, tuple)
+        check_type(slots, int)
+        if slots < 2:
+            raise ValueError(f"At least 2 slots are required, got {slots}.")
+        self.__shape = shape
+        self.__dtype = np.dtype(dtype)
+        self.__slots = slots
+
+        # Get the size of the header and the frames
+        header_length = 1 + slots * self.HEADER_SLOT_FIELDS
+        header_size = header_length * np.dtype(self.HEADER_DTYPE).itemsize
+        frames_size = slots * int(np.prod(shape)) * self.__dtype.itemsize
+
+        # Create or attach to the shared memory block
+        self.__owner = name is None
+        if self.__owner:
+            self.__shared_memory = SharedMemory(create=True, size=header_size + frames_size)
+        else:
+            check_type(name, str)
+            self.__shared_memory = self.__attach(name)
+
+        # Map the header and the frames
+        buffer = self.__shared_memory.buf
+        self.__header = np.ndarray((header_length,), dtype=self.HEADER_DTYPE, buffer=buffer)
+        slot_fields = self.__header[1:].reshape(slots, self.HEADER_SLOT_FIELDS)
+        self.__sequences = slot_fields[:, 0]
+        self.__frame_ids = slot_fields[:, 1]
+        self.__timestamps = slot_fields[:, 2].view(np.float64)
+        self.__frames = np.ndarray((slots, *shape), dtype=self.__dtype, buffer=buffer, offset=header_size)
+
+        # Initialize the header
+        if self.__owner:
+            self.__header[:] = 0
+            self.__frame_ids[:] = self.NO_FRAME_ID
+            self.__header[self.HEADER_LATEST_IDX] = self.NO_FRAME_ID
+
+        # Initialize the id of the next frame to write
+        self.__next_frame_id = self.get_latest_frame_id() + 1
+
+    @staticmethod
+    def __attach(name: str) -> SharedMemory:
+        """
+        Attach to an existing shared memory block. The block is only tracked by its creator, before Python 3.13 the
+        child processes share its resource tracker, so registering the block again is harmless.
+
+        Args:
+            name (str): Name of the shared memory block.
+
+        Returns:
+            SharedMemory: The attached shared memory block.
+        """
+        if sys.version_info >= (3, 13):
+            return SharedMemory(name=name, track=False)
+
+        return SharedMemory(name=name)
+
+    def __reduce__(self):
+        """
+        Pickle the frame ring as a reference to its shared memory block, so other processes attach to it.
+        """
+        return self.__class__, (self.__shape, self.__dtype.str, self.__slots, self.__shared_memory.name)
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the shared memory block.
+
+        Returns:
+            str: Name of the shared memory block.
+        """
+        return self.__shared_memory.name
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """
+        Get the shape of each frame.
+
+        Returns:
+            tuple[int, ...]: Shape of each frame.
+        """
+        return self.__shape
+
+    @property
+    def slots(self) -> int:
+        """
+        Get the number of frame slots.
+
+        Returns:
+            int: Number of frame slots.
+        """
+        return self.__slots
+
+    def begin_write(self) -> tuple[int, np.ndarray]:
+        """
+        Get the slot for the next frame, so it can be written in place. Only one process can write frames.
+
+        Returns:
+            tuple[int, np.ndarray]: Id of the next frame and a writable view of its slot.
+        """
+        frame_id = self.__next_frame_id
+        slot = frame_id % self.__slots
+
+        # Mark the slot as being written
+        self.__sequences[slot] += 1
+        self.__frame_ids[slot] = frame_id
+
+        return frame_id, self.__frames[slot]
+
+    def end_write(self, frame_id: int, timestamp: Optional[float] = None) -> None:
+        """
+        Publish the frame written in the slot returned by begin_write.
+
+        Args:
+            frame_id (int): Id of the frame returned by begin_write.
+            timestamp (float|None): Capture timestamp of the frame. Default is the current monotonic time.
+        """
+        slot = frame_id % self.__slots
+        self.__timestamps[slot] = monotonic() if timestamp is None else timestamp
+
+        # Mark the slot as complete and publish the frame
+        self.__sequences[slot] += 1
+        self.__header[self.HEADER_LATEST_IDX] = frame_id
+        self.__next_frame_id = frame_id + 1
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        """
+        Copy a frame into the next slot and publish it.
+
+        Args:
+            frame (np.ndarray): Frame to write, with the ring frame shape.
+            timestamp (float|None): Capture timestamp of the frame. Default is the current monotonic time.
+
+        Returns:
+            int: Id of the frame.
+        """
+        frame_id, slot = self.begin_write()
+        np.copyto(slot, frame, casting='unsafe')
+        self.end_write(frame_id, timestamp)
+        return frame_id
+
+    def get_latest_frame_id(self) -> int:
+        """
+        Get the id of the latest complete frame.
+
+        Returns:
+            int: Id of the latest frame, or NO_FRAME_ID if no frame was written.
+        """
+        return int(self.__header[self.HEADER_LATEST_IDX])
+
+    def read_latest(self, last_frame_id: int = NO_FRAME_ID) -> Optional[tuple[int, float, np.ndarray]]:
+        """
+        Get the latest frame if it's newer than the given one, without copying it.
+
+        Args:
+            last_frame_id (int): Id of the last frame read.
+
+        Returns:
+            tuple[int, float, np.ndarray]|None: Id, timestamp and read-only view of the latest frame, or None if there
+            is no newer frame.
+        """
+        frame_id = self.get_latest_frame_id()
+        if frame_id == self.NO_FRAME_ID or frame_id <= last_frame_id:
+            return None
+
+        slot = frame_id % self.__slots
+        timestamp = float(self.__timestamps[slot])
+        frame = self.__frames[slot].view()
+        frame.flags.writeable = False
+
+        # Check that the slot was not reused while reading its header
+        if not self.is_valid(frame_id):
+            return None
+
+        return frame_id, timestamp, frame
+
+    def wait_for_frame(self, last_frame_id: int = NO_FRAME_ID,
+                       timeout: Optional[float] = None) -> Optional[tuple[int, float, np.ndarray]]:
+        """
+        Wait for a frame newer than the given one.
+
+        Args:
+            last_frame_id (int): Id of the last frame read.
+            timeout (float|None): Maximum time to wait in seconds. Default is None (wait indefinitely).
+
+        Returns:
+            tuple[int, float, np.ndarray]|None: Id, timestamp and read-only view of the latest frame, or None if the
+            timeout is reached.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            frame = self.read_latest(last_frame_id)
+            if frame is not None:
+                return frame
+
+            if deadline is not None and monotonic() >= deadline:
+                return None
+            sleep(self.POLL_INTERVAL)
+
+    def is_valid(self, frame_id: int) -> bool:
+        """
+        Check if a frame is still in its slot, that is, it has not been overwritten by a newer one.
+
+        Args:
+            frame_id (int): Id of the frame.
+
+        Returns:
+            bool: True if the frame is complete and still in its slot, False otherwise.
+        """
+        slot = frame_id % self.__slots
+        return int(self.__frame_ids[slot]) == frame_id and int(self.__sequences[slot]) % 2 == 0
+
+    def close(self) -> None:
+        """
+        Detach from the shared memory block, and remove it if this instance created it.
+        """
+        # Release the views before closing the block
+        self.__header = None
+        self.__sequences = None
+        self.__frame_ids = None
+        self.__timestamps = None
+        self.__frames = None
+        self.__shared_memory.close()
+
+        if self.__owner:
+            self.__shared_memory.unlink()
@@ -1,12 +1,14 @@
+from collections import deque
 from multiprocessing import Queue, Event, Lock
 from multiprocessing.synchronize import Event as EventCls
 from typing import Optional, Callable
 
 import numpy as np
-from PIL.Image import Image
+from PIL.Image import Image, fromarray
 
 from camera import Camera
-from model.image_bounding_boxes import ImageBoundingBoxes
+from camera.frame_ring import FrameRing
+from model.frame_detections import FrameDetections
 from server import RealtimeTrackerServer
 from utils import check_type
 from log import Logger
@@ -19,7 +21,9 @@ class ImagesQueue:
     # Logger configuration
     LOG_TAG = "ImagesQueue"
 
-    def __init__(self, stop_event: EventCls, logger: Logger, camera: Camera, server: Optional[RealtimeTrackerServer]=None):
+    def __init__(self, stop_event: EventCls, logger: Logger, camera: Camera, server: Optional[RealtimeTrackerServer]=None,
+                 input_size: Optional[tuple[int, int]] = None, frame_ring: Optional[FrameRing] = None,
+                 mailbox_size: Optional[int] = None):
         """
         Initialize the images queue.
 
@@ -28,6 +32,14 @@ class ImagesQueue:
             logger (Logger): Logger instance for logging messages.
             camera (Camera): Camera instance for capturing images.
             server (RealtimeTrackerServer|None): Server instance for real-time tracking updates.
+            input_size (tuple[int, int]|None): Width and height of the model input. If set, the images are captured from
+                the camera low resolution stream at this size, so they don't need to be resized.
+            frame_ring (FrameRing|None): Shared memory ring where the captured frames are written instead of being put
+                in the input images queue, so they aren't pickled to other processes, which make one copy of each frame
+                they read.
+            mailbox_size (int|None): If set, the input images queue keeps only the latest images up to this number, and
+                the older ones are dropped so the inference always runs on the freshest images. Default is None
+                (unbounded queue).
         """
         # Initialize the lock
         self.__lock = Lock()
@@ -45,6 +57,27 @@ class ImagesQueue:
             check_type(server, RealtimeTrackerServer)
         self.__server = server
 
+        # Check the type of the input size
+        if input_size:
+            check_type(input_size, tuple)
+        self.__input_size = input_size
+
+        # Check the type of the frame ring
+        if frame_ring:
+            check_type(frame_ring, FrameRing)
+        self.__frame_ring = frame_ring
+
+        # Check the type of the mailbox size
+        if mailbox_size is not None:
+            check_type(mailbox_size, int)
+            if mailbox_size <= 0:
+                raise ValueError(f"Mailbox size must be positive, got {mailbox_size}.")
+        self.__mailbox_size = mailbox_size
+
+        # Initialize the image counters
+        self.__imager_counter = 0
+        self.__dropped_images = 0
+
         # Check the type of logger
         check_type(logger, Logger)
 
@@ -71,100 +104,171 @@ class ImagesQueue:
         # Check the type of the image
         check_type(image, Image)
 
+        dropped = False
         with self.__lock:
-            # Put image in input images queue
-            self.__input_images_queue.put(image)
+            # The image counter is the frame id of the image
+            counter = self.__imager_counter
+            self.__imager_counter += 1
+
+            # Put image in input images queue, in mailbox mode the oldest image is dropped if it's full
+            if self.__mailbox_size:
+                dropped = len(self.__input_images_queue) == self.__mailbox_size
+                if dropped:
+                    self.__dropped_images += 1
+                self.__input_images_queue.append((counter, image))
+            else:
+                self.__input_images_queue.put((counter, image))
 
             # Set the pending input image event
             self.__pending_input_image_event.set()
 
-            # Increment the image counter
-            counter = self.__imager_counter
-            self.__imager_counter += 1
-
         # Log
-        self.__logger.log(f"Image {counter} added to input images queue.")
+        if dropped:
+            self.__logger.log(f"Image {counter} added to input images mailbox, dropping a stale image.")
+        else:
+            self.__logger.log(f"Image {counter} added to input images queue.")
 
-    def get_input_image(self, preprocess_fn: Callable[[Image, int, int], np.ndarray]) -> np.ndarray | None:
+    def get_input_image_with_id(self) -> tuple[int, Image] | None:
         """
-        Get image from input images queue.
+        Get image from input images queue with its frame id, without preprocessing it.
 
         Returns:
-            np.ndarray|None: Preprocessed image from the input images queue or None if no image is available.
+            tuple[int, Image]|None: Frame id and image from the input images queue or None if no image is available.
         """
         with self.__lock:
             # Check if the pending input image event is set
-            if self.__pending_input_image_event.is_set():
+            if not self.__pending_input_image_event.is_set():
                 return None
 
             # Get the image from input images queue
-            image = self.__input_images_queue.get()
-
-            # Preprocess the image
-            preprocessed_image = preprocess_fn(image)
+            if self.__mailbox_size:
+                frame_id, image = self.__input_images_queue.popleft()
+            else:
+                frame_id, image = self.__input_images_queue.get()
 
             # Clear the pending input image event
-            if self.__input_images_queue.empty():
+            if self.__is_input_images_queue_empty():
                 self.__pending_input_image_event.clear()
 
         # Log
-        self.__logger.log(f"Image retrieved from input images queue.")
+        self.__logger.log(f"Image {frame_id} retrieved from input images queue.")
 
         # Send image to server
         if self.__server:
-            self.__server.send_image_original(image)
+            self.__server.publish(RealtimeTrackerServer.TAG_IMAGE_ORIGINAL, image)
+
+        return frame_id, image
+
+    def get_input_image(self, preprocess_fn: Callable[[Image, int, int], np.ndarray]) -> np.ndarray | None:
+        """
+        Get image from input images queue. The image is preprocessed after releasing the lock, so it doesn't block the
+        other producers and consumers.
+
+        Returns:
+            np.ndarray|None: Preprocessed image from the input images queue or None if no image is available.
+        """
+        input_image = self.get_input_image_with_id()
+        if input_image is None:
+            return None
+
+        # Preprocess the image
+        return preprocess_fn(input_image[1])
+
+    def __is_input_images_queue_empty(self) -> bool:
+        """
+        Check if the input images queue is empty.
+
+        Returns:
+            bool: True if the input images queue is empty, False otherwise.
+        """
+        if self.__mailbox_size:
+            return not self.__input_images_queue
+        return self.__input_images_queue.empty()
 
-        return preprocessed_image
+    def get_drop_statistics(self) -> dict[str, int]:
+        """
+        Get the input images counters.
 
-    def put_output_inference(self, model_name: str, inference: ImageBoundingBoxes) -> None:
+        Returns:
+            dict[str, int]: Images put in the input images queue, stale images dropped in mailbox mode and images
+            waiting to be processed.
+        """
+        with self.__lock:
+            if self.__input_images_queue is None:
+                pending = 0
+            elif self.__mailbox_size:
+                pending = len(self.__input_images_queue)
+            else:
+                pending = self.__input_images_queue.qsize()
+
+            return {
+                'images': self.__imager_counter,
+                'dropped_images': self.__dropped_images,
+                'pending_images': pending,
+            }
+
+    def put_output_inference(self, frame_detections: FrameDetections) -> None:
         """
-        Put inference in output inference queue.
+        Put the combined inferences of a frame in output inference queue.
 
         Args:
-            model_name (str): Name of the model that produced the inference.
-            inference (ImageBoundingBoxes): Inference to put in the output inference queue.
+            frame_detections (FrameDetections): Inferences of the models that processed the frame.
         """
+        # Check the type of the frame detections
+        check_type(frame_detections, FrameDetections)
+
         with self.__lock:
             # Put inference in output inference queue
-            self.__output_inference_queue.put((model_name, inference))
-
+            self.__output_inference_queue.put(frame_detections)
 
             # Set the pending output inference event
             self.__pending_output_inference_event.set()
 
         # Log
-        self.__logger.log(f"Inference added to output inference queue for model '{model_name}': {inference}")
+        self.__logger.log(f"Inference added to output inference queue for {frame_detections}")
 
-    def get_output_inference(self) -> tuple[str, ImageBoundingBoxes] | None:
+    def get_output_inference(self) -> FrameDetections | None:
         """
-        Get inference from output inference queue.
+        Get the combined inferences of a frame from output inference queue.
 
         Returns:
-            ImageBoundingBoxes|None: Inference from the output inference queue or None if no inference is available.
+            FrameDetections|None: Inferences from the output inference queue or None if no inference is available.
         """
         with self.__lock:
             # Check if the pending output inference event is set
-            if self.__pending_output_inference_event.is_set():
+            if not self.__pending_output_inference_event.is_set():
                 return None
 
             # Get the inference from output inference queue
-            model_name, inference = self.__output_inference_queue.get()
+            frame_detections = self.__output_inference_queue.get()
 
             # Clear the pending output inference event
             if self.__output_inference_queue.empty():
                 self.__pending_output_inference_event.clear()
 
         # Log
-        self.__logger.log(f"Inference retrieved from output inference queue.")
+        self.__logger.log(f"Inference of frame {frame_detections.get_frame_id()} retrieved from output inference queue.")
 
-        return model_name, inference
+        return frame_detections
 
     def capture_image(self):
         """
         Capture image from camera.
         """
-        # Capture image from camera
-        image_pil = self.__camera.capture_image_pil()
+        # Write the frame once into the shared memory ring
+        if self.__frame_ring:
+            name = Camera.LORES_NAME if self.__input_size else Camera.STREAM_NAME
+            frame_id = self.__frame_ring.write(self.__camera.capture_array(name))
+
+            # Log
+            self.__logger.log(f"Frame {frame_id} written to the frame ring.")
+            return
+
+        # Capture image from camera, from the low resolution stream if it matches the model input
+        if self.__input_size:
+            image_pil = fromarray(self.__camera.capture_array(Camera.LORES_NAME))
+        else:
+            image_pil = self.__camera.capture_image_pil()
 
         # Put image in input images queue
         self.put_input_image(image_pil)
@@ -219,13 +323,23 @@ class ImagesQueue:
         Start the images queue.
         """
         with self.__lock:
-            # Initialize the queues
-            self.__input_images_queue = Queue()
+            # Initialize the queues, the input one is a bounded deque in mailbox mode
+            if self.__mailbox_size:
+                self.__input_images_queue = deque(maxlen=self.__mailbox_size)
+            else:
+                self.__input_images_queue = Queue()
             self.__output_inference_queue = Queue()
 
+            # Reset the image counters
+            self.__imager_counter = 0
+            self.__dropped_images = 0
+
             # Clear the events
             self.__clear_events()
 
+        # Start the camera stream, so the images are captured without encoding them
+        self.__camera.start_stream(lores_size=self.__input_size)
+
         # Log
         self.__logger.log("Images queue started.")
 
@@ -235,7 +349,10 @@ class ImagesQueue:
         """
         with self.__lock:
             # Close the queues
-            self.__input_images_queue.close()
+            if self.__mailbox_size:
+                self.__input_images_queue.clear()
+            else:
+                self.__input_images_queue.close()
             self.__output_inference_queue.close()
 
             # Clear the events
@@ -244,6 +361,9 @@ class ImagesQueue:
             # Reset the image counter
             self.__imager_counter = 0
 
+        # Stop the camera stream
+        self.__camera.stop_stream()
+
         # Log
         self.__logger.log("Images queue closed.")
 
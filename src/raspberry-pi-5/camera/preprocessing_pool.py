@@ -0,0 +1,210 @@
+import queue
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from log import Logger
+from utils import check_type
+
+
+class PreprocessingPool:
+    """
+    Pipeline stage that preprocesses the captured images on a pool of worker threads or processes.
+
+    The images are submitted with their frame id and the results are delivered tagged with it, so capture,
+    preprocessing and inference overlap. Results may complete out of order; the ones older than the last delivered
+    frame are dropped, so the inference always gets the freshest image.
+    """
+    # Logger configuration
+    LOG_TAG = "PreprocessingPool"
+
+    # Default number of workers
+    WORKERS = 2
+
+    # Default maximum number of images being preprocessed or waiting to be delivered
+    MAX_PENDING = 4
+
+    def __init__(self, preprocess_fn: Callable[[Any], np.ndarray], logger: Optional[Logger] = None,
+                 workers: int = WORKERS, use_processes: bool = False, max_pending: int = MAX_PENDING):
+        """
+        Initialize the preprocessing pool.
+
+        Args:
+            preprocess_fn (Callable[[Any], np.ndarray]): Function that preprocesses an image. It must be picklable if
+                the pool uses processes.
+            logger (Logger|None): Logger instance for logging messages.
+            workers (int): Number of worker threads or processes.
+            use_processes (bool): Whether to use processes instead of threads. Threads are enough when the preprocessing
+                releases the GIL, as OpenCV does, and they don't copy the images.
+            max_pending (int): Maximum number of images being preprocessed or waiting to be delivered. Submitting blocks
+                when it's reached.
+        """
+        # Check the type of the preprocess function
+        if not callable(preprocess_fn):
+            raise TypeError(f"Expected a callable preprocess function, got {type(preprocess_fn)}")
+        self.__preprocess_fn = preprocess_fn
+
+        # Check the type of logger
+        if logger:
+            check_type(logger, Logger)
+            self.__logger = logger.get_sub_logger(self.LOG_TAG)
+        else:
+            self.__logger = None
+
+        # Check the type of the number of workers and the maximum pending images
+        check_type(workers, int)
+        check_type(use_processes, bool)
+        check_type(max_pending, int)
+        self.__workers = workers
+        self.__use_processes = use_processes
+
+        # Create the semaphore that bounds the pending images
+        self.__pending = BoundedSemaphore(max_pending)
+
+        # Create the results queue
+        self.__results = queue.Queue()
+
+        # Create the lock for the counters
+        self.__lock = Lock()
+
+        # Initialize the last delivered frame id and the counters
+        self.__last_frame_id = -1
+        self.__preprocessed_images = 0
+        self.__dropped_images = 0
+        self.__failed_images = 0
+
+        # Initialize the executor
+        self.__executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        """
+        Start the worker pool.
+        """
+        if self.__executor is not None:
+            return
+
+        if self.__use_processes:
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers)
+        else:
+            self.__executor = ThreadPoolExecutor(max_workers=self.__workers, thread_name_prefix=self.LOG_TAG)
+
+        # Log
+        kind = "processes" if self.__use_processes else "threads"
+        self.__log(f"Preprocessing pool started with {self.__workers} {kind}.")
+
+    def stop(self) -> None:
+        """
+        Stop the worker pool, discarding the images that are not being preprocessed yet.
+        """
+        if self.__executor is None:
+            return
+
+        self.__executor.shutdown(wait=True, cancel_futures=True)
+        self.__executor = None
+
+        # Log
+        self.__log("Preprocessing pool stopped.")
+
+    def __log(self, message: str) -> None:
+        """
+        Log a message if the logger is set.
+
+        Args:
+            message (str): The message to log.
+        """
+        if self.__logger:
+            self.__logger.log(message)
+
+    def submit(self, frame_id: int, image: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Submit an image to be preprocessed.
+
+        Args:
+            frame_id (int): Id of the frame.
+            image (Any): Image to preprocess.
+            timeout (float|None): Maximum time to wait for a free slot. Default is None (wait indefinitely).
+
+        Returns:
+            bool: True if the image was submitted, False if the timeout is reached.
+        """
+        check_type(frame_id, int)
+        if self.__executor is None:
+            raise RuntimeError("Preprocessing pool is not started.")
+
+        # Wait for a free slot
+        if not self.__pending.acquire(timeout=timeout):
+            return False
+
+        future = self.__executor.submit(self.__preprocess_fn, image)
+        future.add_done_callback(lambda done: self.__put_result(frame_id, done))
+        return True
+
+    def __put_result(self, frame_id: int, future: Future) -> None:
+        """
+        Put the result of a preprocessing job in the results queue.
+
+        Args:
+            frame_id (int): Id of the frame.
+            future (Future): Finished preprocessing job.
+        """
+        if future.cancelled():
+            self.__pending.release()
+            return
+
+        exception = future.exception()
+        if exception is not None:
+            with self.__lock:
+                self.__failed_images += 1
+            self.__pending.release()
+            self.__log(f"Error preprocessing frame {frame_id}: {exception}")
+            return
+
+        self.__results.put((frame_id, future.result()))
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[tuple[int, np.ndarray]]:
+        """
+        Get the next preprocessed image, dropping the ones older than the last delivered frame.
+
+        Args:
+            timeout (float|None): Maximum time to wait for a result. Default is None (wait indefinitely).
+
+        Returns:
+            tuple[int, np.ndarray]|None: Frame id and preprocessed image, or None if the timeout is reached.
+        """
+        while True:
+            try:
+                frame_id, preprocessed_image = self.__results.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+            # Free the slot of the image
+            self.__pending.release()
+
+            with self.__lock:
+                # Drop the results that finished after a newer frame
+                if frame_id <= self.__last_frame_id:
+                    self.__dropped_images += 1
+                    continue
+
+                self.__last_frame_id = frame_id
+                self.__preprocessed_images += 1
+
+            return frame_id, preprocessed_image
+
+    def get_statistics(self) -> dict[str, int]:
+        """
+        Get the preprocessing counters.
+
+        Returns:
+            dict[str, int]: Images delivered, images dropped because a newer frame was delivered first, images whose
+            preprocessing failed, and the last delivered frame id.
+        """
+        with self.__lock:
+            return {
+                'preprocessed_images': self.__preprocessed_images,
+                'dropped_images': self.__dropped_images,
+                'failed_images': self.__failed_images,
+                'last_frame_id': self.__last_frame_id,
+            }
@@ -70,6 +70,21 @@ class Logger:
             # Set the write log event
             self.__write_log_event.set()
 
+    def get_sub_logger(self, tag: str):
+        """
+        Get a sub-logger that logs the messages with the given tag.
+
+        Args:
+            tag (str): Tag for the log messages.
+
+        Returns:
+            SubLogger: The sub-logger instance.
+        """
+        # Imported here since the sub-logger module imports this one
+        from log.sub_logger import SubLogger
+
+        return SubLogger(self, tag)
+
     def __get_message(self) -> str|None:
         """
         Get a message from the queue.
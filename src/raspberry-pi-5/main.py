@@ -2,6 +2,7 @@ import argparse
 from multiprocessing import Process, Manager, Event
 from threading import Thread
 
+from camera.frame_ring import FrameRing
 from camera.images_queue import main as images_queue_main, ImagesQueue
 from env import Env
 from log import main as log_main, Logger
@@ -9,8 +10,11 @@ from serial import SerialCommunication, main as serial_communication_main
 from server import RealtimeTrackerServer
 from server import main as server_main
 from utils import check_type
+from yolo import Yolo
 from yolo.args import Args
-from yolo.hailo.object_detection import main as object_detection_main
+from yolo.files import Files
+from yolo.hailo import Hailo
+from yolo.object_detection import main as object_detection_main
 
 
 def process_1_fn(serial_communication: SerialCommunication, server: RealtimeTrackerServer | None):
@@ -76,7 +80,8 @@ def process_2_fn(images_queue: ImagesQueue, logger: Logger):
         thread.join()
 
 
-def process_3_fn(logger: Logger, images_queue: ImagesQueue, parking_event: Event, stop_event: Event):
+def process_3_fn(logger: Logger, images_queue: ImagesQueue, parking_event: Event, stop_event: Event,
+                 frame_ring: FrameRing, combined_model_name: str | None):
     """
     Process 3: Hailo object detection.
 
@@ -85,6 +90,8 @@ def process_3_fn(logger: Logger, images_queue: ImagesQueue, parking_event: Event
         images_queue (ImagesQueue): The images queue object.
         parking_event (Event): The event signal for parking detection.
         stop_event (Event): The event signal to stop processing.
+        frame_ring (FrameRing): The shared memory ring with the captured frames.
+        combined_model_name (str|None): The multi-class model that replaces the single-class ones, if any.
     """
     # Check the type of logger
     check_type(logger, Logger)
@@ -98,7 +105,11 @@ def process_3_fn(logger: Logger, images_queue: ImagesQueue, parking_event: Event
     # Check the type of stop event
     check_type(stop_event, Event)
 
-    object_detection_main(logger, images_queue, parking_event, stop_event)
+    # Check the type of frame ring
+    check_type(frame_ring, FrameRing)
+
+    object_detection_main(logger, images_queue, parking_event, stop_event, frame_ring=frame_ring,
+                          combined_model_name=combined_model_name)
 
 def main():
     """
@@ -108,6 +119,7 @@ def main():
         description="Klevor - WRO 2025 - Future Engineers Car")
     Args.add_yolo_version_argument(parser)
     Args.add_debug_argument(parser)
+    Args.add_yolo_combined_model_argument(parser)
     args = Args.parse_args_as_dict(parser)
 
     # Get the YOLO version
@@ -116,11 +128,16 @@ def main():
     # Get the debug mode
     arg_debug = Args.get_attribute_from_args(args, Args.DEBUG)
 
+    # Get the combined model, if it's set it replaces the single-class models
+    arg_combined_model = Args.get_attribute_from_args(args, Args.COMBINED_MODEL)
+
     # Set the debug mode and YOLO version as environment variables
     Env.set_yolo_version(arg_yolo_version)
     Env.set_debug_mode(arg_debug)
 
     # Create a manager for shared objects
+    frame_ring = None
+    processes = []
     with Manager() as manager:
         try:
             # Create the parking event signal
@@ -138,8 +155,18 @@ def main():
             # Create the camera object with multiprocessing safety
             camera = manager.Camera(logger)
 
+            # Get the model input size to capture the images at that resolution, all the models share it
+            hef_file_path = Files.get_model_hailo_suite_compiled_hef_file_path(arg_combined_model or Yolo.MODEL_G,
+                                                                               arg_yolo_version)
+            input_height, input_width, input_channels = Hailo.get_hef_input_shape(hef_file_path)
+
+            # Create the shared memory ring for the captured frames, written once by the images queue and copied once
+            # by the object detection process
+            frame_ring = FrameRing(shape=(input_height, input_width, input_channels))
+
             # Create the images queue with multiprocessing safety
-            images_queue = manager.ImagesQueue(stop_event, logger, camera, server=server)
+            images_queue = manager.ImagesQueue(stop_event, logger, camera, server=server,
+                                               input_size=(input_width, input_height), frame_ring=frame_ring)
 
             # Raspberry Pi Pico serial communication wrapper with multiprocessing safety
             serial_communication = manager.SerialCommunication(parking_event, stop_event, logger, images_queue,
@@ -152,7 +179,8 @@ def main():
             process_2 = Process(target=process_2_fn, args=(images_queue, logger))
 
             # Third process
-            process_3 = Process(target=process_3_fn, args=(logger, images_queue, parking_event, stop_event))
+            process_3 = Process(target=process_3_fn, args=(logger, images_queue, parking_event, stop_event, frame_ring,
+                                                           arg_combined_model))
 
             # Start the processes
             processes = [process_1, process_2, process_3]
@@ -178,6 +206,10 @@ def main():
                     process.terminate()
                     process.join()
 
+            # Remove the frame ring shared memory
+            if frame_ring:
+                frame_ring.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,110 @@
+from model.image_bounding_boxes import ImageBoundingBoxes
+
+
+class FrameDetections:
+    """
+    Custom class that represents the combined detections of the YOLO models that processed the same image.
+    """
+
+    def __init__(self, frame_id: int, model_names: tuple[str, ...], timestamp: float,
+                 inferences: dict[str, ImageBoundingBoxes] = None):
+        """
+        Initialize the FrameDetections instance.
+
+        Args:
+            frame_id (int): Id of the frame the models processed.
+            model_names (tuple[str, ...]): Names of the models expected to process the frame.
+            timestamp (float): Monotonic time when the frame was dispatched to the models.
+            inferences (dict[str, ImageBoundingBoxes]): Inferences of the models that already reported, keyed by model
+                name.
+        """
+        self.__frame_id = frame_id
+        self.__model_names = model_names
+        self.__timestamp = timestamp
+        self.__inferences = inferences if inferences is not None else dict()
+
+    def __str__(self) -> str:
+        """
+        String representation of the detections of the frame.
+        """
+        inferences = [f"Model '{model_name}':\n{inference}" for model_name, inference in self.__inferences.items()]
+        missing_model_names = self.get_missing_model_names()
+        if missing_model_names:
+            inferences.append(f"Missing models: {', '.join(missing_model_names)}")
+        return f"Frame {self.__frame_id}:\n" + "\n".join(inferences)
+
+    def add_inference(self, model_name: str, inference: ImageBoundingBoxes) -> None:
+        """
+        Add the inference of a model.
+
+        Args:
+            model_name (str): Name of the model that produced the inference.
+            inference (ImageBoundingBoxes): Inference of the model.
+        """
+        self.__inferences[model_name] = inference
+
+    def get_frame_id(self) -> int:
+        """
+        Get the id of the frame.
+
+        Returns:
+            int: The frame id.
+        """
+        return self.__frame_id
+
+    def get_model_names(self) -> tuple[str, ...]:
+        """
+        Get the names of the models expected to process the frame.
+
+        Returns:
+            tuple[str, ...]: The model names.
+        """
+        return self.__model_names
+
+    def get_timestamp(self) -> float:
+        """
+        Get the monotonic time when the frame was dispatched to the models.
+
+        Returns:
+            float: The timestamp.
+        """
+        return self.__timestamp
+
+    def get_inferences(self) -> dict[str, ImageBoundingBoxes]:
+        """
+        Get the inferences of the models that reported.
+
+        Returns:
+            dict[str, ImageBoundingBoxes]: The inferences keyed by model name.
+        """
+        return self.__inferences
+
+    def get_inference(self, model_name: str) -> ImageBoundingBoxes | None:
+        """
+        Get the inference of a model.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            ImageBoundingBoxes|None: The inference of the model, or None if it didn't report.
+        """
+        return self.__inferences.get(model_name)
+
+    def get_missing_model_names(self) -> tuple[str, ...]:
+        """
+        Get the names of the expected models that didn't report.
+
+        Returns:
+            tuple[str, ...]: The missing model names.
+        """
+        return tuple(model_name for model_name in self.__model_names if model_name not in self.__inferences)
+
+    def is_complete(self) -> bool:
+        """
+        Check if all the expected models reported.
+
+        Returns:
+            bool: True if all the expected models reported, False otherwise.
+        """
+        return all(model_name in self.__inferences for model_name in self.__model_names)
@@ -1,19 +1,97 @@
+import struct
+from typing import Callable, Optional
+
+import numpy as np
+
+
 class ImageBoundingBoxes:
     """
     Custom class that represents the detected objects bounding boxes from a YOLO model on an image.
+
+    The boxes, confidences and classes are arrays stored back to back in a single buffer after a small header, so they
+    are serialized without copies. The boxes are kept in the xyxy format, in pixels or normalized, and the other formats
+    are computed the first time they're requested and cached.
     """
+    __slots__ = ('__buffer', '__n', '__xyxy', '__conf', '__cls', '__normalized', '__image_size', '__cache')
+
+    # Default score threshold
+    THRESHOLD = 0.5
+
+    # Default non-maximum suppression IoU threshold and maximum number of detections, as in the Hailo NMS configuration
+    IOU_THRESHOLD = 0.45
+    MAX_DETECTIONS = 200
+
+    # Header structure: number of objects, normalized boxes flag, image width and height (0 if unknown), padded to keep
+    # the arrays aligned
+    HEADER_STRUCT = struct.Struct('<IBxHHxx')
 
-    def __init__(self, xwyhn=None, xyxy=None, xywh=None, xyxyn=None, cls=None, conf=None, n=None):
+    # Arrays types
+    BOX_DTYPE = np.dtype(np.float32)
+    CONF_DTYPE = np.dtype(np.float32)
+    CLS_DTYPE = np.dtype(np.int32)
+
+    # Size of the arrays of each object
+    OBJECT_SIZE = 4 * BOX_DTYPE.itemsize + CONF_DTYPE.itemsize + CLS_DTYPE.itemsize
+
+    def __init__(self, xyxy=None, cls=None, conf=None, normalized: bool = False,
+                 image_size: Optional[tuple[int, int]] = None):
         """
         Initialize the ImageBoundingBoxes instance with bounding box coordinates, classes, and confidences.
+
+        Args:
+            xyxy: Bounding box coordinates in the format (x1, y1, x2, y2), one row for each object.
+            cls: Class of each object.
+            conf: Confidence of each object.
+            normalized (bool): Whether the coordinates are normalized by the image size. Defaults to False.
+            image_size (tuple[int, int]|None): Width and height of the image, required to convert between pixels and
+                normalized coordinates. Defaults to None.
+        """
+        xyxy = np.asarray(xyxy if xyxy is not None else (), dtype=self.BOX_DTYPE).reshape(-1, 4)
+        cls = np.asarray(cls if cls is not None else (), dtype=self.CLS_DTYPE).reshape(-1)
+        conf = np.asarray(conf if conf is not None else (), dtype=self.CONF_DTYPE).reshape(-1)
+        n = len(xyxy)
+        if len(cls) != n or len(conf) != n:
+            raise ValueError(f"Expected {n} classes and confidences, got {len(cls)} and {len(conf)}.")
+
+        # Pack the header and the arrays in a single buffer
+        width, height = image_size if image_size else (0, 0)
+        buffer = bytearray(self.HEADER_STRUCT.size + n * self.OBJECT_SIZE)
+        self.HEADER_STRUCT.pack_into(buffer, 0, n, normalized, width, height)
+        self.__set_buffer(buffer)
+        self.__xyxy[:] = xyxy
+        self.__conf[:] = conf
+        self.__cls[:] = cls
+
+    def __set_buffer(self, buffer: bytearray | bytes | memoryview) -> None:
         """
-        self.__xywh = xywh
-        self.__xywhn = xwyhn
-        self.__xyxy = xyxy
-        self.__xyxyn = xyxyn
-        self.__cls = cls
-        self.__conf = conf
+        Set the buffer and map the arrays to it, without copying them.
+
+        Args:
+            buffer (bytearray|bytes|memoryview): Buffer with the header and the arrays.
+        """
+        n, normalized, width, height = self.HEADER_STRUCT.unpack_from(buffer)
+        if len(buffer) != self.HEADER_STRUCT.size + n * self.OBJECT_SIZE:
+            raise ValueError(f"Invalid buffer size for {n} objects: {len(buffer)} bytes.")
+
+        self.__buffer = buffer
         self.__n = n
+        self.__normalized = bool(normalized)
+        self.__image_size = (width, height) if width and height else None
+        self.__cache = dict()
+
+        # Map the arrays
+        offset = self.HEADER_STRUCT.size
+        self.__xyxy = np.frombuffer(buffer, dtype=self.BOX_DTYPE, count=4 * n, offset=offset).reshape(n, 4)
+        offset += self.__xyxy.nbytes
+        self.__conf = np.frombuffer(buffer, dtype=self.CONF_DTYPE, count=n, offset=offset)
+        offset += self.__conf.nbytes
+        self.__cls = np.frombuffer(buffer, dtype=self.CLS_DTYPE, count=n, offset=offset)
+
+    def __reduce__(self):
+        """
+        Pickle the instance as its buffer, so it's cheap to pass between processes.
+        """
+        return self.__class__.from_bytes, (bytes(self.__buffer),)
 
     def __str__(self) -> str:
         """
@@ -24,12 +102,36 @@ class ImageBoundingBoxes:
             bounding_box_attributes = [
                 f"Class: {int(self.__cls[i])}",
                 f"Confidence: {self.__conf[i]}",
-                f"(X0, Y0): ({self.__xyxyn[i][0]}, {self.__xyxyn[i][1]})",
-                f"(X1, Y1): ({self.__xyxyn[i][2]}, {self.__xyxyn[i][3]})",
+                f"(X0, Y0): ({self.__xyxy[i][0]}, {self.__xyxy[i][1]})",
+                f"(X1, Y1): ({self.__xyxy[i][2]}, {self.__xyxy[i][3]})",
             ]
             bounding_boxes.append(f"Box {i + 1}:\n\t" + "\n\t".join(bounding_box_attributes))
         return "\n".join(bounding_boxes)
 
+    def to_bytes(self) -> memoryview:
+        """
+        Get the serialized instance, without copying it.
+
+        Returns:
+            memoryview: View of the buffer with the header and the arrays.
+        """
+        return memoryview(self.__buffer)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview) -> 'ImageBoundingBoxes':
+        """
+        Initialize a new ImageBoundingBoxes instance from its serialized buffer, without copying it.
+
+        Args:
+            data (bytes|bytearray|memoryview): Buffer returned by to_bytes. The arrays are read-only if it's immutable.
+
+        Returns:
+            ImageBoundingBoxes: An instance containing the bounding boxes, classes, and confidences.
+        """
+        image_bounding_boxes = cls.__new__(cls)
+        image_bounding_boxes.__set_buffer(data)
+        return image_bounding_boxes
+
     @staticmethod
     def from_pt_cpu_boxes(boxes):
         """
@@ -41,14 +143,12 @@ class ImageBoundingBoxes:
         Returns:
             ImageBoundingBoxes: An instance containing the bounding boxes, classes, and confidences.
         """
+        height, width = boxes.orig_shape[:2]
         return ImageBoundingBoxes(
-            xywh=boxes.xywh.cpu().numpy(),
-            xywhn=boxes.xywhn.cpu().numpy(),
             xyxy=boxes.xyxy.cpu().numpy(),
-            xyxyn=boxes.xyxyn.cpu().numpy(),
             cls=boxes.cls.cpu().numpy(),
             conf=boxes.conf.cpu().numpy(),
-            n=len(boxes.cls)
+            image_size=(width, height)
         )
 
     @staticmethod
@@ -65,34 +165,229 @@ class ImageBoundingBoxes:
         return ImageBoundingBoxes.from_pt_cpu_boxes(input_data[0].boxes)
 
     @staticmethod
-    def from_hailo(input_data: list, threshold: float = 0.5):
+    def from_hailo(input_data: list, threshold: float | dict[int, float] = THRESHOLD,
+                   image_size: Optional[tuple[int, int]] = None):
         """
-        Extract detections from the input data.
+        Extract detections from the Hailo NMS by class output, without looping over them.
 
         Args:
-            input_data (list): Raw detections from the model.
-            threshold (float): Score threshold for filtering detections. Defaults to 0.5.
+            input_data (list): Raw detections from the model, an array of detections for each class. Each detection
+                has the normalized (y1, x1, y2, x2) box coordinates followed by the score.
+            threshold (float|dict[int, float]): Score threshold for filtering detections, or the threshold of each
+                class. The classes missing from the dictionary use THRESHOLD. Defaults to THRESHOLD.
+            image_size (tuple[int, int]|None): Width and height of the model input. Defaults to None.
 
         Returns:
             ImageBoundingBoxes: An instance containing the bounding boxes, classes, and confidences.
         """
-        boxes, scores, classes = [], [], []
-        num_detections = 0
+        # Concatenate the detections of every class, and get the class of each one
+        class_detections = [np.asarray(detections, dtype=np.float32).reshape(-1, 5) for detections in input_data]
+        counts = [len(detections) for detections in class_detections]
+        if not sum(counts):
+            return ImageBoundingBoxes(normalized=True, image_size=image_size)
+        detections = np.concatenate(class_detections)
+        classes = np.repeat(np.arange(len(class_detections)), counts)
+
+        # Keep the detections above their threshold, reordering the boxes coordinates to (x1, y1, x2, y2)
+        thresholds = ImageBoundingBoxes.__get_thresholds(threshold, classes, len(class_detections))
+        mask = detections[:, 4] >= thresholds
+        return ImageBoundingBoxes(
+            xyxy=detections[mask][:, [1, 0, 3, 2]],
+            cls=classes[mask],
+            conf=detections[mask, 4],
+            normalized=True,
+            image_size=image_size
+        )
+
+    @staticmethod
+    def from_onnx(output: np.ndarray, image_size: tuple[int, int], threshold: float | dict[int, float] = THRESHOLD,
+                  iou_threshold: float = IOU_THRESHOLD, max_detections: int = MAX_DETECTIONS):
+        """
+        Extract detections from the raw output of a YOLO ONNX export, applying the class-wise non-maximum suppression
+        that the Hailo models run on the device.
+
+        Args:
+            output (np.ndarray): Raw output of the model, with shape (1, 4 + classes, anchors). Each anchor has the
+                (x_center, y_center, width, height) box coordinates in pixels of the model input, followed by the score
+                of each class.
+            image_size (tuple[int, int]): Width and height of the model input.
+            threshold (float|dict[int, float]): Score threshold for filtering detections, or the threshold of each
+                class. The classes missing from the dictionary use THRESHOLD. Defaults to THRESHOLD.
+            iou_threshold (float): IoU threshold of the non-maximum suppression. Defaults to IOU_THRESHOLD.
+            max_detections (int): Maximum number of detections kept. Defaults to MAX_DETECTIONS.
+
+        Returns:
+            ImageBoundingBoxes: An instance containing the bounding boxes, classes, and confidences.
+        """
+        # Get the best class of each anchor
+        predictions = np.asarray(output, dtype=np.float32).reshape(output.shape[-2:]).T
+        class_scores = predictions[:, 4:]
+        classes = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(classes)), classes]
+
+        # Keep the anchors above their threshold
+        mask = scores >= ImageBoundingBoxes.__get_thresholds(threshold, classes, class_scores.shape[1])
+        xywh, classes, scores = predictions[mask, :4], classes[mask], scores[mask]
+        if not len(scores):
+            return ImageBoundingBoxes(normalized=True, image_size=image_size)
+
+        # Run the non-maximum suppression of each class
+        xyxy = np.concatenate((xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2), axis=1)
+        keep = ImageBoundingBoxes.__non_maximum_suppression(xyxy, scores, classes, iou_threshold)[:max_detections]
+
+        # Normalize the coordinates by the model input size
+        width, height = image_size
+        return ImageBoundingBoxes(
+            xyxy=xyxy[keep] / np.array((width, height, width, height), dtype=np.float32),
+            cls=classes[keep],
+            conf=scores[keep],
+            normalized=True,
+            image_size=image_size
+        )
+
+    @staticmethod
+    def __non_maximum_suppression(xyxy: np.ndarray, scores: np.ndarray, classes: np.ndarray,
+                                  iou_threshold: float) -> np.ndarray:
+        """
+        Get the detections kept by the greedy non-maximum suppression of each class.
+
+        Args:
+            xyxy (np.ndarray): Boxes in the (x1, y1, x2, y2) format.
+            scores (np.ndarray): Score of each detection.
+            classes (np.ndarray): Class of each detection.
+            iou_threshold (float): Detections overlapping a better one of the same class above this IoU are dropped.
+
+        Returns:
+            np.ndarray: Indices of the kept detections, by descending score.
+        """
+        # Offset the boxes of each class so boxes of different classes never overlap
+        boxes = xyxy + (classes * (xyxy.max() + 1))[:, None]
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+        order = scores.argsort()[::-1]
+        keep = []
+        while len(order):
+            best, order = order[0], order[1:]
+            keep.append(best)
+
+            # Drop the boxes overlapping the best one
+            top_left = np.maximum(boxes[best, :2], boxes[order, :2])
+            bottom_right = np.minimum(boxes[best, 2:], boxes[order, 2:])
+            intersections = np.prod(np.clip(bottom_right - top_left, 0, None), axis=1)
+            ious = intersections / (areas[best] + areas[order] - intersections)
+            order = order[ious <= iou_threshold]
+
+        return np.asarray(keep, dtype=np.int64)
+
+    @staticmethod
+    def __get_thresholds(threshold: float | dict[int, float], classes: np.ndarray,
+                         num_classes: int) -> float | np.ndarray:
+        """
+        Get the score threshold of each detection.
+
+        Args:
+            threshold (float|dict[int, float]): Score threshold, or the threshold of each class. The classes missing from
+                the dictionary use THRESHOLD.
+            classes (np.ndarray): Class of each detection.
+            num_classes (int): Number of classes of the model.
+
+        Returns:
+            float|np.ndarray: The threshold, or an array with the threshold of each detection.
+        """
+        if not isinstance(threshold, dict):
+            return threshold
+
+        class_thresholds = np.full(num_classes, ImageBoundingBoxes.THRESHOLD, dtype=np.float32)
+        for class_id, class_threshold in threshold.items():
+            if class_id < num_classes:
+                class_thresholds[class_id] = class_threshold
+        return class_thresholds[classes]
+
+    def split_classes(self, classes_map: dict[int, tuple[str, int]]) -> dict[str, 'ImageBoundingBoxes']:
+        """
+        Split the detections of a multi-class model into the ones of the models each class maps to.
 
-        for i, detection in enumerate(input_data):
-            if len(detection) == 0:
-                continue
+        Args:
+            classes_map (dict[int, tuple[str, int]]): Model name and class each class maps to. The detections of the
+                classes that are not in the map are dropped.
+
+        Returns:
+            dict[str, ImageBoundingBoxes]: The detections of each model in the map, keyed by model name.
+        """
+        split = dict()
+        for model_name in dict.fromkeys(model_name for model_name, _ in classes_map.values()):
+            # Get the detections of the classes that map to the model, and their class in the model
+            model_classes = np.full(self.__n, -1, dtype=self.CLS_DTYPE)
+            for class_id, (target_model_name, model_class) in classes_map.items():
+                if target_model_name == model_name:
+                    model_classes[self.__cls == class_id] = model_class
+            mask = model_classes >= 0
 
-            for det in detection:
-                bbox, score = det[:4], det[4]
+            split[model_name] = ImageBoundingBoxes(xyxy=self.__xyxy[mask], cls=model_classes[mask],
+                                                   conf=self.__conf[mask], normalized=self.__normalized,
+                                                   image_size=self.__image_size)
 
-                if score >= threshold:
-                    boxes.append(bbox)
-                    scores.append(score)
-                    classes.append(i)
-                    num_detections += 1
+        return split
 
-        return ImageBoundingBoxes(n=num_detections, xyxy=boxes, cls=classes, conf=scores)
+    def __get_cached(self, name: str, convert_fn: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Get a coordinates format, converting the boxes the first time it's requested.
+
+        Args:
+            name (str): Name of the format.
+            convert_fn (Callable[[], np.ndarray]): Function that converts the boxes to the format.
+
+        Returns:
+            np.ndarray: The boxes in the format.
+        """
+        boxes = self.__cache.get(name)
+        if boxes is None:
+            boxes = self.__cache[name] = convert_fn()
+        return boxes
+
+    def __get_scale(self) -> np.ndarray:
+        """
+        Get the factors that convert the normalized (x1, y1, x2, y2) coordinates to pixels.
+
+        Returns:
+            np.ndarray: The image width, height, width and height.
+        """
+        if self.__image_size is None:
+            raise ValueError("The image size is required to convert between pixels and normalized coordinates.")
+
+        width, height = self.__image_size
+        return np.array((width, height, width, height), dtype=self.BOX_DTYPE)
+
+    @staticmethod
+    def __xyxy_to_xywh(xyxy: np.ndarray) -> np.ndarray:
+        """
+        Convert the boxes from the (x1, y1, x2, y2) format to the (x_center, y_center, width, height) one.
+
+        Args:
+            xyxy (np.ndarray): Boxes in the (x1, y1, x2, y2) format.
+
+        Returns:
+            np.ndarray: Boxes in the (x_center, y_center, width, height) format.
+        """
+        return np.concatenate(((xyxy[:, :2] + xyxy[:, 2:]) / 2, xyxy[:, 2:] - xyxy[:, :2]), axis=1)
+
+    def is_normalized(self) -> bool:
+        """
+        Check if the boxes are stored normalized by the image size.
+
+        Returns:
+            bool: True if the boxes are normalized, False if they are in pixels.
+        """
+        return self.__normalized
+
+    def get_image_size(self) -> tuple[int, int] | None:
+        """
+        Get the size of the image.
+
+        Returns:
+            tuple[int, int]|None: Width and height of the image, or None if it's unknown.
+        """
+        return self.__image_size
 
     def get_number_of_objects(self):
         """
@@ -103,57 +398,62 @@ class ImageBoundingBoxes:
         """
         return self.__n
 
-    def get_xyxy(self):
+    def get_xyxy(self) -> np.ndarray:
         """
         Get the bounding box coordinates in the format (x1, y1, x2, y2).
 
         Returns:
-            list: A list of bounding box coordinates in the format (x1, y1, x2, y2).
+            np.ndarray: An N×4 array of bounding box coordinates in the format (x1, y1, x2, y2).
         """
-        return self.__xyxy
+        if not self.__normalized:
+            return self.__xyxy
+        return self.__get_cached('xyxy', lambda: self.__xyxy * self.__get_scale())
 
-    def get_xywh(self):
+    def get_xywh(self) -> np.ndarray:
         """
         Get the bounding box coordinates in the format (x_center, y_center, width, height).
 
         Returns:
-            list: A list of bounding box coordinates in the format (x_center, y_center, width, height).
+            np.ndarray: An N×4 array of bounding box coordinates in the format (x_center, y_center, width, height).
         """
-        return self.__xywh
+        return self.__get_cached('xywh', lambda: self.__xyxy_to_xywh(self.get_xyxy()))
 
-    def get_xywhn(self):
+    def get_xywhn(self) -> np.ndarray:
         """
         Get the bounding box coordinates in the format (x_center, y_center, width, height) normalized.
 
         Returns:
-            list: A list of bounding box coordinates in the format (x_center, y_center, width, height) normalized.
+            np.ndarray: An N×4 array of bounding box coordinates in the format (x_center, y_center, width, height)
+            normalized.
         """
-        return self.__xywhn
+        return self.__get_cached('xywhn', lambda: self.__xyxy_to_xywh(self.get_xyxyn()))
 
-    def get_xyxyn(self):
+    def get_xyxyn(self) -> np.ndarray:
         """
         Get the bounding box coordinates in the format (x1, y1, x2, y2) normalized.
 
         Returns:
-            list: A list of bounding box coordinates in the format (x1, y1, x2, y2) normalized.
+            np.ndarray: An N×4 array of bounding box coordinates in the format (x1, y1, x2, y2) normalized.
         """
-        return self.__xyxyn
+        if self.__normalized:
+            return self.__xyxy
+        return self.__get_cached('xyxyn', lambda: self.__xyxy / self.__get_scale())
 
-    def get_classes(self):
+    def get_classes(self) -> np.ndarray:
         """
         Get the classes of the detected objects.
 
         Returns:
-            list: A list of class indices for each detected object.
+            np.ndarray: An array of class indices for each detected object.
         """
         return self.__cls
 
-    def get_confidences(self) -> list:
+    def get_confidences(self) -> np.ndarray:
         """
         Get the confidence of the detected objects.
 
         Returns:
-            list: A list of confidence scores for each detected object.
+            np.ndarray: An array of confidence scores for each detected object.
         """
         return self.__conf
 
@@ -164,4 +464,4 @@ class ImageBoundingBoxes:
         Returns:
             tuple: A tuple containing the class, confidence, and bounding box coordinates in xyxy format.
         """
-        return self.__cls, self.__conf, self.__xyxy
+        return self.__cls, self.__conf, self.get_xyxy()
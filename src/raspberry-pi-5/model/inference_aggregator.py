@@ -0,0 +1,181 @@
+from threading import Lock
+from time import monotonic
+from typing import Optional
+
+from log import Logger
+from model.frame_detections import FrameDetections
+from model.image_bounding_boxes import ImageBoundingBoxes
+from utils import check_type
+
+
+class InferenceAggregator:
+    """
+    Class to combine the inferences of the models that process the same frame.
+
+    Each frame is registered with the models it was dispatched to. The combined detections are emitted once all of them
+    reported, or with the missing ones when the deadline passes, so the consumers always get time-consistent results.
+    """
+    # Logger configuration
+    LOG_TAG = "InferenceAggregator"
+
+    # Default time to wait for all the models of a frame, in seconds
+    DEADLINE = 0.2
+
+    def __init__(self, deadline: float = DEADLINE, logger: Optional[Logger] = None):
+        """
+        Initialize the inference aggregator.
+
+        Args:
+            deadline (float): Time to wait for all the models of a frame, in seconds.
+            logger (Logger|None): Logger instance for logging messages.
+        """
+        # Check the type of the deadline
+        check_type(deadline, (int, float))
+        if deadline <= 0:
+            raise ValueError(f"Deadline must be positive, got {deadline}.")
+        self.__deadline = deadline
+
+        # Check the type of logger
+        if logger:
+            check_type(logger, Logger)
+            self.__logger = logger.get_sub_logger(self.LOG_TAG)
+        else:
+            self.__logger = None
+
+        # Initialize the lock, frames are registered and completed from different threads
+        self.__lock = Lock()
+
+        # Pending frames, in dispatch order
+        self.__pending_frames: dict[int, FrameDetections] = dict()
+
+        # Initialize the counters
+        self.__complete_frames = 0
+        self.__expired_frames = 0
+        self.__late_inferences = 0
+
+    def __log(self, message: str) -> None:
+        """
+        Log a message if the logger is set.
+
+        Args:
+            message (str): The message to log.
+        """
+        if self.__logger:
+            self.__logger.log(message)
+
+    def expect(self, frame_id: int, model_names: tuple[str, ...] | list[str]) -> None:
+        """
+        Register a frame dispatched to the given models.
+
+        Args:
+            frame_id (int): Id of the frame.
+            model_names (tuple[str, ...]|list[str]): Names of the models the frame was dispatched to.
+        """
+        check_type(frame_id, int)
+        frame_detections = FrameDetections(frame_id, tuple(model_names), monotonic())
+
+        with self.__lock:
+            self.__pending_frames[frame_id] = frame_detections
+
+    def add(self, frame_id: int, model_name: str, inference: ImageBoundingBoxes) -> Optional[FrameDetections]:
+        """
+        Add the inference of a model for a frame.
+
+        Args:
+            frame_id (int): Id of the frame.
+            model_name (str): Name of the model that produced the inference.
+            inference (ImageBoundingBoxes): Inference of the model.
+
+        Returns:
+            FrameDetections|None: The combined detections if all the models of the frame reported, None otherwise.
+        """
+        with self.__lock:
+            frame_detections = self.__pending_frames.get(frame_id)
+
+            # The frame already expired or was never registered
+            if frame_detections is None:
+                self.__late_inferences += 1
+                late = True
+            else:
+                late = False
+                frame_detections.add_inference(model_name, inference)
+                if frame_detections.is_complete():
+                    del self.__pending_frames[frame_id]
+                    self.__complete_frames += 1
+                else:
+                    frame_detections = None
+
+        # Log
+        if late:
+            self.__log(f"Late inference of model '{model_name}' for frame {frame_id} dropped.")
+
+        return frame_detections
+
+    def pop_expired(self, now: Optional[float] = None) -> list[FrameDetections]:
+        """
+        Remove the frames whose deadline passed.
+
+        Args:
+            now (float|None): Current monotonic time. Default is None (use the current time).
+
+        Returns:
+            list[FrameDetections]: The detections of the expired frames, with the inferences that arrived in time.
+        """
+        if now is None:
+            now = monotonic()
+
+        expired = []
+        with self.__lock:
+            # The frames are registered in order, so the oldest ones come first
+            for frame_id, frame_detections in self.__pending_frames.items():
+                if now - frame_detections.get_timestamp() < self.__deadline:
+                    break
+                expired.append(frame_detections)
+
+            for frame_detections in expired:
+                del self.__pending_frames[frame_detections.get_frame_id()]
+            self.__expired_frames += len(expired)
+
+        # Log
+        for frame_detections in expired:
+            missing_model_names = ", ".join(frame_detections.get_missing_model_names())
+            self.__log(f"Frame {frame_detections.get_frame_id()} expired without models: {missing_model_names}")
+
+        return expired
+
+    def get_timeout(self, max_timeout: float, now: Optional[float] = None) -> float:
+        """
+        Get the time until the deadline of the oldest pending frame.
+
+        Args:
+            max_timeout (float): Timeout returned if there are no pending frames, and upper bound of the result.
+            now (float|None): Current monotonic time. Default is None (use the current time).
+
+        Returns:
+            float: Time until the next deadline, between 0 and max_timeout.
+        """
+        if now is None:
+            now = monotonic()
+
+        with self.__lock:
+            if not self.__pending_frames:
+                return max_timeout
+            oldest = next(iter(self.__pending_frames.values()))
+
+        return min(max(oldest.get_timestamp() + self.__deadline - now, 0.0), max_timeout)
+
+    def get_statistics(self) -> dict[str, int]:
+        """
+        Get the aggregation counters.
+
+        Returns:
+            dict[str, int]: Frames completed by all their models, frames emitted after the deadline, inferences that
+            arrived after their frame was emitted, and frames still pending.
+        """
+        with self.__lock:
+            return {
+                'complete_frames': self.__complete_frames,
+                'expired_frames': self.__expired_frames,
+                'late_inferences': self.__late_inferences,
+                'pending_frames': len(self.__pending_frames),
+            }
@@ -1,9 +1,12 @@
+from typing import Optional
+
 import cv2
 import numpy as np
 from matplotlib import pyplot as plt
 
 from model.image_bounding_boxes import ImageBoundingBoxes
 from opencv import UNUSED_COLOR
+from opencv.letterboxer import LetterboxTransform
 from opencv.preprocessing import Preprocessing
 
 
@@ -35,34 +38,10 @@ class Detections:
         cv2.rectangle(image, (xmin, ymin), (xmax, ymax), color, 2)
         cv2.putText(image, label, (xmin + 4, ymin + 20), cls.FONT, 0.5, color, 1, cv2.LINE_AA)
 
-    @staticmethod
-    def denormalize_and_remove_padding(box: list, size: int, padding_length: int, input_height: int,
-                                       input_width: int) -> list:
-        """
-        Denormalize bounding box coordinates and remove padding.
-
-        Args:
-            box (list): Normalized bounding box coordinates.
-            size (int): Size to scale the coordinates.
-            padding_length (int): Length of padding to remove.
-            input_height (int): Height of the input image.
-            input_width (int): Width of the input image.
-
-        Returns:
-            list: Denormalized bounding box coordinates with padding removed.
-        """
-        for i, x in enumerate(box):
-            box[i] = int(x * size)
-            if (input_width != size) and (i % 2 != 0):
-                box[i] -= padding_length
-            if (input_height != size) and (i % 2 == 0):
-                box[i] -= padding_length
-
-        return box
-
     @classmethod
     def draw_detections(cls, colors: dict[int, tuple[int, int, int]], image_bounding_boxes: ImageBoundingBoxes,
-                        image: np.ndarray, min_score: float = 0.45, scale_factor: float = 1):
+                        image: np.ndarray, min_score: float = 0.45, scale_factor: float = 1,
+                        transform: Optional[LetterboxTransform] = None):
         """
         Draw detections on the image.
 
@@ -72,25 +51,29 @@ class Detections:
             image (np.ndarray): Image to draw on.
             min_score (float): Minimum score threshold. Defaults to 0.45.
             scale_factor (float): Scale factor for coordinates. Defaults to 1.
+            transform (Optional[LetterboxTransform]): Transform of the preprocessing that produced the model input,
+                such as the one of InferenceBackend.get_letterbox_transform. Defaults to None (the image padded to a
+                square of its longest side).
 
         Returns:
             np.ndarray: Image with detections drawn.
         """
-        # Values used for scaling coords and removing padding
-        img_height, img_width = image.shape[:2]
-        size = max(img_height, img_width)
-        padding_length = int(abs(img_height - img_width) / 2)
+        # Get the transform used to map the boxes back to the image, without padding
+        if transform is None:
+            img_height, img_width = image.shape[:2]
+            size = max(img_height, img_width)
+            transform = LetterboxTransform((img_width, img_height), (size, size))
 
         # Get the required values from the image bounding boxes
-        boxes = image_bounding_boxes.get_xyxy()
+        boxes = transform.to_input_xyxy(image_bounding_boxes.get_xyxyn()).astype(int)
         classes = image_bounding_boxes.get_classes()
         scores = image_bounding_boxes.get_confidences()
         for idx in range(image_bounding_boxes.get_number_of_objects()):
             if scores[idx] >= min_score:
                 class_name = classes[idx]
                 color = colors.get(idx, UNUSED_COLOR)
-                scaled_box = cls.denormalize_and_remove_padding(boxes[idx], size, padding_length, img_height, img_width)
-                cls.draw_detection(image, scaled_box, class_name, scores[idx] * 100.0, color, scale_factor)
+                x1, y1, x2, y2 = boxes[idx].tolist()
+                cls.draw_detection(image, [y1, x1, y2, x2], class_name, scores[idx] * 100.0, color, scale_factor)
 
         return image
 
@@ -0,0 +1,257 @@
+from threading import Lock
+
+import cv2
+import numpy as np
+
+from utils import check_type
+
+
+class LetterboxTransform:
+    """
+    Custom class that represents the transform from an image to its letterboxed version at the model input size.
+    """
+
+    def __init__(self, input_size: tuple[int, int], model_size: tuple[int, int]):
+        """
+        Initialize the transform, computing the scale, the resized size and the offsets of the letterboxed image.
+
+        Args:
+            input_size (tuple[int, int]): Width and height of the input image.
+            model_size (tuple[int, int]): Width and height of the model input.
+        """
+        self.__input_size = input_size
+        self.__model_size = model_size
+
+        # Resize with unchanged aspect ratio, centering the resized image on the padded canvas
+        input_width, input_height = input_size
+        width, height = model_size
+        self.__scale = min(width / input_width, height / input_height)
+        self.__resized_size = (int(input_width * self.__scale), int(input_height * self.__scale))
+        self.__offsets = ((width - self.__resized_size[0]) // 2, (height - self.__resized_size[1]) // 2)
+
+    def get_input_size(self) -> tuple[int, int]:
+        """
+        Get the size of the input image.
+
+        Returns:
+            tuple[int, int]: Width and height of the input image.
+        """
+        return self.__input_size
+
+    def get_model_size(self) -> tuple[int, int]:
+        """
+        Get the size of the model input.
+
+        Returns:
+            tuple[int, int]: Width and height of the model input.
+        """
+        return self.__model_size
+
+    def get_scale(self) -> float:
+        """
+        Get the scale from the input image to the resized image.
+
+        Returns:
+            float: The scale.
+        """
+        return self.__scale
+
+    def get_resized_size(self) -> tuple[int, int]:
+        """
+        Get the size of the resized image inside the padded canvas.
+
+        Returns:
+            tuple[int, int]: Width and height of the resized image.
+        """
+        return self.__resized_size
+
+    def get_offsets(self) -> tuple[int, int]:
+        """
+        Get the offsets of the resized image inside the padded canvas.
+
+        Returns:
+            tuple[int, int]: Horizontal and vertical offsets.
+        """
+        return self.__offsets
+
+    def is_identity(self) -> bool:
+        """
+        Check if the input image already has the model input size.
+
+        Returns:
+            bool: True if the image is used without resizing it, False otherwise.
+        """
+        return self.__input_size == self.__model_size
+
+    def to_input_xyxy(self, xyxyn: np.ndarray) -> np.ndarray:
+        """
+        Map boxes normalized by the model input size back to pixels of the input image.
+
+        Args:
+            xyxyn (np.ndarray): Boxes with the normalized (x1, y1, x2, y2) coordinates, with shape (N, 4).
+
+        Returns:
+            np.ndarray: Boxes with the (x1, y1, x2, y2) coordinates in pixels of the input image.
+        """
+        width, height = self.__model_size
+        x_offset, y_offset = self.__offsets
+        input_width, input_height = self.__input_size
+
+        xyxy = (np.asarray(xyxyn, dtype=np.float32) * np.array((width, height, width, height), dtype=np.float32)
+                - np.array((x_offset, y_offset, x_offset, y_offset), dtype=np.float32)) / self.__scale
+        return np.clip(xyxy, 0, np.array((input_width, input_height, input_width, input_height), dtype=np.float32))
+
+
+class Letterboxer:
+    """
+    Class to resize images with unchanged aspect ratio using padding, at the model input size.
+
+    The transform and the padded canvases of each input and model sizes pair are cached. The images are resized
+    straight into the canvas, so the padding is only filled once. The canvases of a pair are reused in turns, so the
+    consumers must copy each letterboxed image before the next BUFFERS ones of the same size are letterboxed.
+    """
+    # Default padding color
+    PADDING_COLOR: tuple[int, int, int] = (0, 0, 0)
+
+    # Default interpolation, the same as the YOLO training letterbox
+    INTERPOLATION = cv2.INTER_LINEAR
+
+    # Default number of canvases of each sizes pair
+    BUFFERS = 8
+
+    def __init__(self, padding_color: tuple[int, int, int] = PADDING_COLOR, interpolation: int = INTERPOLATION,
+                 buffers: int = BUFFERS):
+        """
+        Initialize the letterboxer.
+
+        Args:
+            padding_color (tuple[int, int, int]): Color of the padding. Defaults to PADDING_COLOR.
+            interpolation (int): OpenCV interpolation used for resizing. Defaults to INTERPOLATION.
+            buffers (int): Number of canvases of each sizes pair. Defaults to BUFFERS.
+        """
+        # Check the type of padding color
+        check_type(padding_color, tuple)
+        self.__padding_color = padding_color
+
+        # Check the type of interpolation
+        check_type(interpolation, int)
+        self.__interpolation = interpolation
+
+        # Check the type of buffers
+        check_type(buffers, int)
+        if buffers <= 0:
+            raise ValueError(f"Buffers must be positive, got {buffers}.")
+        self.__buffers = buffers
+
+        # Initialize the cache, keyed by the input and model sizes
+        self.__init_cache()
+
+    def __init_cache(self) -> None:
+        """
+        Initialize the lock and the cached transforms and canvases.
+        """
+        # Initialize the lock, the images are letterboxed from the preprocessing pool threads
+        self.__lock = Lock()
+
+        # Cached transforms, canvases and next canvas index of each sizes pair
+        self.__transforms: dict[tuple[tuple[int, int], tuple[int, int]], LetterboxTransform] = dict()
+        self.__canvases: dict[tuple[tuple[int, int], tuple[int, int]], list[np.ndarray]] = dict()
+        self.__next_canvas: dict[tuple[tuple[int, int], tuple[int, int]], int] = dict()
+
+    def __getstate__(self) -> dict:
+        """
+        Get the state sent to the preprocessing processes, without the lock and the cache.
+        """
+        return {
+            'padding_color': self.__padding_color,
+            'interpolation': self.__interpolation,
+            'buffers': self.__buffers,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the state in the preprocessing processes, with an empty cache.
+        """
+        self.__padding_color = state['padding_color']
+        self.__interpolation = state['interpolation']
+        self.__buffers = state['buffers']
+        self.__init_cache()
+
+    def get_transform(self, input_size: tuple[int, int], model_size: tuple[int, int]) -> LetterboxTransform:
+        """
+        Get the cached transform of an input and model sizes pair, so the boxes can be mapped back without recomputing
+        it.
+
+        Args:
+            input_size (tuple[int, int]): Width and height of the input image.
+            model_size (tuple[int, int]): Width and height of the model input.
+
+        Returns:
+            LetterboxTransform: The transform.
+        """
+        key = (input_size, model_size)
+        with self.__lock:
+            transform = self.__transforms.get(key)
+            if transform is None:
+                transform = LetterboxTransform(input_size, model_size)
+                self.__transforms[key] = transform
+        return transform
+
+    def __get_canvas(self, transform: LetterboxTransform) -> np.ndarray:
+        """
+        Get the next canvas of an input and model sizes pair, allocating them the first time.
+
+        Args:
+            transform (LetterboxTransform): Transform of the sizes pair.
+
+        Returns:
+            np.ndarray: Canvas with the padding already filled.
+        """
+        key = (transform.get_input_size(), transform.get_model_size())
+        with self.__lock:
+            canvases = self.__canvases.get(key)
+            if canvases is None:
+                width, height = transform.get_model_size()
+                canvases = [np.full((height, width, 3), self.__padding_color, dtype=np.uint8)
+                            for _ in range(self.__buffers)]
+                self.__canvases[key] = canvases
+                self.__next_canvas[key] = 0
+
+            index = self.__next_canvas[key]
+            self.__next_canvas[key] = (index + 1) % self.__buffers
+        return canvases[index]
+
+    def letterbox(self, image, width: int, height: int) -> tuple[np.ndarray, LetterboxTransform]:
+        """
+        Resize an image with unchanged aspect ratio using padding. Images that already have the model input size, such
+        as the frames captured from the camera low resolution stream, are returned without resizing them.
+
+        Args:
+            image (Image|np.ndarray): Input image, with 3 or 4 channels.
+            width (int): Model input width.
+            height (int): Model input height.
+
+        Returns:
+            tuple[np.ndarray, LetterboxTransform]: Letterboxed image and its transform.
+        """
+        # Convert image to numpy array, without copying it if it's already one
+        image = np.asarray(image)
+        img_height, img_width = image.shape[:2]
+        transform = self.get_transform((img_width, img_height), (width, height))
+
+        # Skip the resize if the image already has the model input size
+        if transform.is_identity():
+            return np.ascontiguousarray(image[:, :, :3]), transform
+
+        # Resize the image straight into the canvas, the padding around it is left untouched
+        canvas = self.__get_canvas(transform)
+        new_img_width, new_img_height = transform.get_resized_size()
+        x_offset, y_offset = transform.get_offsets()
+        canvas_slice = canvas[y_offset:y_offset + new_img_height, x_offset:x_offset + new_img_width]
+        resized_image = cv2.resize(image[:, :, :3], (new_img_width, new_img_height), dst=canvas_slice,
+                                   interpolation=self.__interpolation)
+
+        # Copy the resized image if OpenCV allocated a new one instead of writing into the canvas slice
+        if not np.shares_memory(resized_image, canvas_slice):
+            canvas_slice[...] = resized_image
+        return canvas, transform
@@ -1,17 +1,15 @@
-import subprocess
-import os
 from multiprocessing import Event, RLock
 from threading import Thread
-from time import sleep
+from time import monotonic
 from typing import Optional
-import asyncio
 
 from utils import check_type
 from log import Logger
 from log.sub_logger import SubLogger
 from server import RealtimeTrackerServer 
 from serial_communication import SerialCommunication
-from rplidar.measure import Measure
+from rplidar.driver import RPLIDARDriver
+from rplidar.scan_frame import ScanFrame
 
 class RPLIDAR:
     """
@@ -32,12 +30,6 @@ class RPLIDAR:
     # Reading delay
     # READING_DELAY = 0.0001  
 
-    # Get the absolute path of the ultra_simple executable
-    ULTRA_SIMPLE_PATH = os.path.join(os.path.dirname(__file__), "ultra_simple")
-
-    # Process wait timeout
-    PROCESS_WAIT_TIMEOUT = 5
-
     def __init__(
             self,
             logger: Optional[Logger] = None,
@@ -90,14 +82,17 @@ class RPLIDAR:
         check_type(port, str)
         self.__port = port
 
-        # Distances dictionary
-        self.__distances_dict = dict()
+        # Scan frame filled in place by the reader
+        self.__scan_frame = ScanFrame()
+
+        # Last published scan frame
+        self.__last_scan_frame = None
 
         # Messages counter
         self.__messages_counter = 0
 
-        # Initialize the process
-        self.__process = None
+        # Initialize the driver
+        self.__driver = None
 
     def __log(self, message: str, log_to_file = True, print_to_console = True):
         """
@@ -114,135 +109,105 @@ class RPLIDAR:
         if print_to_console:
             print(f"{self.LOG_TAG}: {message}")
 
-    def __read_output(self):
+    def __publish_scan_frame(self) -> None:
         """
-        Read the output from the RPLIDAR process.
+        Publish an immutable snapshot of the current rotation.
         """
-        if not self.__process:
-            return
+        # Get the snapshot of the current rotation
+        scan_frame = self.__scan_frame.snapshot()
 
-        line = self.__process.stdout.readline()
-        if not line:
-            return 
-        
-        # Check if it's one of the first 6 messages
-        if self.__messages_counter < 6:
-            self.__messages_counter += 1
+        with self.__rlock:
+            self.__last_scan_frame = scan_frame
+
+        # Skip the empty rotations
+        if scan_frame.samples == 0:
             return
-        
-        # Strip the line to remove leading/trailing whitespace
-        parsed_line = line.strip()
 
-        # Split the line by spaces
-        parts = parsed_line.split()
+        # Put the scan frame in the server
+        if self.__server:
+            self.__server.publish(RealtimeTrackerServer.TAG_RPLIDAR_MEASURES, scan_frame.to_string())
 
-        # Ignore if there are not enough parts
-        if len(parts) < 6:
-            return
+        if self.__serial_communication and self.__serial_communication.is_open() and self.__serial_communication.has_started():
+        # if self.__serial_communication and self.__serial_communication.is_open():
+            self.__serial_communication.send_rplidar_scan(scan_frame.sequence, scan_frame.distances,
+                                                          scan_frame.qualities)
 
-        # Check if it's the last measure of a full rotation
-        full_rotation = len(parts) == 7
-        if full_rotation:
-            parts = parts[1:]
+        # Increment the messages counter
+        self.__messages_counter += 1
 
-        # Get the angle, distance and quality
-        angle = float(parts[1])
-        distance = float(parts[3])
-        quality = int(parts[5])
+    def __read_output(self):
+        """
+        Read the next batch of measures from the RPLIDAR driver and fill the scan frame.
+        """
+        if not self.__driver:
+            return
 
-        # Check the quality
-        if quality == 0:
+        scan = self.__driver.read_scan()
+        if scan is None:
             return
 
-        # Check if the distance is within the maximum limit
-        # if distance < 0 or distance > self.MAX_DISTANCE_LIMIT:
-        #    return
-        
-        # Floor the angle to a float with no decimal places
-        angle = round(angle, 0)
-
-        # Check if the angle is already in the distances dictionary
-        if angle in self.__distances_dict:
-            # If it is, update the distance and quality
-            self.__distances_dict[angle].distance = distance
-            self.__distances_dict[angle].quality = quality
-        else:
-            # If it is not, add the measure to the distances dictionary
-            self.__distances_dict[angle] = Measure(angle, distance, quality)
+        # Get the angles, distances, qualities and start of scan flags
+        angles, distances, qualities, start_flags = scan
+        timestamp = monotonic()
 
-        # Get the measure string representation
-        measure_str = str(self.__distances_dict[angle])
+        # Split the batch at the start of each new rotation
+        start = 0
+        for end in start_flags.nonzero()[0].tolist():
+            self.__scan_frame.update(angles[start:end], distances[start:end], qualities[start:end], timestamp)
+            self.__publish_scan_frame()
+            start = end
 
-        # Put the parsed line in the server
-        if self.__server and self.__server.is_running():
-            asyncio.run(self.__server.broadcast_rplidar_measures(measure_str))
+        self.__scan_frame.update(angles[start:], distances[start:], qualities[start:], timestamp)
 
-        if self.__serial_communication and self.__serial_communication.is_open() and self.__serial_communication.has_started():
-        # if self.__serial_communication and self.__serial_communication.is_open():
-            self.__serial_communication.send_rplidar_measures(measure_str)
-        
-        # Increment the messages counter
-        self.__messages_counter += 1
+    def get_last_scan_frame(self) -> ScanFrame | None:
+        """
+        Get the last full rotation published by the RPLIDAR.
 
-        # Add a small delay to avoid busy-waiting and yield CPU
-        # sleep(self.READING_DELAY)
+        Returns:
+            ScanFrame|None: Read-only scan frame, or None if no rotation has been completed yet.
+        """
+        with self.__rlock:
+            return self.__last_scan_frame
 
     def __loop(self):
         """
-        Loop to read the output from the RPLIDAR process.
+        Loop to read the measures from the RPLIDAR.
         """
-        # Log the start of the RPLIDAR process
-        self.__log("Starting RPLIDAR process...")
-
-        command = [
-            self.ULTRA_SIMPLE_PATH,
-            "--channel",
-            "--serial",
-            self.__port,
-            str(self.__baudrate)
-        ]
+        # Log the start of the RPLIDAR driver
+        self.__log("Starting RPLIDAR driver...")
+
+        # Connect to the RPLIDAR and start the scan
+        self.__driver = RPLIDARDriver(self.__port, self.__baudrate)
         try:
-            self.__process = subprocess.Popen(
-                command, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                text=True, # Decode output as text
-                bufsize=1, # Line-buffered output
-                universal_newlines=True # Handles different newline characters
-            )
-
-        except FileNotFoundError:
-            raise ValueError(f"The RPLIDAR ultra_simple executable was not found at {self.ULTRA_SIMPLE_PATH}. Please ensure it is installed correctly.")
-        
+            self.__driver.connect()
+            self.__driver.start_scan()
+
         except Exception as e:
-            raise RuntimeError(f"An error occurred while starting the RPLIDAR process: {e}")
+            self.__driver.disconnect()
+            raise RuntimeError(f"An error occurred while starting the RPLIDAR scan: {e}")
+
+        # Read the measures in a loop until the stop event is set
+        try:
+            while not self.__stop_event.is_set():
+                self.__read_output()
 
-        # Read the output in a loop until the process ends or stop event is set
-        while self.__process.poll() is None and not self.__stop_event.is_set():
-            self.__read_output()
+        finally:
+            # Stop the scan and close the serial port
+            self.__driver.disconnect()
 
     def __stop(self):
         """
-        Stop the RPLIDAR process.
+        Stop the RPLIDAR scan.
         """
         with self.__rlock:
             if self.is_stopped():
                 return
 
-            # Set the stop event
+            # Set the stop event, the reading loop stops the scan and closes the serial port
             self.__stop_event.set()
 
-            # Ensure the process is cleaned up even if an error occurs
-            if self.__process and self.__process.poll() is None:
-                self.__log("Ensuring process is terminated in finally block...")
-                self.__process.terminate()
-                self.__process.wait(timeout=self.PROCESS_WAIT_TIMEOUT)
-                if self.__process.poll() is None:
-                    self.__process.kill()
-                self.__process.wait()
-
         # Log the stop message
-        self.__log("RPLIDAR process stopped.")
+        self.__log("RPLIDAR scan stopped.")
 
     def create_thread(self):
         """
@@ -45,7 +45,7 @@ if __name__ == "__main__":
 
         # Create an instance of SerialCommunication if serial argument is provided
         if arg_serial:
-            serial = SerialCommunication(logger=logger, server=server)
+            serial = SerialCommunication(logger=logger, server=server, ping_period=SerialCommunication.PING_PERIOD)
 
             # Start the serial communication
             serial.create_threads()
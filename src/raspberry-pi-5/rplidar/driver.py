@@ -0,0 +1,275 @@
+from typing import Optional
+
+import numpy as np
+from serial import Serial, SerialException
+
+from utils import check_type
+
+
+class RPLIDARDriver:
+    """
+    Pure Python driver for the SLAMTEC RPLIDAR binary protocol.
+
+    It opens the serial port with pyserial, starts a standard scan and decodes the scan response packets in batches
+    into NumPy arrays.
+    """
+    # Request start flag
+    SYNC_BYTE = 0xA5
+
+    # Response descriptor start flags
+    RESPONSE_SYNC_BYTE_1 = 0xA5
+    RESPONSE_SYNC_BYTE_2 = 0x5A
+    RESPONSE_DESCRIPTOR_LENGTH = 7
+
+    # Commands
+    CMD_STOP = 0x25
+    CMD_RESET = 0x40
+    CMD_SCAN = 0x20
+    CMD_GET_INFO = 0x50
+    CMD_GET_HEALTH = 0x52
+
+    # Scan response data type and packet length
+    SCAN_DATA_TYPE = 0x81
+    SCAN_PACKET_LENGTH = 5
+
+    # Scan packet layout: start flag and quality, check bit and angle, distance
+    SCAN_PACKET_DTYPE = np.dtype([('quality', 'u1'), ('angle', '<u2'), ('distance', '<u2')])
+
+    # Fixed point factors
+    ANGLE_FACTOR = 64.0
+    DISTANCE_FACTOR = 4.0
+
+    # Serial read timeout
+    READ_TIMEOUT = 1.0
+
+    # Number of packets to read at once
+    READ_PACKETS = 128
+
+    # Delay required by the device after a stop or reset request
+    STOP_DELAY = 0.01
+    RESET_DELAY = 0.5
+
+    def __init__(self, port: str, baudrate: int, timeout: float = READ_TIMEOUT, read_packets: int = READ_PACKETS):
+        """
+        Initialize the RPLIDAR driver.
+
+        Args:
+            port (str): Serial port of the RPLIDAR.
+            baudrate (int): Baud rate for the serial communication.
+            timeout (float): Serial read timeout in seconds.
+            read_packets (int): Number of scan packets to read at once.
+        """
+        # Initialize the serial port first, so the destructor works if a check fails
+        self.__serial = None
+
+        # Check the type of the port
+        check_type(port, str)
+        self.__port = port
+
+        # Check the type of the baudrate
+        check_type(baudrate, int)
+        self.__baudrate = baudrate
+
+        # Check the type of the timeout
+        check_type(timeout, (int, float))
+        self.__timeout = timeout
+
+        # Check the type of the number of packets to read at once
+        check_type(read_packets, int)
+        self.__read_size = read_packets * self.SCAN_PACKET_LENGTH
+
+        # Initialize the buffer for the bytes that are not yet decoded
+        self.__buffer = bytearray()
+
+        # Initialize the scanning flag
+        self.__scanning = False
+
+    def connect(self) -> None:
+        """
+        Open the serial port of the RPLIDAR.
+        """
+        if self.is_connected():
+            return
+
+        try:
+            self.__serial = Serial(self.__port, self.__baudrate, timeout=self.__timeout)
+
+        except SerialException as e:
+            raise RuntimeError(f"Error opening RPLIDAR serial port {self.__port}: {e}")
+
+        # Keep DTR low, some models use it to enable the motor
+        self.__serial.dtr = False
+
+    def disconnect(self) -> None:
+        """
+        Stop the scan and close the serial port of the RPLIDAR.
+        """
+        if not self.is_connected():
+            return
+
+        # Stop the scan
+        self.stop_scan()
+
+        # Close the serial port
+        self.__serial.close()
+        self.__serial = None
+
+    def is_connected(self) -> bool:
+        """
+        Check if the serial port of the RPLIDAR is open.
+
+        Returns:
+            bool: True if the serial port is open, False otherwise.
+        """
+        return self.__serial is not None and self.__serial.is_open
+
+    def is_scanning(self) -> bool:
+        """
+        Check if the RPLIDAR is scanning.
+
+        Returns:
+            bool: True if the RPLIDAR is scanning, False otherwise.
+        """
+        return self.__scanning
+
+    def __send_command(self, command: int) -> None:
+        """
+        Send a command without payload to the RPLIDAR.
+
+        Args:
+            command (int): Command to send.
+        """
+        self.__serial.write(bytes((self.SYNC_BYTE, command)))
+
+    def __read_response_descriptor(self) -> tuple[int, int]:
+        """
+        Read the response descriptor sent by the RPLIDAR after a request.
+
+        Returns:
+            tuple[int, int]: Response length and data type.
+        """
+        descriptor = self.__serial.read(self.RESPONSE_DESCRIPTOR_LENGTH)
+        if len(descriptor) != self.RESPONSE_DESCRIPTOR_LENGTH:
+            raise RuntimeError("Timeout while reading the RPLIDAR response descriptor.")
+
+        if descriptor[0] != self.RESPONSE_SYNC_BYTE_1 or descriptor[1] != self.RESPONSE_SYNC_BYTE_2:
+            raise RuntimeError(f"Invalid RPLIDAR response descriptor: {descriptor.hex()}")
+
+        # The lowest 30 bits are the response length, the highest 2 bits are the send mode
+        length = int.from_bytes(descriptor[2:6], 'little') & 0x3FFFFFFF
+        return length, descriptor[6]
+
+    def start_scan(self) -> None:
+        """
+        Start a standard scan.
+        """
+        if self.__scanning:
+            return
+
+        # Stop any previous scan and discard the pending bytes
+        self.stop_scan()
+
+        # Send the scan request
+        self.__send_command(self.CMD_SCAN)
+
+        # Check the response descriptor
+        length, data_type = self.__read_response_descriptor()
+        if length != self.SCAN_PACKET_LENGTH or data_type != self.SCAN_DATA_TYPE:
+            raise RuntimeError(f"Unexpected RPLIDAR scan response: length {length}, data type {data_type:#x}")
+
+        # Clear the buffer
+        self.__buffer.clear()
+        self.__scanning = True
+
+    def stop_scan(self) -> None:
+        """
+        Stop the scan.
+        """
+        if not self.is_connected():
+            return
+
+        # Send the stop request
+        self.__send_command(self.CMD_STOP)
+        self.__serial.flush()
+
+        # Wait for the device and discard the remaining scan bytes
+        self.__serial.timeout = self.STOP_DELAY
+        while self.__serial.read(self.__read_size):
+            pass
+        self.__serial.timeout = self.__timeout
+        self.__serial.reset_input_buffer()
+
+        # Clear the buffer
+        self.__buffer.clear()
+        self.__scanning = False
+
+    @classmethod
+    def decode(cls, data: bytes | bytearray | memoryview) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Decode the scan packets at the start of the given bytes.
+
+        Decoding stops at the first invalid packet, so the caller can skip one byte to synchronize again.
+
+        Args:
+            data (bytes|bytearray|memoryview): Raw scan response bytes.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]: Angles in degrees, distances in millimeters,
+            qualities, start of scan flags and the number of bytes consumed.
+        """
+        # Get the packets that are complete
+        n = len(data) // cls.SCAN_PACKET_LENGTH
+        packets = np.frombuffer(data, dtype=cls.SCAN_PACKET_DTYPE, count=n)
+
+        # Check the start flag and its inverse, and the check bit
+        start_flags = packets['quality'] & 0x01
+        valid = ((start_flags ^ ((packets['quality'] >> 1) & 0x01)) == 1) & ((packets['angle'] & 0x01) == 1)
+
+        # Keep the packets before the first invalid one
+        if not valid.all():
+            n = int(np.argmin(valid))
+            packets = packets[:n]
+            start_flags = start_flags[:n]
+
+        # Convert the fixed point values
+        angles = (packets['angle'] >> 1) / cls.ANGLE_FACTOR
+        distances = packets['distance'] / cls.DISTANCE_FACTOR
+        qualities = packets['quality'] >> 2
+
+        return angles, distances, qualities, start_flags.astype(bool), n * cls.SCAN_PACKET_LENGTH
+
+    def read_scan(self) -> Optional[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Read the next batch of scan packets.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]|None: Angles in degrees, distances in millimeters,
+            qualities and start of scan flags, or None if no complete packet was read before the timeout.
+        """
+        if not self.__scanning:
+            raise RuntimeError("RPLIDAR scan has not been started.")
+
+        # Read the available bytes, waiting for at least one packet
+        data = self.__serial.read(max(self.__serial.in_waiting, self.SCAN_PACKET_LENGTH))
+        self.__buffer += data
+
+        while len(self.__buffer) >= self.SCAN_PACKET_LENGTH:
+            angles, distances, qualities, start_flags, consumed = self.decode(self.__buffer)
+
+            # Synchronize again by skipping one byte if the first packet is invalid
+            if consumed == 0:
+                del self.__buffer[0]
+                continue
+
+            # Remove the decoded bytes from the buffer
+            del self.__buffer[:consumed]
+
+            return angles, distances, qualities, start_flags
+
+        return None
+
+    def __del__(self):
+        """
+        Destructor to close the serial port if it's open.
+        """
+        self.disconnect()
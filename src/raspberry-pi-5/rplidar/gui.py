@@ -1,6 +1,6 @@
 from argparse import ArgumentParser
 import pygame
-import math
+import numpy as np
 import asyncio
 from threading import Thread
 from websockets import connect
@@ -8,7 +8,7 @@ from websockets import connect
 from args import Args
 from server import RealtimeTrackerServer
 from rplidar import RPLIDAR
-from rplidar.measure import Measure
+from rplidar.scan_frame import ScanFrame
 
 class App:
     """
@@ -63,10 +63,16 @@ class App:
         self.__clock = pygame.time.Clock()
         self.__running = True
 
-        # Initialize the measures and points-related objects
-        self.__measures = [Measure(angle*1.0, 0.0, 0) for angle in range(361)]
-        self.__previous_measures = {}
-        self.__point_positions = {}
+        # Initialize the distances and points-related arrays
+        self.__distances = np.zeros(ScanFrame.BINS, dtype=np.float32)
+        self.__previous_distances = np.full(ScanFrame.BINS, np.nan, dtype=np.float32)
+        self.__point_positions = np.zeros((ScanFrame.BINS, 2), dtype=np.int32)
+        self.__has_point = np.zeros(ScanFrame.BINS, dtype=bool)
+
+        # Adjust angles to match the coordinate system
+        radian_angles = np.radians((np.arange(ScanFrame.BINS) + 270) % 360)
+        self.__cos_angles = np.cos(radian_angles) * self.MAX_DISTANCE_RADIUS_FACTOR
+        self.__sin_angles = np.sin(radian_angles) * self.MAX_DISTANCE_RADIUS_FACTOR
 
         # Initialize the WebSocket server connection parameters
         self.__ip = ip
@@ -95,35 +101,24 @@ class App:
 
     def update_points(self):
         """
-        Updates the positions of the points based on the current measures.
+        Updates the positions of the points based on the current distances.
         This method calculates the positions of the points based on the angle and distance
-        of each measure, and stores them in the __point_positions dictionary.
+        of each angular bin, and stores them in the __point_positions array.
         """
-        for measure in self.__measures:  
-            prev = self.__previous_measures.get(measure.angle)
-            if prev and abs(prev.distance - measure.distance) < self.DISTANCE_MINIMUM_DIFFERENCE:
-                continue
-            self.__previous_measures[measure.angle] = measure
-
-            # Adjust angle to match the coordinate system
-            radian_angle = math.radians(int(measure.angle + 270) % 360)
-            x = int(self.CENTER_X + measure.distance * math.cos(radian_angle) * self.MAX_DISTANCE_RADIUS_FACTOR)
-            y = int(self.CENTER_Y + measure.distance * math.sin(radian_angle) * self.MAX_DISTANCE_RADIUS_FACTOR)
-            self.__point_positions[measure.angle] = (x, y)
+        # Update only the bins whose distance changed enough, or that were never drawn
+        changed = ~(np.abs(self.__previous_distances - self.__distances) < self.DISTANCE_MINIMUM_DIFFERENCE)
+        self.__previous_distances[changed] = self.__distances[changed]
 
-        """
-        # Optionally, remove old points
-        current_angles = set(m.angle for m in self.__measures)
-        for angle in list(self.__point_positions):
-            if angle not in current_angles:
-                del self.__point_positions[angle]
-        """
+        distances = self.__distances[changed]
+        self.__point_positions[changed, 0] = (self.CENTER_X + distances * self.__cos_angles[changed]).astype(np.int32)
+        self.__point_positions[changed, 1] = (self.CENTER_Y + distances * self.__sin_angles[changed]).astype(np.int32)
+        self.__has_point |= changed
 
     def draw_points(self):
         """
         Draws the points on the __screen based on the current measures.
         """
-        for pos in self.__point_positions.values():
+        for pos in self.__point_positions[self.__has_point].tolist():
             # Draw the point
             pygame.draw.circle(self.__screen, self.POINT_COLOR, pos, self.POINT_RADIUS)
 
@@ -151,9 +146,9 @@ class App:
 
     async def ws_listener(self):
         """
-        Asynchronously listens for messages from the WebSocket server and updates the measures.
-        This method connects to the WebSocket server and processes incoming messages,
-        updating the measures accordingly.
+        Asynchronously listens for messages from the WebSocket server and updates the distances.
+        This method connects to the WebSocket server and processes the incoming full rotations,
+        updating the distances accordingly.
         """
 
         print(f"Connecting to WebSocket server at {self.__url}...")
@@ -162,12 +157,14 @@ class App:
                 msg = await ws.recv()
                 parts = msg.split(RealtimeTrackerServer.TAG_SEPARATOR)
                 if parts[0] == RealtimeTrackerServer.TAG_RPLIDAR_MEASURES:
-                    measure = Measure.from_string(parts[1])
-                    if not measure:
-                        print(f"Invalid measure received: {parts[1]}")
+                    scan_frame = ScanFrame.from_string(parts[1])
+                    if not scan_frame:
+                        print(f"Invalid scan frame received: {parts[1]}")
                         continue
-                    angle_idx = int(measure.angle)
-                    self.__measures[angle_idx] = measure
+
+                    # Update the distances of the bins measured in this rotation
+                    valid = scan_frame.qualities > 0
+                    self.__distances[valid] = scan_frame.distances[valid]
 
 if __name__ == "__main__":
     parser = ArgumentParser(
@@ -0,0 +1,200 @@
+from typing import Optional
+
+import numpy as np
+
+from rplidar.measure import Measure
+from utils import check_type
+
+
+class ScanFrame:
+    """
+    Represents a full 360 degrees rotation from the RPLIDAR.
+
+    It keeps preallocated arrays for the distance, quality and timestamp of each angular bin. The reader fills it in
+    place and publishes an immutable snapshot on every full rotation.
+    """
+    # Number of angular bins, one per degree
+    BINS = 360
+
+    def __init__(self, bins: int = BINS):
+        """
+        Initialize the ScanFrame instance.
+
+        Args:
+            bins (int): Number of angular bins.
+        """
+        # Check the type of the number of bins
+        check_type(bins, int)
+        self.__bins = bins
+
+        # Preallocate the arrays
+        self.__distances = np.zeros(bins, dtype=np.float32)
+        self.__qualities = np.zeros(bins, dtype=np.uint8)
+        self.__timestamps = np.zeros(bins, dtype=np.float64)
+
+        # Initialize the rotation sequence number and the samples counter of the current rotation
+        self.__sequence = 0
+        self.__samples = 0
+
+    def __str__(self):
+        """
+        String representation of the valid measures of the scan frame.
+        """
+        return self.to_string()
+
+    def __repr__(self):
+        """
+        String representation of the ScanFrame object for debugging.
+        """
+        return f"ScanFrame(sequence={self.__sequence}, samples={self.__samples}, bins={self.__bins})"
+
+    @property
+    def bins(self) -> int:
+        """
+        Get the number of angular bins.
+
+        Returns:
+            int: Number of angular bins.
+        """
+        return self.__bins
+
+    @property
+    def distances(self) -> np.ndarray:
+        """
+        Get the distance of each angular bin in millimeters.
+
+        Returns:
+            np.ndarray: Distances array.
+        """
+        return self.__distances
+
+    @property
+    def qualities(self) -> np.ndarray:
+        """
+        Get the quality of each angular bin.
+
+        Returns:
+            np.ndarray: Qualities array.
+        """
+        return self.__qualities
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        Get the timestamp of the last update of each angular bin.
+
+        Returns:
+            np.ndarray: Timestamps array.
+        """
+        return self.__timestamps
+
+    @property
+    def sequence(self) -> int:
+        """
+        Get the rotation sequence number.
+
+        Returns:
+            int: Rotation sequence number.
+        """
+        return self.__sequence
+
+    @property
+    def samples(self) -> int:
+        """
+        Get the number of samples received in the current rotation.
+
+        Returns:
+            int: Number of samples.
+        """
+        return self.__samples
+
+    def update(self, angles: np.ndarray, distances: np.ndarray, qualities: np.ndarray, timestamp: float) -> None:
+        """
+        Update the angular bins in place with a batch of samples. Samples with no quality are ignored.
+
+        Args:
+            angles (np.ndarray): Angles in degrees.
+            distances (np.ndarray): Distances in millimeters.
+            qualities (np.ndarray): Qualities.
+            timestamp (float): Timestamp of the batch.
+        """
+        # Ignore the samples with no quality
+        valid = qualities > 0
+
+        # Round the angles to the nearest bin
+        bins = np.rint(angles[valid] * (self.__bins / 360.0)).astype(np.intp) % self.__bins
+
+        # Update the bins
+        self.__distances[bins] = distances[valid]
+        self.__qualities[bins] = qualities[valid]
+        self.__timestamps[bins] = timestamp
+        self.__samples += len(bins)
+
+    def snapshot(self) -> 'ScanFrame':
+        """
+        Get an immutable snapshot of the current rotation and start the next one.
+
+        Returns:
+            ScanFrame: Read-only copy of the scan frame.
+        """
+        snapshot = ScanFrame.__new__(ScanFrame)
+        snapshot.__bins = self.__bins
+        snapshot.__distances = self.__distances.copy()
+        snapshot.__qualities = self.__qualities.copy()
+        snapshot.__timestamps = self.__timestamps.copy()
+        snapshot.__sequence = self.__sequence
+        snapshot.__samples = self.__samples
+
+        # Make the snapshot arrays read-only
+        for array in (snapshot.__distances, snapshot.__qualities, snapshot.__timestamps):
+            array.flags.writeable = False
+
+        # Start the next rotation
+        self.__sequence += 1
+        self.__samples = 0
+
+        return snapshot
+
+    def to_string(self) -> str:
+        """
+        Convert the valid angular bins to the measures string representation.
+
+        Returns:
+            str: Measures with angle, distance and quality, separated as in Measure.
+        """
+        angles = np.flatnonzero(self.__qualities)
+        return Measure.MEASURES_SEPARATOR.join(
+            f"{angle}{Measure.ATTRIBUTES_SEPARATOR}{distance:.1f}{Measure.ATTRIBUTES_SEPARATOR}{quality}"
+            for angle, distance, quality in zip(angles.tolist(), self.__distances[angles].tolist(),
+                                                self.__qualities[angles].tolist())
+        )
+
+    @classmethod
+    def from_string(cls, measures_str: str, bins: int = BINS) -> Optional['ScanFrame']:
+        """
+        Create a ScanFrame object from the measures string representation.
+
+        Args:
+            measures_str (str): String representation of the measures.
+            bins (int): Number of angular bins.
+
+        Returns:
+            ScanFrame|None: ScanFrame object created from the string, or None if the string is invalid.
+        """
+        try:
+            # Check the type of measures_str
+            check_type(measures_str, str)
+
+            # Parse the measures as an N x 3 array
+            values = np.array(
+                [measure_str.split(Measure.ATTRIBUTES_SEPARATOR)[:3]
+                 for measure_str in measures_str.split(Measure.MEASURES_SEPARATOR) if measure_str],
+                dtype=np.float64
+            ).reshape(-1, 3)
+
+        except ValueError:
+            return None
+
+        frame = cls(bins)
+        frame.update(values[:, 0], values[:, 1], values[:, 2].astype(np.uint8), 0.0)
+        return frame
@@ -1,19 +1,23 @@
-import time
+import json
+from collections import deque
 from multiprocessing import Event, Queue, RLock
 from multiprocessing.synchronize import Event as EventCls
 from threading import Thread
 from typing import Optional
-from time import sleep
-import asyncio
+from time import sleep, monotonic, perf_counter_ns
 
+import numpy as np
 from serial import Serial, SerialException
 
 from camera.images_queue import ImagesQueue
 from log import Logger
 from log.sub_logger import SubLogger
 from serial_communication.message import Message
+from serial_communication.protocol import Protocol
+from serial_communication.scan_message import ScanMessage
 from server import RealtimeTrackerServer
 from utils import check_type
+from utils.latency_histogram import LatencyHistogram
 from env import Env
 
 class SerialCommunication:
@@ -32,8 +36,27 @@ class SerialCommunication:
     # Raspberry PI Pico alternative port
     RASPBERRY_PI_PICO_ALT_PORT = '/dev/ttyACM1'
 
-    # Message delay
-    DELAY = 0.01
+    # Blocking read timeout, it bounds the time to notice the stop event
+    READ_TIMEOUT = 0.1
+
+    # Maximum number of bytes to read at once
+    READ_SIZE = 4096
+
+    # Maximum number of bytes to write at once
+    WRITE_SIZE = 4096
+
+    # Bits sent per byte with 8N1 framing: start bit, 8 data bits and stop bit
+    BITS_PER_BYTE = 10
+
+    # Period between the link health pings, used when they are enabled
+    PING_PERIOD = 1.0
+
+    # Ping and pong content separator. The pong echoes the ping sequence number and timestamp, followed by the last
+    # RPLIDAR sequence number consumed by the Pico (-1 if none) and the number of invalid frames it discarded
+    PING_SEPARATOR = ','
+
+    # Number of RPLIDAR sequence numbers whose send time is kept, it matches the sequence number range
+    RPLIDAR_SEQUENCES = 1 << 16
 
     # Encode
     ENCODE = 'utf-8'
@@ -44,11 +67,20 @@ class SerialCommunication:
     TYPE_RPLIDAR = "rplidar"
     TYPE_DEBUG = 'debug'
     TYPE_STATUS = 'status'
+    TYPE_ECHO = 'echo'
+    TYPE_PING = 'ping'
+    TYPE_PONG = 'pong'
 
     # Types of Status
     TYPE_STATUS_ON = 'on'
     TYPE_STATUS_OFF = 'off'
 
+    # Types of messages sent before the others, they are never dropped
+    PRIORITY_TYPES = (TYPE_STATUS, TYPE_INFERENCE, TYPE_PING)
+
+    # Types of messages where only the newest one is sent, each RPLIDAR rotation supersedes the previous one
+    COALESCED_TYPES = (TYPE_RPLIDAR,)
+
     def __init__(
         self,
         logger: Optional[Logger] = None,
@@ -56,7 +88,10 @@ class SerialCommunication:
         server: Optional[RealtimeTrackerServer] = None,
         port: Optional[str] = RASPBERRY_PI_PICO_PORT,
         alt_port: Optional[str] = RASPBERRY_PI_PICO_ALT_PORT,
-        baudrate: Optional[int] = RASPBERRY_PI_PICO_BAUDRATE
+        baudrate: Optional[int] = RASPBERRY_PI_PICO_BAUDRATE,
+        bytes_per_second: Optional[float] = None,
+        framed: bool = False,
+        ping_period: float = 0.0
     ):
         """
         Initialize the serial communication class.
@@ -68,6 +103,9 @@ class SerialCommunication:
             alt_port (str): Alternative serial port to use for communication. Default is None.
             baudrate (int): Baud rate for the serial communication. Default is 115200.
             server (RealtimeTrackerServer): Server instance for sending messages to the server. Default is None.
+            bytes_per_second (float): Outgoing bytes per second budget. Default is derived from the baud rate.
+            framed (bool): Whether to use the COBS framed binary protocol instead of the text messages.
+            ping_period (float): Period between the link health pings in seconds, 0 to disable them.
         """
         # Create the reentrant lock
         self.__rlock = RLock()
@@ -113,9 +151,13 @@ class SerialCommunication:
         # Create the queues closed event
         self.__queues_closed_event = Event()
 
-        # Initialize the incoming and outgoing messages queues
+        # Initialize the incoming messages queue
         self.__incoming_messages_queue = None
-        self.__outgoing_messages_queue = None
+
+        # Create the priority and regular outgoing messages queues, and the newest message of each coalesced type
+        self.__priority_outgoing_messages = deque()
+        self.__outgoing_messages = deque()
+        self.__latest_outgoing_messages = {}
 
         # Initialize the last incoming message
         self.__last_incoming_message = None
@@ -128,6 +170,46 @@ class SerialCommunication:
         check_type(baudrate, int)
         self.__baudrate = baudrate
 
+        # Set the outgoing bytes per second budget
+        if bytes_per_second is None:
+            bytes_per_second = baudrate / self.BITS_PER_BYTE
+        check_type(bytes_per_second, (int, float))
+        self.__bytes_per_second = bytes_per_second
+
+        # Initialize the time when the next batch can be sent without exceeding the budget
+        self.__next_write_time = 0.0
+
+        # Set the framed binary protocol flag
+        check_type(framed, bool)
+        self.__framed = framed
+
+        # Initialize the corrupted incoming frames counter
+        self.__corrupted_frames = 0
+
+        # Initialize the outgoing counters
+        self.__bytes_sent = 0
+        self.__batches_sent = 0
+        self.__messages_sent = 0
+        self.__coalesced_messages = 0
+
+        # Check the type of the ping period
+        check_type(ping_period, (int, float))
+        self.__ping_period = ping_period
+
+        # Initialize the link health counters
+        self.__pings_sent = 0
+        self.__pongs_received = 0
+        self.__lost_pings = 0
+        self.__last_pong_sequence = -1
+        self.__invalid_frames = 0
+
+        # Create the round-trip time and RPLIDAR sample age histograms
+        self.__round_trip_times = LatencyHistogram()
+        self.__rplidar_ages = LatencyHistogram()
+
+        # Preallocate the send time of each RPLIDAR sequence number
+        self.__rplidar_sent_ns = np.zeros(self.RPLIDAR_SEQUENCES, dtype=np.int64)
+
         # Initialize the serial port
         self.__serial = None
 
@@ -204,16 +286,18 @@ class SerialCommunication:
             # Clear the last incoming message
             self.__last_incoming_message = None
 
-            # Create the incoming and outgoing messages queues
+            # Create the incoming messages queue
             self.__incoming_messages_queue = Queue()
-            self.__outgoing_messages_queue = Queue()
+
+            # Clear the outgoing messages
+            self.__clear_outgoing_messages()
 
             # Clear queues closed event
             self.__queues_closed_event.clear()
 
             # Open the serial port
             try:
-                self.__serial = Serial(self.__port, self.__baudrate)
+                self.__serial = Serial(self.__port, self.__baudrate, timeout=self.READ_TIMEOUT)
 
             except SerialException as e:
                 if not self.__alt_port:
@@ -221,7 +305,7 @@ class SerialCommunication:
                 else:
                     # Try to open the alternative port
                     try:
-                        self.__serial = Serial(self.__alt_port, self.__baudrate)
+                        self.__serial = Serial(self.__alt_port, self.__baudrate, timeout=self.READ_TIMEOUT)
 
                     except SerialException as alt_e:
                         raise RuntimeError(f"Error opening serial port: {alt_e}")
@@ -259,7 +343,7 @@ class SerialCommunication:
 
             # Close the queues
             self.__incoming_messages_queue.close()
-            self.__outgoing_messages_queue.close()
+            self.__clear_outgoing_messages()
 
             # Set the queues closed event
             self.__queues_closed_event.set()
@@ -274,12 +358,17 @@ class SerialCommunication:
         Args:
             message (Message): The message to put in the queue.
         """
+        # The pongs are consumed by the link health instrumentation
+        if message.type == self.TYPE_PONG:
+            self.__handle_pong(message)
+            return
+
         with self.__rlock:
             if self.is_closed():
                 return
                 
             # Put the message in the queue
-            self.__outgoing_messages_queue.put(message)
+            self.__incoming_messages_queue.put(message)
     
             # Set the last incoming message
             self.__last_incoming_message = message
@@ -293,7 +382,7 @@ class SerialCommunication:
 
         # If the server is set, send the message to the server
         if self.__server:
-            self.__server.send_serial_incoming_message(str(message))
+            self.__server.publish(RealtimeTrackerServer.TAG_SERIAL_INCOMING_MESSAGE, str(message))
 
     def receive_message(self) -> Message | None:
         """
@@ -343,8 +432,15 @@ class SerialCommunication:
             if self.is_closed():
                 return
 
-            # Put the message in the queue
-            self.__outgoing_messages_queue.put(message)
+            # Put the message in its queue, or replace the pending one if its type is coalesced
+            if message.type in self.COALESCED_TYPES:
+                if message.type in self.__latest_outgoing_messages:
+                    self.__coalesced_messages += 1
+                self.__latest_outgoing_messages[message.type] = message
+            elif message.type in self.PRIORITY_TYPES:
+                self.__priority_outgoing_messages.append(message)
+            else:
+                self.__outgoing_messages.append(message)
 
             # Set the pending outgoing message event
             self.__pending_outgoing_message_event.set()
@@ -352,56 +448,287 @@ class SerialCommunication:
         # Log
         # self.__log(f"Sending message: {message}", print_to_console=False)
 
-    def send_rplidar_measures(self, measures_str: str) -> None:
+    def send_rplidar_scan(self, sequence: int, distances: np.ndarray, qualities: np.ndarray) -> None:
         """
-        Put RPLIDAR measures in the outgoing messages queue.
+        Put the RPLIDAR full rotation in the outgoing messages queue as a binary frame.
 
         Args:
-            measures_str (str): The measures string to put in the queue.
+            sequence (int): Rotation sequence number.
+            distances (np.ndarray): Distance of each angular bin in millimeters.
+            qualities (np.ndarray): Quality of each angular bin.
         """
-        # Create a message with the RPLIDAR measures type
-        message = Message(self.TYPE_RPLIDAR, measures_str)
+        # Create a binary scan message
+        message = ScanMessage(sequence, distances, qualities)
+
+        # Keep its send time to get the age of the RPLIDAR samples consumed by the Pico
+        self.__rplidar_sent_ns[message.sequence % self.RPLIDAR_SEQUENCES] = perf_counter_ns()
 
         # Put the message in the outgoing messages queue
         self._send_message(message)
 
-    def __get_outgoing_message(self) -> str | None:
+    def __clear_outgoing_messages(self) -> None:
+        """
+        Discard all the pending outgoing messages.
+        """
+        with self.__rlock:
+            self.__priority_outgoing_messages.clear()
+            self.__outgoing_messages.clear()
+            self.__latest_outgoing_messages.clear()
+
+    def __get_outgoing_queue_depth(self) -> int:
+        """
+        Get the number of pending outgoing messages.
+
+        Returns:
+            int: Number of pending outgoing messages.
+        """
+        with self.__rlock:
+            return (len(self.__priority_outgoing_messages) + len(self.__outgoing_messages)
+                    + len(self.__latest_outgoing_messages))
+
+    def __get_outgoing_messages(self) -> list[Message]:
         """
-        Get a message from the outgoing messages queue.
+        Get the pending outgoing messages, up to WRITE_SIZE bytes. Priority messages go first, then the newest message
+        of each coalesced type and then the rest in order.
 
         Returns:
-            str|None: The message from the outgoing messages queue or None if no message is available.
+            list[Message]: The pending outgoing messages, empty if no message is available.
         """
+        messages = []
         with self.__rlock:
-            message = None
             if not self.is_open():
-                return None
-            
+                return messages
+
             # Check if there is a pending outgoing message
             if not self.__pending_outgoing_message_event.is_set():
-                return None
-                
-            # Check if the queue is closed or empty
-            if self.__queues_closed_event.is_set() or self.__outgoing_messages_queue.empty():
-                return None
-
-            # Get the message from the queue
-            message = self.__outgoing_messages_queue.get()
+                return messages
+
+            # Check if the queue is closed
+            if self.__queues_closed_event.is_set():
+                return messages
+
+            # Drain the priority messages
+            size = 0
+            while self.__priority_outgoing_messages and size < self.WRITE_SIZE:
+                message = self.__priority_outgoing_messages.popleft()
+                messages.append(message)
+                size += len(message.to_bytes())
+
+            # Take the newest message of each coalesced type
+            for message_type in list(self.__latest_outgoing_messages):
+                if size >= self.WRITE_SIZE:
+                    break
+                message = self.__latest_outgoing_messages.pop(message_type)
+                messages.append(message)
+                size += len(message.to_bytes())
+
+            # Drain the regular messages
+            while self.__outgoing_messages and size < self.WRITE_SIZE:
+                message = self.__outgoing_messages.popleft()
+                messages.append(message)
+                size += len(message.to_bytes())
 
             # Clear the pending outgoing message event
-            if self.__outgoing_messages_queue.empty():
+            if self.__get_outgoing_queue_depth() == 0:
                 self.__pending_outgoing_message_event.clear()
 
-        # Log
-        message_str = str(message)
-        first_line = message_str.split('\n')[0]
-        self.__log(f"Sending message: {first_line}", print_to_console=self.__debug)
+        for message in messages:
+            # Log
+            message_str = str(message)
+            first_line = message_str.split('\n')[0]
+            self.__log(f"Sending message: {first_line}", print_to_console=self.__debug)
 
-        # If the server is set, send the message to the server
+            # If the server is set, send the message to the server
+            if self.__server:
+                self.__server.publish(RealtimeTrackerServer.TAG_SERIAL_OUTGOING_MESSAGE, message_str)
+
+        return messages
+
+    def __wait_for_write_budget(self) -> None:
+        """
+        Wait until the previous batches have been sent without exceeding the bytes per second budget.
+        """
+        delay = self.__next_write_time - monotonic()
+        if delay > 0:
+            sleep(delay)
+
+    def __write(self, data: bytes) -> None:
+        """
+        Write data to the serial port and update the time when the next batch can be sent.
+
+        Args:
+            data (bytes): The data to write.
+        """
+        # Send the data to the serial port
+        self.__serial.write(data)
+
+        # Update the time when the next batch can be sent
+        self.__next_write_time = max(self.__next_write_time, monotonic()) + len(data) / self.__bytes_per_second
+
+    def get_outgoing_statistics(self) -> dict[str, int]:
+        """
+        Get the outgoing counters.
+
+        Returns:
+            dict[str, int]: Bytes sent, batches sent, messages sent, messages replaced by a newer one of the same
+            coalesced type and the outgoing queue depth.
+        """
+        with self.__rlock:
+            return {
+                'bytes_sent': self.__bytes_sent,
+                'batches_sent': self.__batches_sent,
+                'messages_sent': self.__messages_sent,
+                'coalesced_messages': self.__coalesced_messages,
+                'queue_depth': self.__get_outgoing_queue_depth(),
+            }
+
+    def send_ping(self) -> None:
+        """
+        Put a timestamped ping in the outgoing messages queue.
+        """
+        with self.__rlock:
+            sequence = self.__pings_sent
+            self.__pings_sent += 1
+
+        content = f"{sequence}{self.PING_SEPARATOR}{perf_counter_ns()}"
+        self._send_message(Message(self.TYPE_PING, content))
+
+    def __handle_pong(self, message: Message) -> None:
+        """
+        Update the link health statistics with a received pong.
+
+        Args:
+            message (Message): The pong message.
+        """
+        received_ns = perf_counter_ns()
+        try:
+            values = [int(value) for value in message.content.split(self.PING_SEPARATOR)]
+            sequence, sent_ns = values[:2]
+        except ValueError:
+            self.__log(f"Invalid pong received: {message.content}", print_to_console=self.__debug)
+            return
+
+        with self.__rlock:
+            self.__pongs_received += 1
+
+            # Count the pings without pong
+            if sequence > self.__last_pong_sequence:
+                self.__lost_pings += sequence - self.__last_pong_sequence - 1
+                self.__last_pong_sequence = sequence
+
+            # Add the round-trip time
+            self.__round_trip_times.add((received_ns - sent_ns) / 1e9)
+
+            if len(values) < 4:
+                return
+
+            # Add the age of the last RPLIDAR sample consumed by the Pico, when the pong was sent
+            rplidar_sequence, self.__invalid_frames = values[2:4]
+            if rplidar_sequence >= 0:
+                rplidar_sent_ns = int(self.__rplidar_sent_ns[rplidar_sequence % self.RPLIDAR_SEQUENCES])
+                if rplidar_sent_ns:
+                    self.__rplidar_ages.add((received_ns - rplidar_sent_ns) / 1e9)
+
+    def get_link_statistics(self) -> dict:
+        """
+        Get the link health statistics.
+
+        Returns:
+            dict: Round-trip time and RPLIDAR sample age percentiles in milliseconds, ping counters and dropped RPLIDAR
+            frames, either replaced by a newer rotation before being sent or discarded by the Pico as invalid.
+        """
+        with self.__rlock:
+            return {
+                'round_trip_time': self.__round_trip_times.percentiles(),
+                'rplidar_age': self.__rplidar_ages.percentiles(),
+                'pings_sent': self.__pings_sent,
+                'pongs_received': self.__pongs_received,
+                'lost_pings': self.__lost_pings,
+                'dropped_frames': self.__coalesced_messages + self.__invalid_frames,
+                'corrupted_frames': self.__corrupted_frames,
+            }
+
+    def __publish_link_statistics(self) -> None:
+        """
+        Log the link health statistics and send them to the server.
+        """
+        statistics = self.get_link_statistics()
+        self.__log(f"Link statistics: {statistics}", print_to_console=self.__debug)
+
+        # If the server is set, send the statistics to the server
         if self.__server:
-            asyncio.run(self.__server.broadcast_serial_outgoing_message(message_str))
+            self.__server.publish(RealtimeTrackerServer.TAG_SERIAL_LINK_STATISTICS, json.dumps(statistics))
+
+    def __ping_handler(self) -> None:
+        """
+        Handler to send the link health pings and publish the statistics periodically.
+        """
+        # Wait for start event to be set
+        self.__start_event.wait()
+
+        while self.is_open():
+            # Wait for the next period, the stop event interrupts the wait
+            if self.__stop_event.wait(self.__ping_period):
+                break
+
+            self.send_ping()
+            self.__publish_link_statistics()
+
+        self.__log(f"Serial port ping handler stopped for port {self.__port}.")
+
+    def get_corrupted_frames(self) -> int:
+        """
+        Get the number of corrupted incoming frames discarded with the framed binary protocol.
+
+        Returns:
+            int: Number of corrupted frames.
+        """
+        with self.__rlock:
+            return self.__corrupted_frames
+
+    def __dispatch_incoming_frame(self, frame_bytes: bytearray) -> None:
+        """
+        Decode a received frame and put its message in the incoming messages queue.
 
-        return message
+        Args:
+            frame_bytes (bytearray): The COBS encoded frame without the delimiter.
+        """
+        if not frame_bytes:
+            return
+
+        # Decode the frame, discarding it if it's corrupted
+        message = Protocol.decode_message(frame_bytes)
+        if message is None:
+            with self.__rlock:
+                self.__corrupted_frames += 1
+            self.__log(f"Corrupted frame discarded: {bytes(frame_bytes).hex()}", print_to_console=self.__debug)
+            return
+
+        # Put the message in the incoming messages queue
+        self.__put_incoming_message(message)
+
+    def __dispatch_incoming_message(self, message_bytes: bytearray) -> None:
+        """
+        Parse a received message and put it in the incoming messages queue.
+
+        Args:
+            message_bytes (bytearray): The message without the end character.
+        """
+        message_str = message_bytes.decode(self.ENCODE, errors='replace').strip()
+        if not message_str:
+            return
+
+        # Split the message into type and content
+        message_separator_idx = message_str.find(Message.HEADER_SEPARATOR)
+
+        # Create the message object
+        message = Message(
+            message_str[:message_separator_idx],
+            message_str[message_separator_idx + 1:],
+        )
+
+        # Put the message in the incoming messages queue
+        self.__put_incoming_message(message)
 
     def __receiving_message_handler(self) -> None:
         """
@@ -420,27 +747,43 @@ class SerialCommunication:
             self.__serial.reset_output_buffer()
             self.__log("Input and output buffers reset.")
 
-        while self.is_open():
-            if not self.__serial.in_waiting > 0:
-                sleep(self.DELAY)
-                continue
+        # Reusable buffers for the read chunks and the bytes of incomplete messages
+        chunk = bytearray(self.READ_SIZE)
+        buffer = bytearray()
+        if self.__framed:
+            end = Protocol.DELIMITER
+            dispatch = self.__dispatch_incoming_frame
+        else:
+            end = Message.END.encode(self.ENCODE)
+            dispatch = self.__dispatch_incoming_message
 
-            message_str = self.__serial.readline().decode(self.ENCODE).strip()
+        while self.is_open():
+            # Block until at least one byte is available or the timeout expires
+            try:
+                size = min(max(self.__serial.in_waiting, 1), self.READ_SIZE)
+                read = self.__serial.readinto(memoryview(chunk)[:size])
 
-            # Split the message into type and content
-            message_separator_idx = message_str.find(Message.HEADER_SEPARATOR)
+            except (SerialException, OSError, TypeError) as e:
+                # The serial port was closed while reading
+                if self.is_open():
+                    self.__log(f"Error reading from serial port: {e}")
+                break
 
-            # Create the message object
-            message = Message(
-                message_str[:message_separator_idx],
-                message_str[message_separator_idx + 1:],
-            )
+            if not read:
+                continue
+            buffer += memoryview(chunk)[:read]
 
-            # Put the message in the incoming messages queue
-            self.__put_incoming_message(message)
+            # Dispatch every complete message in the buffer
+            start = 0
+            end_idx = buffer.find(end, start)
+            while end_idx != -1:
+                dispatch(buffer[start:end_idx])
+                start = end_idx + 1
+                end_idx = buffer.find(end, start)
 
-            # Sleep for a short time to avoid busy waiting
-            sleep(self.DELAY)
+            # Keep the incomplete message for the next read
+            if start:
+                del buffer[:start]
 
         self.__log(f"Serial port receiving handler stopped for port {self.__port}.")
 
@@ -455,18 +798,26 @@ class SerialCommunication:
             # Check if there is a message to send
             self.__pending_outgoing_message_event.wait()
 
-            # Get the message from the queue
-            message = self.__get_outgoing_message()
-            if not message:
-                # If there is no message, wait for a short time
-                sleep(self.DELAY)
+            # Wait for the budget before taking the messages, so the coalesced ones are as fresh as possible
+            self.__wait_for_write_budget()
+
+            # Get all the pending messages from the queue
+            messages = self.__get_outgoing_messages()
+            if not messages:
                 continue
 
-            # Send the message to the serial port
-            self.__serial.write(str(message).encode(self.ENCODE))
+            # Send the messages to the serial port with a single write
+            if self.__framed:
+                data = b''.join(Protocol.encode_message(message) for message in messages)
+            else:
+                data = b''.join(message.to_bytes() for message in messages)
+            self.__write(data)
 
-            # Wait for the message to be sent
-            sleep(self.DELAY)
+            # Update the counters
+            with self.__rlock:
+                self.__bytes_sent += len(data)
+                self.__batches_sent += 1
+                self.__messages_sent += len(messages)
 
         self.__log(f"Serial port sending handler stopped for port {self.__port}.")
 
@@ -488,9 +839,18 @@ class SerialCommunication:
             thread = Thread(target=self.__receiving_message_handler)
             thread.start()
 
+    def __create_ping_thread(self) -> None:
+        """
+        Create a thread to send the link health pings.
+        """
+        with self.__rlock:
+            self.__open()
+            thread = Thread(target=self.__ping_handler)
+            thread.start()
+
     def create_threads(self) -> None:
         """
-        Create threads for receiving and sending messages.
+        Create threads for receiving and sending messages, and for the link health pings if they are enabled.
         """
         with self.__rlock:
             # Create the receiving thread
@@ -499,6 +859,10 @@ class SerialCommunication:
             # Create the sending thread
             self.__create_sending_thread()
 
+            # Create the ping thread
+            if self.__ping_period > 0:
+                self.__create_ping_thread()
+
             # Log
             self.__log("Communication threads created.")
 
@@ -567,22 +931,23 @@ class SerialCommunication:
         Returns:
             bool|None: True if the start message is received, False if the timeout is reached.
         """
-        with self.__rlock:
-            while True:
-                if self.__start_event.is_set():
-                    return True
+        while True:
+            if self.has_started():
+                return True
 
-                # Wait for the pending incoming message event to be set
-                self.__pending_incoming_message_event.wait(timeout)
+            # Wait for the pending incoming message event to be set, without holding the lock
+            if not self.__pending_incoming_message_event.wait(timeout):
+                return False
 
+            with self.__rlock:
                 # Peek the last incoming message
                 last_message = self.receive_message()
                 if last_message is None:
                     continue
 
-                if last_message.type == Message.TYPE_STATUS and last_message.content == Message.TYPE_STATUS_ON:
+                if last_message.type == self.TYPE_STATUS and last_message.content == self.TYPE_STATUS_ON:
                     # Send start message confirmation
-                    self._send_message(Message(Message.TYPE_STATUS, Message.TYPE_STATUS_ON))
+                    self._send_message(Message(self.TYPE_STATUS, self.TYPE_STATUS_ON))
 
                     # Set the start event
                     self.__start_event.set()
@@ -598,22 +963,24 @@ class SerialCommunication:
         Returns:
             bool|None: True if the stop message is received, False if the timeout is reached.
         """
-        with self.__rlock:
-            while True:
+        while True:
+            with self.__rlock:
                 if self.__stop_event.is_set():
                     return True
 
-                # Wait for the pending incoming message event to be set
-                self.__pending_incoming_message_event.wait(timeout)
+            # Wait for the pending incoming message event to be set, without holding the lock
+            if not self.__pending_incoming_message_event.wait(timeout):
+                return False
 
+            with self.__rlock:
                 # Peek the last incoming message
                 last_message = self.receive_message()
                 if last_message is None:
                     continue
 
-                if last_message.type == Message.TYPE_STATUS and last_message.content == Message.TYPE_STATUS_OFF:
+                if last_message.type == self.TYPE_STATUS and last_message.content == self.TYPE_STATUS_OFF:
                     # Send stop message confirmation
-                    self._send_message(Message(Message.TYPE_STATUS, Message.TYPE_STATUS_OFF))
+                    self._send_message(Message(self.TYPE_STATUS, self.TYPE_STATUS_OFF))
                     
                     # Set the stop event
                     self.__stop_event.set()
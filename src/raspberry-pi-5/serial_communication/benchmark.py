@@ -0,0 +1,131 @@
+import os
+from argparse import ArgumentParser
+from threading import Thread
+from time import perf_counter, perf_counter_ns, sleep
+
+import numpy as np
+
+from args import Args
+from serial_communication import SerialCommunication
+from serial_communication.message import Message
+from serial_communication.simulator import open_pty
+
+# Benchmark message type
+TYPE_BENCHMARK = 'benchmark'
+
+# Benchmark content separator
+CONTENT_SEPARATOR = ','
+
+# Time to wait for the last messages
+RECEIVE_TIMEOUT = 5.0
+
+# Time to wait for the receiving thread to start
+START_DELAY = 0.2
+
+
+def write_messages(master_fd: int, messages: int, rate: float) -> None:
+    """
+    Write timestamped benchmark messages to the master side of the pseudo-terminal.
+
+    Args:
+        master_fd (int): File descriptor of the master side.
+        messages (int): Number of messages to write.
+        rate (float): Messages per second, 0 to write them as fast as possible.
+    """
+    period = 1.0 / rate if rate > 0 else 0.0
+    start_time = perf_counter()
+
+    for i in range(messages):
+        # Pace the messages if required
+        if period:
+            delay = start_time + i * period - perf_counter()
+            if delay > 0:
+                sleep(delay)
+
+        message = Message(TYPE_BENCHMARK, f"{i}{CONTENT_SEPARATOR}{perf_counter_ns()}")
+        os.write(master_fd, message.to_bytes())
+
+
+def receive_messages(serial: SerialCommunication, messages: int) -> np.ndarray:
+    """
+    Receive the benchmark messages and measure their latency.
+
+    Args:
+        serial (SerialCommunication): Serial communication under test.
+        messages (int): Number of messages expected.
+
+    Returns:
+        np.ndarray: Latency of each received message in seconds.
+    """
+    latencies = np.empty(messages, dtype=np.float64)
+    received = 0
+
+    # Get the pending incoming message event
+    pending_incoming_message_event = serial.get_pending_incoming_message_event()
+
+    while received < messages:
+        if not pending_incoming_message_event.wait(RECEIVE_TIMEOUT):
+            break
+
+        message = serial.receive_message()
+        if message is None or message.type != TYPE_BENCHMARK:
+            continue
+
+        # Get the send timestamp from the content
+        _, sent_ns = message.content.split(CONTENT_SEPARATOR)
+        latencies[received] = (perf_counter_ns() - int(sent_ns)) / 1e9
+        received += 1
+
+    return latencies[:received]
+
+
+def main():
+    """
+    Main function to run the benchmark.
+    """
+    parser = ArgumentParser(
+        description="Script to benchmark the serial communication receiving throughput and latency over a pty loopback.")
+    Args.add_messages_argument(parser)
+    Args.add_rate_argument(parser)
+    args = Args.parse_args_as_dict(parser)
+
+    # Get the number of messages and the rate
+    arg_messages = Args.get_attribute_from_args(args, Args.MESSAGES)
+    arg_rate = Args.get_attribute_from_args(args, Args.RATE)
+
+    # Open the pseudo-terminal loopback
+    master_fd, slave_path = open_pty()
+
+    # Create the serial communication on the slave side
+    serial = SerialCommunication(port=slave_path, alt_port=slave_path)
+
+    try:
+        # Start the serial communication threads
+        serial.create_threads()
+        serial.start_threads()
+        sleep(START_DELAY)
+
+        # Write the messages from another thread
+        writer = Thread(target=write_messages, args=(master_fd, arg_messages, arg_rate))
+        start_time = perf_counter()
+        writer.start()
+
+        # Receive the messages
+        latencies = receive_messages(serial, arg_messages)
+        elapsed_time = perf_counter() - start_time
+        writer.join()
+
+    finally:
+        serial.stop_threads()
+        os.close(master_fd)
+
+    # Log the results
+    print(f"Received {len(latencies)}/{arg_messages} messages in {elapsed_time:.3f} seconds")
+    if len(latencies):
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"Throughput: {len(latencies) / elapsed_time:.1f} messages/s")
+        print(f"Latency: p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {latencies.max() * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
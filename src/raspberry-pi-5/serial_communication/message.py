@@ -10,6 +10,9 @@ class Message:
     # Message end character
     END = '\n'
 
+    # Encode
+    ENCODE = 'utf-8'
+
     def __init__(self, message_type: str, message_content: str):
         """
         Initialize the message class.
@@ -30,6 +33,24 @@ class Message:
         """
         return f"{self.__type}{self.HEADER_SEPARATOR}{self.__content}{self.END}"
 
+    def to_bytes(self) -> bytes:
+        """
+        Bytes representation of the message, as it's written to the serial port.
+
+        Returns:
+            bytes: The encoded message.
+        """
+        return str(self).encode(self.ENCODE)
+
+    def to_payload(self) -> bytes:
+        """
+        Payload of the message for the framed binary protocol.
+
+        Returns:
+            bytes: The encoded content.
+        """
+        return self.__content.encode(self.ENCODE)
+
     @property
     def type(self) -> str:
         """
@@ -0,0 +1,208 @@
+import struct
+from binascii import crc_hqx
+from typing import Optional
+
+from serial_communication.message import Message
+from utils import check_type
+
+
+class Protocol:
+    """
+    Class to encode and decode the framed binary messages exchanged with the Raspberry Pi Pico.
+
+    Frame layout before COBS encoding (little endian):
+        1 byte: message type id
+        2 bytes: payload length (uint16)
+        N bytes: payload
+        2 bytes: CRC16 of the type id, length and payload (uint16)
+
+    The frame is COBS encoded, so it has no zero bytes, and it's followed by a zero byte delimiter.
+    """
+    # Frame delimiter
+    DELIMITER = b'\x00'
+
+    # Header structure: type id and payload length
+    HEADER_STRUCT = struct.Struct('<BH')
+
+    # CRC structure
+    CRC_STRUCT = struct.Struct('<H')
+
+    # Minimum frame length after COBS decoding
+    MIN_FRAME_LENGTH = HEADER_STRUCT.size + CRC_STRUCT.size
+
+    # Maximum payload length
+    MAX_PAYLOAD_LENGTH = (1 << 16) - 1
+
+    # CRC16-CCITT initial value, the polynomial is 0x1021
+    CRC_INITIAL_VALUE = 0xFFFF
+
+    # COBS maximum block code, a block of 254 non-zero bytes without an implicit zero
+    COBS_MAX_CODE = 0xFF
+
+    # Message type ids (must match the Raspberry Pi Pico ones)
+    TYPE_IDS = {
+        'status': 1,
+        'inference': 2,
+        'rplidar': 3,
+        'capture_image': 4,
+        'debug': 5,
+        'echo': 6,
+        'ping': 7,
+        'pong': 8,
+    }
+    TYPES = {type_id: message_type for message_type, type_id in TYPE_IDS.items()}
+
+    @classmethod
+    def crc16(cls, data: bytes | bytearray | memoryview) -> int:
+        """
+        Calculate the CRC16-CCITT of the given data.
+
+        Args:
+            data (bytes|bytearray|memoryview): Data to calculate the CRC of.
+
+        Returns:
+            int: The CRC16 value.
+        """
+        return crc_hqx(data, cls.CRC_INITIAL_VALUE)
+
+    @classmethod
+    def cobs_encode(cls, data: bytes | bytearray | memoryview) -> bytes:
+        """
+        Encode the data with Consistent Overhead Byte Stuffing, removing every zero byte.
+
+        Args:
+            data (bytes|bytearray|memoryview): Data to encode.
+
+        Returns:
+            bytes: The encoded data, without the delimiter.
+        """
+        encoded = bytearray()
+        for block in bytes(data).split(cls.DELIMITER):
+            # Split the blocks longer than the maximum code
+            while len(block) >= cls.COBS_MAX_CODE - 1:
+                encoded.append(cls.COBS_MAX_CODE)
+                encoded += block[:cls.COBS_MAX_CODE - 1]
+                block = block[cls.COBS_MAX_CODE - 1:]
+
+            encoded.append(len(block) + 1)
+            encoded += block
+
+        return bytes(encoded)
+
+    @classmethod
+    def cobs_decode(cls, data: bytes | bytearray | memoryview) -> Optional[bytes]:
+        """
+        Decode the data encoded with Consistent Overhead Byte Stuffing.
+
+        Args:
+            data (bytes|bytearray|memoryview): Encoded data, without the delimiter.
+
+        Returns:
+            bytes|None: The decoded data, or None if the data is invalid.
+        """
+        data = memoryview(data)
+        decoded = bytearray()
+        i = 0
+        n = len(data)
+        while i < n:
+            code = data[i]
+            end = i + code
+            if code == 0 or end > n:
+                return None
+
+            decoded += data[i + 1:end]
+            i = end
+
+            # Blocks shorter than the maximum code are followed by a zero byte, except the last one
+            if code < cls.COBS_MAX_CODE and i < n:
+                decoded.append(0)
+
+        return bytes(decoded)
+
+    @classmethod
+    def encode(cls, type_id: int, payload: bytes | bytearray | memoryview) -> bytes:
+        """
+        Encode a payload as a delimited frame.
+
+        Args:
+            type_id (int): Message type id.
+            payload (bytes|bytearray|memoryview): Message payload.
+
+        Returns:
+            bytes: The COBS encoded frame followed by the delimiter.
+        """
+        check_type(type_id, int)
+        if len(payload) > cls.MAX_PAYLOAD_LENGTH:
+            raise ValueError(f"Payload too long: {len(payload)} bytes.")
+
+        # Build the frame and append its CRC
+        frame = cls.HEADER_STRUCT.pack(type_id, len(payload)) + bytes(payload)
+        frame += cls.CRC_STRUCT.pack(cls.crc16(frame))
+
+        return cls.cobs_encode(frame) + cls.DELIMITER
+
+    @classmethod
+    def decode(cls, data: bytes | bytearray | memoryview) -> Optional[tuple[int, bytes]]:
+        """
+        Decode a frame.
+
+        Args:
+            data (bytes|bytearray|memoryview): COBS encoded frame, without the delimiter.
+
+        Returns:
+            tuple[int, bytes]|None: The message type id and the payload, or None if the frame is corrupted.
+        """
+        frame = cls.cobs_decode(data)
+        if frame is None or len(frame) < cls.MIN_FRAME_LENGTH:
+            return None
+
+        # Check the CRC
+        crc_idx = len(frame) - cls.CRC_STRUCT.size
+        if cls.crc16(frame[:crc_idx]) != cls.CRC_STRUCT.unpack_from(frame, crc_idx)[0]:
+            return None
+
+        # Check the payload length
+        type_id, length = cls.HEADER_STRUCT.unpack_from(frame)
+        if length != crc_idx - cls.HEADER_STRUCT.size:
+            return None
+
+        return type_id, frame[cls.HEADER_STRUCT.size:crc_idx]
+
+    @classmethod
+    def encode_message(cls, message: Message) -> bytes:
+        """
+        Encode a message as a delimited frame.
+
+        Args:
+            message (Message): Message to encode.
+
+        Returns:
+            bytes: The COBS encoded frame followed by the delimiter.
+        """
+        type_id = cls.TYPE_IDS.get(message.type)
+        if type_id is None:
+            raise ValueError(f"Unknown message type: {message.type}")
+
+        return cls.encode(type_id, message.to_payload())
+
+    @classmethod
+    def decode_message(cls, data: bytes | bytearray | memoryview) -> Optional[Message]:
+        """
+        Decode a frame into a text message.
+
+        Args:
+            data (bytes|bytearray|memoryview): COBS encoded frame, without the delimiter.
+
+        Returns:
+            Message|None: The decoded message, or None if the frame is corrupted or its type is unknown.
+        """
+        decoded = cls.decode(data)
+        if decoded is None:
+            return None
+
+        type_id, payload = decoded
+        message_type = cls.TYPES.get(type_id)
+        if message_type is None:
+            return None
+
+        return Message(message_type, payload.decode(Message.ENCODE, errors='replace'))
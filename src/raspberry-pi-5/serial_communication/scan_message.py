@@ -0,0 +1,142 @@
+import struct
+from typing import Optional
+
+import numpy as np
+
+from serial_communication.message import Message
+from utils import check_type
+
+
+class ScanMessage(Message):
+    """
+    Class to handle the binary RPLIDAR full rotation frames sent to the Raspberry Pi Pico.
+
+    Frame layout (little endian):
+        2 bytes: sync bytes 0xA5 0x5A
+        2 bytes: rotation sequence number (uint16)
+        720 bytes: 360 distances in millimeters, one per degree (uint16)
+        2 bytes: checksum, the sum of the sequence number and the distances modulo 2^16 (uint16)
+    """
+    # Message type
+    TYPE = 'rplidar'
+
+    # Frame sync bytes, they can't start a text message
+    SYNC = b'\xa5\x5a'
+
+    # Number of angular bins
+    BINS = 360
+
+    # Body structure, the frame without the sync bytes
+    BODY_STRUCT = struct.Struct(f'<H{BINS}HH')
+    BODY_LENGTH = BODY_STRUCT.size
+    FRAME_LENGTH = len(SYNC) + BODY_LENGTH
+
+    # Distance sent for the bins with no measure, or farther than this limit (must match the Raspberry Pi Pico one)
+    MAX_DISTANCE = 3000
+
+    # Checksum modulo and length
+    CHECKSUM_MODULO = 1 << 16
+    CHECKSUM_LENGTH = 2
+
+    def __init__(self, sequence: int, distances: np.ndarray, qualities: np.ndarray,
+                 max_distance: int = MAX_DISTANCE):
+        """
+        Initialize the scan message.
+
+        Args:
+            sequence (int): Rotation sequence number.
+            distances (np.ndarray): Distance of each angular bin in millimeters.
+            qualities (np.ndarray): Quality of each angular bin. Bins with no quality are sent as the maximum distance.
+            max_distance (int): Maximum distance to send.
+        """
+        # Check the type of the sequence number
+        check_type(sequence, int)
+        self.__sequence = sequence % self.CHECKSUM_MODULO
+
+        # Check the type of the distances and qualities
+        check_type(distances, np.ndarray)
+        check_type(qualities, np.ndarray)
+        if len(distances) != self.BINS or len(qualities) != self.BINS:
+            raise ValueError(f"Expected {self.BINS} distances and qualities, got {len(distances)} and {len(qualities)}.")
+
+        # Clip the distances and send the maximum distance for the bins with no measure
+        encoded_distances = np.where(qualities > 0, np.minimum(distances, max_distance), max_distance).astype('<u2')
+
+        # Build the frame
+        checksum = (self.__sequence + int(encoded_distances.sum(dtype=np.uint64))) % self.CHECKSUM_MODULO
+        self.__frame = b''.join((
+            self.SYNC,
+            self.__sequence.to_bytes(2, 'little'),
+            encoded_distances.tobytes(),
+            checksum.to_bytes(self.CHECKSUM_LENGTH, 'little')
+        ))
+
+        super().__init__(self.TYPE, str(self.__sequence))
+
+    @property
+    def sequence(self) -> int:
+        """
+        Get the rotation sequence number.
+
+        Returns:
+            int: Rotation sequence number.
+        """
+        return self.__sequence
+
+    def to_payload(self) -> bytes:
+        """
+        Payload of the message for the framed binary protocol, the frame without the sync bytes and the checksum.
+
+        Returns:
+            bytes: The sequence number and the distances.
+        """
+        return self.__frame[len(self.SYNC):-self.CHECKSUM_LENGTH]
+
+    def to_bytes(self) -> bytes:
+        """
+        Bytes representation of the binary frame.
+
+        Returns:
+            bytes: The encoded frame.
+        """
+        return self.__frame
+
+    @classmethod
+    def decode_body(cls, body: bytes | bytearray | memoryview) -> Optional[tuple[int, tuple[int, ...]]]:
+        """
+        Decode a frame body, that is, the frame without the sync bytes.
+
+        Args:
+            body (bytes|bytearray|memoryview): The frame body.
+
+        Returns:
+            tuple[int, tuple[int, ...]]|None: The sequence number and the distances, or None if the checksum is wrong.
+        """
+        if len(body) < cls.BODY_LENGTH:
+            return None
+
+        # Unpack the whole body at once
+        values = cls.BODY_STRUCT.unpack_from(body)
+        sequence, distances, checksum = values[0], values[1:-1], values[-1]
+
+        # Check the checksum
+        if (sequence + sum(distances)) % cls.CHECKSUM_MODULO != checksum:
+            return None
+
+        return sequence, distances
+
+    @classmethod
+    def decode(cls, frame: bytes | bytearray | memoryview) -> Optional[tuple[int, tuple[int, ...]]]:
+        """
+        Decode a whole frame.
+
+        Args:
+            frame (bytes|bytearray|memoryview): The frame, starting with the sync bytes.
+
+        Returns:
+            tuple[int, tuple[int, ...]]|None: The sequence number and the distances, or None if the frame is invalid.
+        """
+        if bytes(frame[:len(cls.SYNC)]) != cls.SYNC:
+            return None
+
+        return cls.decode_body(memoryview(frame)[len(cls.SYNC):])
@@ -0,0 +1,432 @@
+import os
+import pty
+import queue
+import select
+import tty
+from argparse import ArgumentParser
+from threading import Event, Lock, Thread
+from time import perf_counter, perf_counter_ns, sleep
+from typing import Optional
+
+import numpy as np
+
+from args import Args
+from serial_communication import SerialCommunication
+from serial_communication.message import Message
+from serial_communication.protocol import Protocol
+from serial_communication.scan_message import ScanMessage
+from utils import check_type
+
+
+def open_pty() -> tuple[int, str]:
+    """
+    Open a pseudo-terminal pair to be used as a serial loopback.
+
+    Returns:
+        tuple[int, str]: File descriptor of the master side and path of the slave side.
+    """
+    master_fd, slave_fd = pty.openpty()
+    tty.setraw(slave_fd)
+    return master_fd, os.ttyname(slave_fd)
+
+
+class PicoSimulator:
+    """
+    Class to simulate the Raspberry Pi Pico on the master side of a pseudo-terminal pair.
+
+    The slave side path is used as the serial port of SerialCommunication. The simulator consumes the RPLIDAR frames at
+    a limited processing rate, so the pseudo-terminal buffer fills up like the USB CDC one, and echoes back the time
+    each message was consumed.
+    """
+    # Default RPLIDAR frames processed per second, 0 to process them as fast as they arrive
+    PROCESSING_RATE = 0.0
+
+    # Maximum number of bytes to read at once
+    READ_SIZE = 4096
+
+    # Read poll timeout, it bounds the time to notice the stop event
+    READ_TIMEOUT = 0.1
+
+    # Echo message type and content separator
+    TYPE_ECHO = SerialCommunication.TYPE_ECHO
+    ECHO_SEPARATOR = ','
+
+    def __init__(self, processing_rate: float = PROCESSING_RATE, framed: bool = False):
+        """
+        Initialize the Pico simulator.
+
+        Args:
+            processing_rate (float): RPLIDAR frames processed per second, 0 to process them as fast as they arrive.
+            framed (bool): Whether to use the COBS framed binary protocol instead of the text messages.
+        """
+        # Check the type of the processing rate
+        check_type(processing_rate, (int, float))
+        self.__processing_period = 1.0 / processing_rate if processing_rate > 0 else 0.0
+
+        # Check the type of the framed flag
+        check_type(framed, bool)
+        self.__framed = framed
+
+        # Initialize the pseudo-terminal
+        self.__master_fd = None
+        self.__port = None
+
+        # Create the lock for the writes and the counters, and the stop event
+        self.__lock = Lock()
+        self.__stop_event = Event()
+
+        # Initialize the reading thread
+        self.__thread = None
+
+        # Create the queue for the received messages other than the RPLIDAR frames
+        self.__received_messages = queue.Queue()
+
+        # Initialize the counters
+        self.__rplidar_frames = 0
+        self.__corrupted_frames = 0
+        self.__last_rplidar_sequence = -1
+
+    def open(self) -> str:
+        """
+        Open the pseudo-terminal pair.
+
+        Returns:
+            str: Path of the slave side, to be used as the serial port.
+        """
+        if self.__master_fd is None:
+            self.__master_fd, self.__port = open_pty()
+        return self.__port
+
+    def get_port(self) -> Optional[str]:
+        """
+        Get the path of the slave side of the pseudo-terminal.
+
+        Returns:
+            str|None: Path of the slave side, or None if it's not open.
+        """
+        return self.__port
+
+    def start(self) -> None:
+        """
+        Start the thread that reads the messages sent by the Raspberry Pi.
+        """
+        self.open()
+        if self.__thread is not None:
+            return
+
+        self.__stop_event.clear()
+        self.__thread = Thread(target=self.__reading_handler, daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the reading thread and close the pseudo-terminal.
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+        if self.__master_fd is not None:
+            os.close(self.__master_fd)
+            self.__master_fd = None
+
+    def send_message(self, message: Message) -> None:
+        """
+        Send a message to the Raspberry Pi.
+
+        Args:
+            message (Message): The message to send.
+        """
+        check_type(message, Message)
+        data = Protocol.encode_message(message) if self.__framed else message.to_bytes()
+        with self.__lock:
+            os.write(self.__master_fd, data)
+
+    def send_status(self, on: bool) -> None:
+        """
+        Send the start or stop status message, as the Pico does when its switch is toggled.
+
+        Args:
+            on (bool): True to send the start message, False to send the stop message.
+        """
+        status = SerialCommunication.TYPE_STATUS_ON if on else SerialCommunication.TYPE_STATUS_OFF
+        self.send_message(Message(SerialCommunication.TYPE_STATUS, status))
+
+    def receive_message(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """
+        Get a received message other than the RPLIDAR frames.
+
+        Args:
+            timeout (float): Maximum time to wait for a message. Default is None (wait indefinitely).
+
+        Returns:
+            Message|None: The received message, or None if the timeout is reached.
+        """
+        try:
+            return self.__received_messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_statistics(self) -> dict[str, int]:
+        """
+        Get the reading counters.
+
+        Returns:
+            dict[str, int]: RPLIDAR frames consumed and corrupted frames discarded.
+        """
+        with self.__lock:
+            return {
+                'rplidar_frames': self.__rplidar_frames,
+                'corrupted_frames': self.__corrupted_frames,
+            }
+
+    def __echo(self, message_type: str, message_id: str) -> None:
+        """
+        Echo back the time a message was consumed.
+
+        Args:
+            message_type (str): Type of the consumed message.
+            message_id (str): Identifier of the consumed message, the sequence number for the RPLIDAR frames.
+        """
+        content = self.ECHO_SEPARATOR.join((message_type, message_id, str(perf_counter_ns())))
+        self.send_message(Message(self.TYPE_ECHO, content))
+
+    def __consume_rplidar_frame(self, sequence: int) -> None:
+        """
+        Consume a RPLIDAR frame, waiting for the processing period.
+
+        Args:
+            sequence (int): Rotation sequence number.
+        """
+        with self.__lock:
+            self.__rplidar_frames += 1
+            self.__last_rplidar_sequence = sequence
+
+        self.__echo(SerialCommunication.TYPE_RPLIDAR, str(sequence))
+
+        # Simulate the processing time, the next frames wait in the pseudo-terminal buffer
+        if self.__processing_period:
+            sleep(self.__processing_period)
+
+    def __consume_message(self, message: Message) -> None:
+        """
+        Consume a text message, answering the pings with a pong.
+
+        Args:
+            message (Message): The received message.
+        """
+        if message.type == SerialCommunication.TYPE_PING:
+            with self.__lock:
+                content = SerialCommunication.PING_SEPARATOR.join(
+                    (message.content, str(self.__last_rplidar_sequence), str(self.__corrupted_frames)))
+            self.send_message(Message(SerialCommunication.TYPE_PONG, content))
+            return
+
+        self.__received_messages.put(message)
+
+    def __count_corrupted_frame(self) -> None:
+        """
+        Count a corrupted frame.
+        """
+        with self.__lock:
+            self.__corrupted_frames += 1
+
+    def __parse_text(self, buffer: bytearray) -> int:
+        """
+        Parse the text messages and the binary RPLIDAR frames at the start of the buffer.
+
+        Args:
+            buffer (bytearray): Received bytes.
+
+        Returns:
+            int: Number of bytes consumed.
+        """
+        start = 0
+        end = Message.END.encode(Message.ENCODE)
+        while start < len(buffer) and not self.__stop_event.is_set():
+            # Check if it's a RPLIDAR binary frame
+            if buffer[start] == ScanMessage.SYNC[0]:
+                if len(buffer) - start < ScanMessage.FRAME_LENGTH:
+                    break
+
+                decoded = ScanMessage.decode(memoryview(buffer)[start:start + ScanMessage.FRAME_LENGTH])
+                if decoded is None:
+                    # Synchronize again by skipping one byte
+                    self.__count_corrupted_frame()
+                    start += 1
+                    continue
+
+                start += ScanMessage.FRAME_LENGTH
+                self.__consume_rplidar_frame(decoded[0])
+                continue
+
+            # Get the text message
+            end_idx = buffer.find(end, start)
+            if end_idx == -1:
+                break
+
+            message_str = buffer[start:end_idx].decode(Message.ENCODE, errors='replace').strip()
+            start = end_idx + 1
+            if not message_str:
+                continue
+
+            message_type, _, message_content = message_str.partition(Message.HEADER_SEPARATOR)
+            self.__consume_message(Message(message_type, message_content))
+
+        return start
+
+    def __parse_frames(self, buffer: bytearray) -> int:
+        """
+        Parse the COBS framed messages at the start of the buffer.
+
+        Args:
+            buffer (bytearray): Received bytes.
+
+        Returns:
+            int: Number of bytes consumed.
+        """
+        start = 0
+        end_idx = buffer.find(Protocol.DELIMITER, start)
+        while end_idx != -1 and not self.__stop_event.is_set():
+            frame = buffer[start:end_idx]
+            start = end_idx + 1
+            end_idx = buffer.find(Protocol.DELIMITER, start)
+            if not frame:
+                continue
+
+            decoded = Protocol.decode(frame)
+            if decoded is None or decoded[0] not in Protocol.TYPES:
+                self.__count_corrupted_frame()
+                continue
+
+            type_id, payload = decoded
+            message_type = Protocol.TYPES[type_id]
+            if message_type == SerialCommunication.TYPE_RPLIDAR:
+                self.__consume_rplidar_frame(int.from_bytes(payload[:2], 'little'))
+            else:
+                self.__consume_message(Message(message_type, payload.decode(Message.ENCODE, errors='replace')))
+
+        return start
+
+    def __reading_handler(self) -> None:
+        """
+        Handler to read the messages sent by the Raspberry Pi.
+        """
+        buffer = bytearray()
+        parse = self.__parse_frames if self.__framed else self.__parse_text
+
+        while not self.__stop_event.is_set():
+            # Wait for the available bytes
+            readable, _, _ = select.select([self.__master_fd], [], [], self.READ_TIMEOUT)
+            if not readable:
+                continue
+
+            try:
+                buffer += os.read(self.__master_fd, self.READ_SIZE)
+            except OSError:
+                break
+
+            # Keep the incomplete message for the next read
+            consumed = parse(buffer)
+            if consumed:
+                del buffer[:consumed]
+
+
+def send_rplidar_scans(serial: SerialCommunication, scans: int, rate: float) -> np.ndarray:
+    """
+    Send synthetic RPLIDAR rotations and record their send time.
+
+    Args:
+        serial (SerialCommunication): Serial communication under test.
+        scans (int): Number of rotations to send.
+        rate (float): Rotations per second, 0 to send them as fast as possible.
+
+    Returns:
+        np.ndarray: Send time of each rotation in nanoseconds.
+    """
+    sent_ns = np.zeros(scans, dtype=np.int64)
+    distances = np.linspace(0, ScanMessage.MAX_DISTANCE, ScanMessage.BINS, dtype=np.float32)
+    qualities = np.ones(ScanMessage.BINS, dtype=np.uint8)
+
+    period = 1.0 / rate if rate > 0 else 0.0
+    start_time = perf_counter()
+
+    for i in range(scans):
+        # Pace the rotations if required
+        if period:
+            delay = start_time + i * period - perf_counter()
+            if delay > 0:
+                sleep(delay)
+
+        sent_ns[i] = perf_counter_ns()
+        serial.send_rplidar_scan(i, distances, qualities)
+
+    return sent_ns
+
+
+def main():
+    """
+    Main function to load test the RPLIDAR to serial path against the simulator.
+    """
+    parser = ArgumentParser(
+        description="Script to load test the serial communication against a simulated Raspberry Pi Pico.")
+    Args.add_messages_argument(parser, default=1000)
+    Args.add_rate_argument(parser, default=10.0)
+    Args.add_processing_rate_argument(parser)
+    args = Args.parse_args_as_dict(parser)
+
+    # Get the number of rotations and the rates
+    arg_messages = Args.get_attribute_from_args(args, Args.MESSAGES)
+    arg_rate = Args.get_attribute_from_args(args, Args.RATE)
+    arg_processing_rate = Args.get_attribute_from_args(args, Args.PROCESSING_RATE)
+
+    # Open the simulator and the serial communication on its port
+    simulator = PicoSimulator(processing_rate=arg_processing_rate)
+    port = simulator.open()
+    serial = SerialCommunication(port=port, alt_port=port)
+    echoes = {}
+
+    try:
+        # Start the simulator and the serial communication threads
+        simulator.start()
+        serial.create_threads()
+        serial.start_threads()
+        simulator.send_status(True)
+
+        # Send the rotations
+        start_time = perf_counter()
+        sent_ns = send_rplidar_scans(serial, arg_messages, arg_rate)
+
+        # Collect the echoes until no message arrives for a while
+        pending_incoming_message_event = serial.get_pending_incoming_message_event()
+        while pending_incoming_message_event.wait(PicoSimulator.READ_TIMEOUT * 10):
+            message = serial.receive_message()
+            if message is None or message.type != PicoSimulator.TYPE_ECHO:
+                continue
+
+            message_type, message_id, consumed_ns = message.content.split(PicoSimulator.ECHO_SEPARATOR)
+            if message_type == SerialCommunication.TYPE_RPLIDAR:
+                echoes[int(message_id)] = int(consumed_ns)
+        elapsed_time = perf_counter() - start_time
+
+        simulator.send_status(False)
+        statistics = serial.get_outgoing_statistics()
+
+    finally:
+        serial.stop_threads()
+        simulator.stop()
+
+    # Log the results
+    print(f"Consumed {len(echoes)}/{arg_messages} rotations in {elapsed_time:.3f} seconds, "
+          f"{statistics['coalesced_messages']} coalesced")
+    if echoes:
+        sequences = np.fromiter(echoes.keys(), dtype=np.int64)
+        latencies = (np.fromiter(echoes.values(), dtype=np.int64) - sent_ns[sequences]) / 1e6
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"Throughput: {len(echoes) / elapsed_time:.1f} rotations/s")
+        print(f"Latency: p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {latencies.max():.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import asyncio
 import io
+import queue
 from threading import Thread
 from multiprocessing import Event, RLock
 from multiprocessing.synchronize import Event as EventCls
@@ -34,6 +35,7 @@ class RealtimeTrackerServer:
     # Serial communication tags
     TAG_SERIAL_INCOMING_MESSAGE = "serial_incoming_message"
     TAG_SERIAL_OUTGOING_MESSAGE = "serial_outgoing_message"
+    TAG_SERIAL_LINK_STATISTICS = "serial_link_statistics"
 
     # Image tags
     TAG_IMAGE_ORIGINAL = "image_original"
@@ -57,12 +59,16 @@ class RealtimeTrackerServer:
     # Image format
     IMAGE_FORMAT = "JPEG"
 
+    # Maximum number of published messages waiting to be broadcast
+    PUBLISH_QUEUE_SIZE = 256
+
     def __init__(
         self,
         parking_event: Optional[EventCls] = None,
         logger: Optional[Logger] = None,
         host: str = HOST,
-        port: int = PORT
+        port: int = PORT,
+        publish_queue_size: int = PUBLISH_QUEUE_SIZE
     ):
         """
         Initializes the WebSocket server with the specified host and port.
@@ -72,6 +78,7 @@ class RealtimeTrackerServer:
             logger (Logger|None): Logger instance for logging messages.
             host (str): The host address for the WebSocket server. Default is 'localhost'.
             port (int): The port number for the WebSocket server. Default is 8765.
+            publish_queue_size (int): Maximum number of published messages waiting to be broadcast.
         """
         # Create a reentrant lock
         self.__rlock = RLock()
@@ -105,6 +112,20 @@ class RealtimeTrackerServer:
         # Initialize the connected clients set
         self.__connected_clients = set()
 
+        # Check the type of the publish queue size
+        check_type(publish_queue_size, int)
+
+        # Create the bounded queue for the published messages
+        self.__publish_queue = queue.Queue(maxsize=publish_queue_size)
+
+        # Initialize the published messages dropped counter
+        self.__dropped_messages = 0
+
+        # Initialize the event loop of the server thread and its publish event
+        self.__event_loop = None
+        self.__publish_event = None
+        self.__publish_wakeup_pending = False
+
         # Initialize the thread
         self.__thread = None
 
@@ -307,6 +328,99 @@ class RealtimeTrackerServer:
         # Send a tagged message
         await self._broadcast_message(Message(self.TAG_RPLIDAR_MEASURES, message))
 
+    def publish(self, tag: str, payload: str | Image) -> bool:
+        """
+        Publishes a message to all connected clients without blocking the caller.
+
+        The message is handed to the server event loop through a bounded thread-safe queue. If the queue is full, the
+        oldest message is dropped.
+
+        Args:
+            tag (str): The tag of the message.
+            payload (str|Image): The content of the message. Images are encoded in the server thread.
+
+        Returns:
+            bool: True if the message was queued, False if the server is not running.
+        """
+        event_loop = self.__event_loop
+        if event_loop is None or self.__stop_event.is_set():
+            return False
+
+        # Put the message in the queue, dropping the oldest one if it's full
+        try:
+            self.__publish_queue.put_nowait((tag, payload))
+
+        except queue.Full:
+            try:
+                self.__publish_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.__dropped_messages += 1
+
+            try:
+                self.__publish_queue.put_nowait((tag, payload))
+            except queue.Full:
+                return False
+
+        # Wake up the publisher task, only if it's not already scheduled
+        if not self.__publish_wakeup_pending:
+            self.__publish_wakeup_pending = True
+            try:
+                event_loop.call_soon_threadsafe(self.__wake_up_publisher)
+            except RuntimeError:
+                # The event loop is already closed, so the wakeup will never run
+                self.__publish_wakeup_pending = False
+                return False
+
+        return True
+
+    def get_dropped_messages(self) -> int:
+        """
+        Gets the number of published messages dropped because the queue was full.
+
+        Returns:
+            int: The number of dropped messages.
+        """
+        return self.__dropped_messages
+
+    def __drain_publish_queue(self) -> None:
+        """
+        Removes all the messages from the publish queue.
+        """
+        while True:
+            try:
+                self.__publish_queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __wake_up_publisher(self) -> None:
+        """
+        Wakes up the publisher task. Runs in the server event loop.
+        """
+        self.__publish_wakeup_pending = False
+        self.__publish_event.set()
+
+    async def __publisher(self) -> None:
+        """
+        Broadcasts the published messages from the queue to all connected clients.
+        """
+        while not self.__stop_event.is_set():
+            # Wait for published messages
+            await self.__publish_event.wait()
+            self.__publish_event.clear()
+
+            # Broadcast all the pending messages
+            while True:
+                try:
+                    tag, payload = self.__publish_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if isinstance(payload, Image):
+                    await self._broadcast_image_with_tag(tag, payload)
+                else:
+                    await self._broadcast_message(Message(tag, payload))
+
     async def __loop(self):
         """
         The main loop for the WebSocket server.
@@ -314,10 +428,28 @@ class RealtimeTrackerServer:
         # Get the local IP address
         local_ip = get_local_ip()
 
+        # Drop the messages left from a previous run, and reset the wakeup flag in case its wakeup never ran
+        self.__drain_publish_queue()
+        self.__publish_wakeup_pending = False
+
+        # Set the event loop used by the publish method
+        self.__publish_event = asyncio.Event()
+        self.__event_loop = asyncio.get_running_loop()
+
+        # Start the publisher task
+        publisher_task = asyncio.create_task(self.__publisher())
+
         # Start the WebSocket server
-        async with serve(self.__reactive_handler, self.__host, self.__port):
-            self.__log(f"WebSocket server started successfully on ws://{local_ip}:{self.__port}")
-            await asyncio.get_running_loop().run_in_executor(None, self.__stop_event.wait)
+        try:
+            async with serve(self.__reactive_handler, self.__host, self.__port):
+                self.__log(f"WebSocket server started successfully on ws://{local_ip}:{self.__port}")
+                await self.__event_loop.run_in_executor(None, self.__stop_event.wait)
+
+        finally:
+            # Stop the publisher task, the pending wakeup is dropped with the event loop
+            self.__event_loop = None
+            publisher_task.cancel()
+            self.__publish_wakeup_pending = False
 
         # Log the stopping of the server
         self.__log("WebSocket server is stopping...")
@@ -0,0 +1,73 @@
+import numpy as np
+
+from utils import check_type
+
+
+class LatencyHistogram:
+    """
+    Class to keep the latencies of the last samples in a preallocated ring buffer and get their percentiles.
+    """
+    # Default number of samples kept
+    WINDOW = 1024
+
+    # Percentiles reported
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window: int = WINDOW):
+        """
+        Initialize the latency histogram.
+
+        Args:
+            window (int): Number of samples kept.
+        """
+        # Check the type of the window
+        check_type(window, int)
+        if window <= 0:
+            raise ValueError(f"Window must be positive, got {window}.")
+
+        # Preallocate the ring buffer
+        self.__samples = np.zeros(window, dtype=np.float64)
+
+        # Initialize the total number of samples added
+        self.__count = 0
+
+    @property
+    def count(self) -> int:
+        """
+        Get the total number of samples added.
+
+        Returns:
+            int: Number of samples.
+        """
+        return self.__count
+
+    def add(self, latency: float) -> None:
+        """
+        Add a latency sample, replacing the oldest one if the window is full.
+
+        Args:
+            latency (float): Latency in seconds.
+        """
+        self.__samples[self.__count % len(self.__samples)] = latency
+        self.__count += 1
+
+    def percentiles(self) -> dict[str, float]:
+        """
+        Get the percentiles of the samples in the window.
+
+        Returns:
+            dict[str, float]: Latency in milliseconds of each percentile, keyed as 'p50', 'p95' and 'p99'. Empty if no
+            sample was added.
+        """
+        if not self.__count:
+            return {}
+
+        samples = self.__samples[:min(self.__count, len(self.__samples))]
+        values = np.percentile(samples, self.PERCENTILES) * 1000
+        return {f"p{percentile}": round(float(value), 3) for percentile, value in zip(self.PERCENTILES, values)}
+
+    def reset(self) -> None:
+        """
+        Remove all the samples.
+        """
+        self.__count = 0
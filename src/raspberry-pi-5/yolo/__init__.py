@@ -37,6 +37,14 @@ class Yolo(Y):
     MODEL_BGOR = 'bgor'
     MODELS_NAME = (MODEL_M, MODEL_G, MODEL_R, MODEL_GR, MODEL_GMR, MODEL_BGOR)
 
+    # YOLO multi-class models that replace the single-class ones, with the model and class each of their classes maps
+    # back to
+    COMBINED_MODELS_CLASSES = {
+        MODEL_GR: {0: (MODEL_G, 0), 1: (MODEL_R, 0)},
+        MODEL_GMR: {0: (MODEL_G, 0), 1: (MODEL_M, 0), 2: (MODEL_R, 0)},
+    }
+    COMBINED_MODELS_NAME = tuple(COMBINED_MODELS_CLASSES)
+
     # YOLO class colors
     MODEL_G_COLORS = {0: GREEN_COLOR}
     MODEL_M_COLORS = {0: MAGENTA_COLOR}
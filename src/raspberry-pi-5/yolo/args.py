@@ -1,5 +1,6 @@
 from args import Args as A
 from yolo import Yolo
+from yolo.inference_backend import InferenceBackend
 
 
 class Args(A):
@@ -20,6 +21,16 @@ class Args(A):
     EPOCHS = 'epochs'
     DEVICE = 'device'
     IMAGE_SIZE = 'imgsz'
+    COMBINED_MODEL = 'combined-model'
+    BACKEND = 'backend'
+    SOURCE = 'source'
+    FRAMES = 'frames'
+    WARMUP = 'warmup'
+    OUTPUT = 'output'
+    BATCH_SIZE = 'batch-size'
+
+    # Backends that can be benchmarked, the inference backends and the PyTorch model
+    BENCHMARK_BACKENDS = InferenceBackend.BACKENDS + (Yolo.FORMAT_PT,)
 
     @classmethod
     def add_yolo_input_model_argument(cls, parser) -> None:
@@ -121,6 +132,63 @@ class Args(A):
         parser.add_argument(cls.get_attribute_name(cls.IMAGE_SIZE), type=int, required=required, help='YOLO image size',
                             default=640)
 
+    @classmethod
+    def add_yolo_combined_model_argument(cls, parser) -> None:
+        """
+        Add YOLO combined model argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.COMBINED_MODEL), type=str, required=False, default=None,
+                            help='YOLO multi-class model that replaces the single-class ones',
+                            choices=Yolo.COMBINED_MODELS_NAME)
+
+    @classmethod
+    def add_yolo_benchmark_backend_argument(cls, parser) -> None:
+        """
+        Add YOLO benchmark backend argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.BACKEND), type=str, required=True,
+                            help='Backend that runs the YOLO model', choices=cls.BENCHMARK_BACKENDS)
+
+    @classmethod
+    def add_yolo_source_argument(cls, parser) -> None:
+        """
+        Add YOLO source argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.SOURCE), type=str, required=True,
+                            help='Directory of images or recorded video file')
+
+    @classmethod
+    def add_yolo_frames_argument(cls, parser, default: int) -> None:
+        """
+        Add YOLO frames argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.FRAMES), type=int, required=False, default=default,
+                            help='Maximum number of frames read from the source')
+
+    @classmethod
+    def add_yolo_warmup_argument(cls, parser, default: int) -> None:
+        """
+        Add YOLO warmup argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.WARMUP), type=int, required=False, default=default,
+                            help='Number of warmup frames excluded from the results')
+
+    @classmethod
+    def add_yolo_batch_size_argument(cls, parser, default: int) -> None:
+        """
+        Add YOLO batch size argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.BATCH_SIZE), type=int, required=False, default=default,
+                            help='Maximum number of frames of each inference job')
+
+    @classmethod
+    def add_output_argument(cls, parser) -> None:
+        """
+        Add output file argument to the parser.
+        """
+        parser.add_argument(cls.get_attribute_name(cls.OUTPUT), type=str, required=False, default=None,
+                            help='Output file path')
+
     @classmethod
     def add_debug_argument(cls, parser, default: bool = False) -> None:
         """
@@ -0,0 +1,332 @@
+import json
+import os
+import queue
+import resource
+from argparse import ArgumentParser
+from threading import BoundedSemaphore, Event, Lock, Thread
+from time import perf_counter
+
+import cv2
+import numpy as np
+
+from log import Logger
+from model.image_bounding_boxes import ImageBoundingBoxes
+from opencv.letterboxer import Letterboxer
+from utils.latency_histogram import LatencyHistogram
+from yolo import Yolo
+from yolo.args import Args
+from yolo.files import Files
+from yolo.inference_backend import InferenceBackend
+
+# Default number of frames read from the source, and of warmup frames excluded from the results
+FRAMES = 300
+WARMUP_FRAMES = 10
+
+# Maximum number of batches submitted to an inference backend and not completed yet
+MAX_PENDING = 4
+
+# Time to wait for a frame to be completed, in seconds
+COMPLETION_TIMEOUT = 30
+
+
+def load_frames(source: str, max_frames: int) -> list[np.ndarray]:
+    """
+    Load the frames of a directory of images or of a recorded video file, so their decoding isn't measured.
+
+    Args:
+        source (str): Directory of images or video file path, such as the ones recorded by the camera.
+        max_frames (int): Maximum number of frames loaded.
+
+    Returns:
+        list[np.ndarray]: RGB frames.
+    """
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Source not found: {source}")
+
+    frames = []
+    if os.path.isdir(source):
+        # Read the images sorted by name
+        filenames = sorted(filename for filename in os.listdir(source)
+                           if filename.lower().endswith(Yolo.IMAGE_EXTENSIONS))
+        for filename in filenames[:max_frames]:
+            frame = cv2.imread(os.path.join(source, filename))
+            if frame is not None:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    else:
+        # Read the frames of the video
+        capture = cv2.VideoCapture(source)
+        try:
+            while len(frames) < max_frames:
+                read, frame = capture.read()
+                if not read:
+                    break
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        finally:
+            capture.release()
+
+    if not frames:
+        raise ValueError(f"No frames could be read from the source: {source}")
+
+    return frames
+
+
+def get_peak_memory() -> float:
+    """
+    Get the peak resident memory of the process.
+
+    Returns:
+        float: Peak resident memory in MiB.
+    """
+    # The maximum resident set size is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 3)
+
+
+def benchmark_pt(model_name: str, yolo_version: str, frames: list[np.ndarray], warmup: int) -> dict:
+    """
+    Benchmark the PyTorch model of a YOLO model, running the frames one at a time.
+
+    Args:
+        model_name (str): Name of the YOLO model.
+        yolo_version (str): YOLO version of the model files.
+        frames (list[np.ndarray]): RGB frames.
+        warmup (int): Number of warmup frames excluded from the results.
+
+    Returns:
+        dict: Throughput, latency, preprocessing, inference and postprocessing time percentiles, and detections per
+        frame.
+    """
+    # Load the model
+    model = Yolo.load(Files.get_model_best_pt_path(model_name, yolo_version))
+
+    # Initialize the latencies of the measured frames
+    window = len(frames) - warmup
+    latencies = LatencyHistogram(window)
+    preprocess_latencies = LatencyHistogram(window)
+    inference_latencies = LatencyHistogram(window)
+    postprocess_latencies = LatencyHistogram(window)
+    detections = 0
+
+    measure_start, end = None, None
+    for frame_id, frame in enumerate(frames):
+        start = perf_counter()
+        preprocessed_image = InferenceBackend.preprocess(frame, Yolo.IMAGE_SIZE, Yolo.IMAGE_SIZE)
+        preprocessed = perf_counter()
+
+        # Run the model, it expects the arrays in BGR
+        results = model(preprocessed_image[:, :, ::-1], verbose=False)
+        inferred = perf_counter()
+
+        inference = ImageBoundingBoxes.from_pt_cpu(results)
+        end = perf_counter()
+
+        # Skip the warmup frames
+        if frame_id < warmup:
+            continue
+        if measure_start is None:
+            measure_start = start
+
+        latencies.add(end - start)
+        preprocess_latencies.add(preprocessed - start)
+        inference_latencies.add(inferred - preprocessed)
+        postprocess_latencies.add(end - inferred)
+        detections += inference.get_number_of_objects()
+
+    return {
+        'throughput_fps': round(window / (end - measure_start), 3),
+        'latency': latencies.percentiles(),
+        'preprocess': preprocess_latencies.percentiles(),
+        'inference': inference_latencies.percentiles(),
+        'postprocess': postprocess_latencies.percentiles(),
+        'detections_per_frame': round(detections / window, 3),
+    }
+
+
+def benchmark_inference_backend(backend: str, model_name: str, yolo_version: str, frames: list[np.ndarray],
+                                warmup: int, logger: Logger, batch_size: int = InferenceBackend.BATCH_SIZE) -> dict:
+    """
+    Benchmark a YOLO model on an inference backend, keeping up to MAX_PENDING batches of frames submitted as the
+    detection pipeline does.
+
+    Args:
+        backend (str): Inference backend, one of InferenceBackend.BACKENDS.
+        model_name (str): Name of the YOLO model.
+        yolo_version (str): YOLO version of the model files.
+        frames (list[np.ndarray]): RGB frames.
+        warmup (int): Number of warmup frames excluded from the results.
+        logger (Logger): Logger instance for logging messages.
+        batch_size (int): Maximum number of frames of each inference job. Defaults to InferenceBackend.BATCH_SIZE.
+
+    Returns:
+        dict: Throughput, latency, preprocessing, inference and postprocessing time percentiles, detections per frame,
+        and the job statistics of the backend. The inference and postprocessing times are the backend job statistics,
+        so they include the warmup frames.
+    """
+    # Initialize the latencies of the measured frames
+    window = len(frames) - warmup
+    latencies = LatencyHistogram(window)
+    preprocess_latencies = LatencyHistogram(window)
+
+    # Initialize the frames submit times and the completion state, shared with the backend callback
+    lock = Lock()
+    pending = BoundedSemaphore(MAX_PENDING * batch_size)
+    submit_times = dict()
+    completed_event = Event()
+    completed = 0
+    detections = 0
+    end = None
+
+    def put_output_inference(_: str, frame_id: int, inference: ImageBoundingBoxes) -> None:
+        """
+        Record the latency of a completed frame, it's called from the backend callbacks.
+        """
+        nonlocal completed, detections, end
+        now = perf_counter()
+        with lock:
+            submit_time = submit_times.pop(frame_id)
+            if frame_id >= warmup:
+                latencies.add(now - submit_time)
+                detections += inference.get_number_of_objects()
+
+            completed += 1
+            end = now
+            if completed == len(frames):
+                completed_event.set()
+
+        pending.release()
+
+    # Create the inference handler and run it
+    handler = InferenceBackend.create(backend, model_name, yolo_version, logger, queue.Queue(), put_output_inference,
+                                      batch_size=batch_size)
+    height, width, _ = handler.get_input_shape()
+    thread = Thread(target=handler.run)
+    thread.start()
+
+    # Create the letterboxer with a canvas for each pending frame, so none is reused before the backend copies it
+    letterboxer = Letterboxer(InferenceBackend.IMAGE_PADDING_COLOR, buffers=MAX_PENDING * batch_size + 1)
+
+    # Submit the frames and wait for them, the handler is stopped and its thread finishes even if a frame times out
+    measure_start = None
+    try:
+        for frame_id, frame in enumerate(frames):
+            # Wait for a pending slot
+            if not pending.acquire(timeout=COMPLETION_TIMEOUT):
+                raise TimeoutError(f"Frame {frame_id} wasn't submitted after {COMPLETION_TIMEOUT} seconds.")
+
+            start = perf_counter()
+            preprocessed_image = InferenceBackend.preprocess(frame, width, height, letterboxer=letterboxer)
+            preprocessed = perf_counter()
+
+            # Skip the warmup frames
+            if frame_id >= warmup:
+                if measure_start is None:
+                    measure_start = start
+                preprocess_latencies.add(preprocessed - start)
+
+            with lock:
+                submit_times[frame_id] = start
+            handler.put_image(frame_id, preprocessed_image)
+
+        # Wait for the pending frames
+        if not completed_event.wait(COMPLETION_TIMEOUT):
+            raise TimeoutError(f"Only {completed} of {len(frames)} frames completed.")
+    finally:
+        handler.stop()
+        thread.join()
+
+    job_statistics = handler.get_job_statistics()
+    return {
+        'throughput_fps': round(window / (end - measure_start), 3),
+        'latency': latencies.percentiles(),
+        'preprocess': preprocess_latencies.percentiles(),
+        'inference': job_statistics['latency'],
+        'postprocess': job_statistics['postprocess'],
+        'detections_per_frame': round(detections / window, 3),
+        'job_statistics': job_statistics,
+    }
+
+
+def main() -> None:
+    """
+    Main function to run the script.
+    """
+    parser = ArgumentParser(description='Script to benchmark a YOLO model on a given backend')
+    Args.add_yolo_input_model_argument(parser)
+    Args.add_yolo_version_argument(parser)
+    Args.add_yolo_benchmark_backend_argument(parser)
+    Args.add_yolo_source_argument(parser)
+    Args.add_yolo_frames_argument(parser, FRAMES)
+    Args.add_yolo_warmup_argument(parser, WARMUP_FRAMES)
+    Args.add_yolo_batch_size_argument(parser, InferenceBackend.BATCH_SIZE)
+    Args.add_output_argument(parser)
+    args = Args.parse_args_as_dict(parser)
+
+    # Get the YOLO input model
+    arg_yolo_input_model = Args.get_attribute_from_args(args, Args.INPUT_MODEL)
+
+    # Get the YOLO version
+    arg_yolo_version = Args.get_attribute_from_args(args, Args.VERSION)
+
+    # Get the backend
+    arg_backend = Args.get_attribute_from_args(args, Args.BACKEND)
+
+    # Get the source, and the number of frames and warmup frames
+    arg_source = Args.get_attribute_from_args(args, Args.SOURCE)
+    arg_frames = Args.get_attribute_from_args(args, Args.FRAMES)
+    arg_warmup = Args.get_attribute_from_args(args, Args.WARMUP)
+
+    # Get the batch size, the PyTorch model runs one frame at a time
+    arg_batch_size = Args.get_attribute_from_args(args, Args.BATCH_SIZE)
+    if arg_batch_size <= 0:
+        raise ValueError(f"Batch size must be positive, got {arg_batch_size}.")
+    if arg_backend == Yolo.FORMAT_PT and arg_batch_size != 1:
+        raise ValueError(f"The PyTorch model doesn't support batches, got batch size {arg_batch_size}.")
+
+    # Get the output file path
+    arg_output = Args.get_attribute_from_args(args, Args.OUTPUT)
+    if arg_output is None:
+        arg_output = Files.get_model_benchmark_file_path(arg_yolo_input_model, arg_yolo_version, arg_backend)
+
+    # Load the frames
+    frames = load_frames(arg_source, arg_frames)
+    if arg_warmup < 0 or arg_warmup >= len(frames):
+        raise ValueError(f"Warmup frames must be between 0 and {len(frames) - 1}, got {arg_warmup}.")
+    print(f"Loaded {len(frames)} frames from {arg_source}")
+
+    # Run the benchmark
+    if arg_backend == Yolo.FORMAT_PT:
+        metrics = benchmark_pt(arg_yolo_input_model, arg_yolo_version, frames, arg_warmup)
+
+    else:
+        logger = Logger()
+        try:
+            logger.create_thread()
+            metrics = benchmark_inference_backend(arg_backend, arg_yolo_input_model, arg_yolo_version, frames,
+                                                  arg_warmup, logger, batch_size=arg_batch_size)
+        finally:
+            logger.stop_thread()
+
+    results = {
+        'model_name': arg_yolo_input_model,
+        'yolo_version': arg_yolo_version,
+        'backend': arg_backend,
+        'source': arg_source,
+        'frames': len(frames) - arg_warmup,
+        'warmup_frames': arg_warmup,
+        'batch_size': arg_batch_size,
+        **metrics,
+        'peak_memory_mib': get_peak_memory(),
+    }
+
+    # Save the results
+    Files.ensure_directory_exists(arg_output)
+    with open(arg_output, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    # Log
+    print(json.dumps(results, indent=4))
+    print(f"Benchmark results saved to {arg_output}")
+
+
+if __name__ == '__main__':
+    main()
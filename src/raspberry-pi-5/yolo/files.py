@@ -74,6 +74,9 @@ class Files(F):
     # YOLO weights
     WEIGHTS = 'weights'
 
+    # YOLO benchmarks
+    BENCHMARKS = 'benchmarks'
+
     # YOLO zip folder
     ZIP = 'zip'
 
@@ -245,6 +248,20 @@ class Files(F):
 
         return os.path.join(model_weight_path, cls.BEST_ONNX)
 
+    @classmethod
+    def get_model_benchmark_file_path(cls, model_name: str, yolo_version: str,
+                                      backend: str) -> LiteralString | str | bytes:
+        """
+        Get the model benchmark results file path for the given backend.
+        """
+        # Get the model runs path
+        model_runs_path = cls.get_model_runs_dir_path(model_name, yolo_version)
+
+        # Get the current Unix timestamp, so the results of different runs are kept
+        unix_timestamp = int(time())
+
+        return os.path.join(model_runs_path, cls.BENCHMARKS, f'{backend}_{unix_timestamp}.json')
+
     @classmethod
     def get_yolo_zip_dir_path(cls, yolo_version: str) -> LiteralString | str | bytes:
         """
@@ -1,23 +1,24 @@
 import queue
 from multiprocessing import Event
+from threading import BoundedSemaphore, Lock
+from time import perf_counter
 from typing import Optional
 from functools import partial
 from hailo_platform import (HEF, VDevice,
                             FormatType, HailoSchedulingAlgorithm)
 
-from PIL.Image import Image
-import cv2
 import numpy as np
 
 from camera.images_queue import ImagesQueue
 from log import Logger
 from model.image_bounding_boxes import ImageBoundingBoxes
-from opencv.preprocessing import Preprocessing
 from utils import check_type
+from utils.latency_histogram import LatencyHistogram
 from yolo import Yolo
 from yolo.files import Files
+from yolo.inference_backend import InferenceBackend
 
-class Hailo:
+class Hailo(InferenceBackend):
     """
     Class to handle Hailo inference.
     """
@@ -27,25 +28,28 @@ class Hailo:
     # Image allowed extensions
     IMAGE_ALLOWED_EXTENSIONS: tuple = ('.jpg', '.png', '.bmp', '.jpeg')
 
-    # Padding color
-    IMAGE_PADDING_COLOR: tuple[int, int, int] = (0, 0, 0)
+    # Batch size
+    BATCH_SIZE = InferenceBackend.BATCH_SIZE
 
-    # Currently models file paths
-    MODELS_NAME = [Yolo.MODEL_G, Yolo.MODEL_M, Yolo.MODEL_R]
-    NO_PARKING_MODELS_NAME = [Yolo.MODEL_G, Yolo.MODEL_R]
-    PARKING_MODELS_NAME = [Yolo.MODEL_M]
+    # Maximum time to wait for the rest of a batch after its first frame, in seconds
+    BATCH_TIMEOUT = InferenceBackend.BATCH_TIMEOUT
 
-    # Batch size
-    BATCH_SIZE = 1
+    # Timeout to check the stop event while waiting for an in-flight slot or the first frame of a batch, in seconds
+    INPUT_TIMEOUT = 0.1
 
     # Job timeout
     TIMEOUT = 10000
 
+    # Number of completed jobs between the job statistics logs
+    JOB_STATISTICS_PERIOD = 100
+
     def __init__(self, model_name:str, hef_file_path:str, labels_path: str, class_colors: dict[int, tuple[int,int,int]],
                  multi_threading: bool = True, multi_processing: bool = False, images_queue: ImagesQueue = None,
                  logger: Logger = None, batch_size: int = BATCH_SIZE, input_type: Optional[str] = None,
                  output_type: Optional[dict[str, str]] = None, input_queue: queue.Queue = None,
-                 put_output_inference_fn = None,
+                 put_output_inference_fn = None, max_in_flight: Optional[int] = None,
+                 batch_timeout: float = BATCH_TIMEOUT,
+                 score_threshold: float | dict[int, float] = ImageBoundingBoxes.THRESHOLD,
                  ):
         """
         Initialize the Hailo handler class.
@@ -57,13 +61,20 @@ class Hailo:
             class_colors (dict[int, tuple[int, int, int]]): Dictionary mapping class IDs to RGB colors.
             multi_threading (bool): Whether to enable multi-threading. Defaults to True.
             multi_processing (bool): Whether to enable multi-processing. Defaults to False.
-            images_queue (ImagesQueue): Queue for images. Defaults to None.
+            images_queue (ImagesQueue|None): Queue for images. Defaults to None.
             logger (Logger): Logger instance for logging messages. Defaults to None.
-            batch_size (int): Batch size for inference. Defaults to BATCH_SIZE.
+            batch_size (int): Maximum number of frames of each inference job. Defaults to BATCH_SIZE.
             input_type (Optional[str]): Format type of the input stream. Defaults to None.
             output_type (Optional[dict[str, str]]): Format type of the output stream. Defaults to None.
-            input_queue (queue.Queue): Input queue for preprocessed images. Defaults to None.
-            put_output_inference_fn: Function to put output inference results into the queue. Defaults to None.
+            input_queue (queue.Queue): Input queue for the frame ids and preprocessed images. Defaults to None.
+            put_output_inference_fn: Function called with the model name, the frame id and the inference results.
+                Defaults to None.
+            max_in_flight (Optional[int]): Maximum number of jobs submitted and not completed yet. It's capped by the
+                async queue size of the configured model. Defaults to None (the async queue size).
+            batch_timeout (float): Maximum time to wait for the rest of a batch after its first frame, in seconds.
+                Defaults to BATCH_TIMEOUT.
+            score_threshold (float | dict[int, float]): Score threshold for filtering detections, or the threshold of
+                each class. Defaults to ImageBoundingBoxes.THRESHOLD.
         """
         # Check the type of model name
         check_type(model_name, str)
@@ -83,7 +94,8 @@ class Hailo:
         self.__labels = Yolo.get_labels_from_txt(self.__labels_path)
 
         # Check the type of images queue
-        check_type(images_queue, ImagesQueue)
+        if images_queue:
+            check_type(images_queue, ImagesQueue)
         self.__images_queue = images_queue
 
         # Check the type of logger
@@ -96,8 +108,18 @@ class Hailo:
 
         # Check the type of batch size
         check_type(batch_size, int)
+        if batch_size <= 0:
+            raise ValueError(f"Batch size must be positive, got {batch_size}.")
         self.__batch_size = batch_size
 
+        # Check the type of batch timeout
+        check_type(batch_timeout, (int, float))
+        self.__batch_timeout = batch_timeout
+
+        # Check the type of score threshold
+        check_type(score_threshold, (int, float, dict))
+        self.__score_threshold = score_threshold
+
         # Check the type of input queue
         check_type(input_queue, queue.Queue)
         self.__input_queue = input_queue
@@ -108,6 +130,26 @@ class Hailo:
         # Set the put output inference function
         self.__put_output_inference_fn = put_output_inference_fn
 
+        # Check the type of the maximum number of jobs in flight
+        if max_in_flight is not None:
+            check_type(max_in_flight, int)
+            if max_in_flight <= 0:
+                raise ValueError(f"Maximum jobs in flight must be positive, got {max_in_flight}.")
+        self.__max_in_flight = max_in_flight
+
+        # Initialize the in-flight jobs semaphore and depth, they are set when the model is configured
+        self.__in_flight: Optional[BoundedSemaphore] = None
+        self.__in_flight_depth = 0
+
+        # Initialize the job counters, the submit to callback latencies and the postprocessing times
+        self.__jobs_lock = Lock()
+        self.__jobs_submitted = 0
+        self.__jobs_completed = 0
+        self.__jobs_failed = 0
+        self.__frames_completed = 0
+        self.__job_latencies = LatencyHistogram()
+        self.__postprocess_latencies = LatencyHistogram()
+
         # Create the VDevice parameters
         params = VDevice.create_params()
 
@@ -130,13 +172,26 @@ class Hailo:
         self.__infer_model = self.__target.create_infer_model(self.__hef_file_path)
         self.__infer_model.set_batch_size(batch_size)
 
+        # Get the model input size, the detections boxes are normalized by it
+        input_height, input_width, _ = self.get_input_shape()
+        self.__input_size = (input_width, input_height)
+
         # Set the input and output types
-        if not input_type:
+        if input_type:
             self._set_input_type(input_type)
-        if not output_type:
+        if output_type:
             self._set_output_type(output_type)
         self.__output_type = output_type
 
+        # Get the type of each output buffer once, they are reused by every binding
+        self.__output_dtypes = {
+            output_info.name: getattr(np, self._get_output_type_str(output_info))
+            for output_info in self.__hef.get_output_vstream_infos()
+        }
+
+        # Initialize the pool of free bindings, it's created when the model is configured
+        self.__bindings_pool: Optional[queue.Queue] = None
+
     def get_stop_event(self) -> Event:
         """
         Get the stop event for the Hailo handler.
@@ -179,7 +234,7 @@ class Hailo:
         if not self.__output_type:
             return str(output_info.format.type).split(".")[1].lower()
         else:
-            self.__output_type[output_info.name].lower()
+            return self.__output_type[output_info.name].lower()
 
     def get_input_shape(self) -> tuple[int, ...]:
         """
@@ -190,49 +245,36 @@ class Hailo:
         """
         return self.__hef.get_input_vstream_infos()[0].shape  # Assumes one input
 
-    @classmethod
-    def preprocess(cls, image: Image, width: int=Preprocessing.WIDTH, height: int=Preprocessing.HEIGHT) -> np.ndarray:
+    @staticmethod
+    def get_hef_input_shape(hef_file_path: str) -> tuple[int, ...]:
         """
-        Resize image with unchanged aspect ratio using padding.
+        Get the shape of the input layer of a HEF file, without creating a Hailo handler.
 
         Args:
-            image (Image): Input image.
-            width (int): Model input width.
-            height (int): Model input height.
+            hef_file_path (str): Path to the HEF file.
 
         Returns:
-            np.ndarray: Preprocessed and padded image.
+            tuple[int, ...]: Shape of the model's input layer.
         """
-        # Convert image to numpy array
-        image = np.array(image)
-
-        # Resize image with unchanged aspect ratio using padding
-        img_height, img_width, _ = image.shape[:3]
-        scale = min(width / img_width, height / img_height)
-        new_img_width, new_img_height = int(img_width * scale), int(img_height * scale)
-        image = cv2.resize(image, (new_img_width, new_img_height), interpolation=cv2.INTER_CUBIC)
+        return HEF(hef_file_path).get_input_vstream_infos()[0].shape  # Assumes one input
 
-        # Calculate padding and create padded image
-        padded_image = np.full((height, width, 3), cls.IMAGE_PADDING_COLOR, dtype=np.uint8)
-        x_offset =(height - new_img_width) // 2
-        y_offset = (height - new_img_height) // 2
-        padded_image[y_offset:y_offset + new_img_height, x_offset:x_offset + new_img_width] = image
-        return padded_image
-
-    def put_image(self, preprocessed_image: np.ndarray) -> None:
+    def put_image(self, frame_id: int, preprocessed_image: np.ndarray) -> None:
         """
         Put a preprocessed image into the input queue.
 
         Args:
+            frame_id (int): Id of the frame, it's passed along with the inference results.
             preprocessed_image (np.ndarray): Preprocessed image to be put into the queue.
         """
-        # Check the type of preprocessed image
+        # Check the type of frame id and preprocessed image
+        check_type(frame_id, int)
         check_type(preprocessed_image, np.ndarray)
 
-        self.__input_queue.put(preprocessed_image)
+        # Put the image, dropping the oldest one if the queue is bounded and full
+        self._put_latest(self.__input_queue, (frame_id, preprocessed_image))
 
     def callback(
-        self, completion_info, bindings, preprocessed_image: np.ndarray
+        self, completion_info, bindings_list: list, frame_ids: list[int], submit_time: float
     ) -> None:
         """
         Callback function for handling inference results.
@@ -240,54 +282,135 @@ class Hailo:
         Args:
             completion_info: Information about the completion of the
                              inference task.
-            bindings: Binding objects containing input
-                                  and output buffers.
-            preprocessed_image (np.ndarray): Preprocessed image used for inference.
+            bindings_list (list): Binding objects containing input
+                                  and output buffers, one for each frame of the batch.
+            frame_ids (list[int]): Ids of the frames of the batch, in the same order as the bindings.
+            submit_time (float): Performance counter time when the job was submitted.
+        """
+        inferences = []
+        try:
+            # Record the job latency
+            self.__record_job(perf_counter() - submit_time, len(frame_ids), failed=bool(completion_info.exception))
+
+            if completion_info.exception:
+                self.__logger.log(f'Inference error: {completion_info.exception}')
+                return
+
+            postprocess_start = perf_counter()
+            for bindings in bindings_list:
+                # If the model has a single output, return the output buffer.
+                if len(bindings._output_names) == 1:
+                    result = bindings.output().get_buffer()
+
+                # Else, return a dictionary of output buffers, where the keys are the output names.
+                else:
+                    result = {
+                        name: np.expand_dims(
+                            bindings.output(name).get_buffer(), axis=0
+                        )
+                        for name in bindings._output_names
+                    }
+
+                # The detections are copied out of the output buffers before the bindings are recycled
+                inferences.append(ImageBoundingBoxes.from_hailo(result, self.__score_threshold, self.__input_size))
+
+            # Record the time to decode the detections of the job
+            with self.__jobs_lock:
+                self.__postprocess_latencies.add(perf_counter() - postprocess_start)
+        finally:
+            # Return the bindings to the pool and free the in-flight slot
+            for bindings in bindings_list:
+                self.__bindings_pool.put(bindings)
+            self.__in_flight.release()
+
+        # Split the results back out per frame
+        for frame_id, inference in zip(frame_ids, inferences):
+            self.__put_output_inference_fn(self.__model_name, frame_id, inference)
+
+    def _get_batch(self) -> tuple[list[int], list]:
         """
-        if completion_info.exception:
-            self.__logger.log(f'Inference error: {completion_info.exception}')
-            return
+        Get up to batch size frames from the input queue, copying each image into free bindings as soon as it's
+        dequeued, so no preprocessed image is held while the rest of the batch arrives. It waits for the first frame
+        until the input timeout, and then for the rest of the batch until the batch timeout, so a partial batch is
+        submitted if the frames stop arriving.
 
-        # If the model has a single output, return the output buffer.
-        if len(bindings._output_names) == 1:
-            result = bindings.output().get_buffer()
+        It must be called while holding an in-flight slot, so there are free bindings for the whole batch.
 
-        # Else, return a dictionary of output buffers, where the keys are the output names.
-        else:
-            result = {
-                name: np.expand_dims(
-                    bindings.output(name).get_buffer(), axis=0
-                )
-                for name in bindings._output_names
-            }
-        self.__put_output_inference_fn(self.__model_name, ImageBoundingBoxes.from_hailo(result))
+        Returns:
+            tuple[list[int], list]: Frame ids and bindings of the batch, empty if no frame arrived before the input
+            timeout.
+        """
+        frame_ids, bindings_list = [], []
+        timeout = self.INPUT_TIMEOUT
+        deadline = None
+        while len(frame_ids) < self.__batch_size:
+            try:
+                frame_id, preprocessed_image = self.__input_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            # Copy the image into the input buffer of free bindings
+            bindings = self.__bindings_pool.get()
+            np.copyto(bindings.input().get_buffer(), preprocessed_image)
+            frame_ids.append(frame_id)
+            bindings_list.append(bindings)
+
+            # Wait for the rest of the batch until the batch timeout after its first frame
+            if deadline is None:
+                deadline = perf_counter() + self.__batch_timeout
+            timeout = deadline - perf_counter()
+            if timeout <= 0:
+                break
+
+        return frame_ids, bindings_list
 
     def run(self) -> None:
         """
         Run the inference loop.
 
         This method continuously retrieves batches of images from the input queue,
-        preprocesses them, and runs inference using the configured infer model.
+        and runs inference using the configured infer model.
         """
         with self.__infer_model.configure() as configured_infer_model:
-            while not self.__stop_event.is_set():
-                # Get a preprocessed image from the input queue
-                preprocessed_image = self.__input_queue.get()
-
-                # Create the bindings for the input and output buffers
-                bindings = self._create_bindings(configured_infer_model)
-                bindings.input().set_buffer(np.array(preprocessed_image))
+            # Bound the jobs in flight, the async queue of the model can't hold more
+            self.__in_flight_depth = configured_infer_model.get_async_queue_size()
+            if self.__max_in_flight is not None:
+                self.__in_flight_depth = min(self.__max_in_flight, self.__in_flight_depth)
+            self.__in_flight = BoundedSemaphore(self.__in_flight_depth)
+            self.__logger.log(f"Running with up to {self.__in_flight_depth} jobs in flight of up to "
+                              f"{self.__batch_size} frames.")
+
+            # Preallocate the bindings for every frame of every job that can be in flight
+            self.__bindings_pool = self._create_bindings_pool(configured_infer_model,
+                                                              self.__in_flight_depth * self.__batch_size)
 
-                configured_infer_model.wait_for_async_ready(timeout_ms=self.TIMEOUT)
-                job = configured_infer_model.run_async(
-                    bindings, partial(
+            while not self.__stop_event.is_set():
+                # Wait for an in-flight slot before taking the frames, it's released by the job callback. The frames
+                # wait in the input queue instead of being held here, so their letterboxer canvases aren't reused
+                if not self.__in_flight.acquire(timeout=self.INPUT_TIMEOUT):
+                    continue
+
+                # Get a batch of frame ids, with their preprocessed images copied into free bindings
+                frame_ids, bindings_list = self._get_batch()
+                if not frame_ids:
+                    self.__in_flight.release()
+                    continue
+
+                configured_infer_model.wait_for_async_ready(timeout_ms=self.TIMEOUT, frames_count=len(bindings_list))
+                with self.__jobs_lock:
+                    self.__jobs_submitted += 1
+                configured_infer_model.run_async(
+                    bindings_list, partial(
                         self.callback,
-                        preprocessed_image=preprocessed_image,
-                        bindings=bindings
+                        bindings_list=bindings_list,
+                        frame_ids=frame_ids,
+                        submit_time=perf_counter()
                     )
                 )
-            job.wait(self.TIMEOUT)  # Wait for the last job
 
+            # Wait for the jobs in flight
+            for _ in range(self.__in_flight_depth):
+                self.__in_flight.acquire(timeout=self.TIMEOUT / 1000)
 
     def _create_bindings(self, configured_infer_model) -> object:
         """
@@ -299,26 +422,80 @@ class Hailo:
         Returns:
             object: Bindings object with input and output buffers.
         """
-        if not self.__output_type:
-            output_buffers = {
-                output_info.name: np.empty(
-                    self.__infer_model.output(output_info.name).shape,
-                    dtype=(getattr(np, self._get_output_type_str(output_info)))
-                )
-            for output_info in self.__hef.get_output_vstream_infos()
-            }
-        else:
-            output_buffers = {
-                name: np.empty(
-                    self.__infer_model.output(name).shape,
-                    dtype=(getattr(np, self.__output_type[name].lower()))
-                )
-            for name in self.__output_type
-            }
-        return configured_infer_model.create_bindings(
+        output_buffers = {
+            name: np.empty(self.__infer_model.output(name).shape, dtype=dtype)
+            for name, dtype in self.__output_dtypes.items()
+        }
+        bindings = configured_infer_model.create_bindings(
             output_buffers=output_buffers
         )
 
+        # Set the input buffer, the images are copied into it
+        bindings.input().set_buffer(np.empty(self.__infer_model.input().shape, dtype=np.uint8))
+        return bindings
+
+    def _create_bindings_pool(self, configured_infer_model, size: int) -> queue.Queue:
+        """
+        Create a pool of preallocated bindings, one for each frame that can be in flight. The bindings are taken when a
+        job is submitted and put back when its callback finishes.
+
+        Args:
+            configured_infer_model: The configured inference model.
+            size (int): Number of bindings.
+
+        Returns:
+            queue.Queue: Queue with the free bindings.
+        """
+        bindings_pool = queue.Queue()
+        for _ in range(size):
+            bindings_pool.put(self._create_bindings(configured_infer_model))
+
+        return bindings_pool
+
+    def __record_job(self, latency: float, frames: int, failed: bool) -> None:
+        """
+        Record a completed job, logging the job statistics periodically.
+
+        Args:
+            latency (float): Time from the job submission to its callback, in seconds.
+            frames (int): Number of frames of the job.
+            failed (bool): Whether the job failed.
+        """
+        with self.__jobs_lock:
+            self.__jobs_completed += 1
+            self.__frames_completed += frames
+            if failed:
+                self.__jobs_failed += 1
+            self.__job_latencies.add(latency)
+            log_statistics = self.__jobs_completed % self.JOB_STATISTICS_PERIOD == 0
+
+        # Log
+        if log_statistics:
+            self.__logger.log(f"Job statistics: {self.get_job_statistics()}")
+
+    def get_job_statistics(self) -> dict[str, int | dict[str, float]]:
+        """
+        Get the job counters and the submit to callback latency percentiles, to choose the in-flight depth that keeps
+        the device busy without queueing latency.
+
+        Returns:
+            dict[str, int | dict[str, float]]: In-flight depth, batch size, jobs submitted, completed, failed and in
+            flight, frames completed, and the latency and postprocessing time percentiles in milliseconds of the last
+            completed jobs.
+        """
+        with self.__jobs_lock:
+            return {
+                'in_flight_depth': self.__in_flight_depth,
+                'batch_size': self.__batch_size,
+                'jobs_submitted': self.__jobs_submitted,
+                'jobs_completed': self.__jobs_completed,
+                'jobs_failed': self.__jobs_failed,
+                'jobs_in_flight': self.__jobs_submitted - self.__jobs_completed,
+                'frames_completed': self.__frames_completed,
+                'latency': self.__job_latencies.percentiles(),
+                'postprocess': self.__postprocess_latencies.percentiles(),
+            }
+
     def start(self) -> None:
         """
         Start the Hailo handler by setting the stop event to False
@@ -0,0 +1,278 @@
+import queue
+from abc import ABC, abstractmethod
+from multiprocessing import Event
+from typing import Optional
+
+from PIL.Image import Image
+import numpy as np
+
+from log import Logger
+from opencv.letterboxer import Letterboxer, LetterboxTransform
+from opencv.preprocessing import Preprocessing
+from yolo import Yolo
+from yolo.files import Files
+
+
+class InferenceBackend(ABC):
+    """
+    Base class of the backends that run a YOLO model on the preprocessed images.
+
+    The images are put in the backend input queue with their frame id. The run loop infers them and calls the put output
+    inference function with the model name, the frame id and the detections as ImageBoundingBoxes, normalized by the
+    model input size.
+    """
+    # Backends
+    HAILO = 'hailo'
+    ONNX_RUNTIME = 'onnx_runtime'
+    BACKENDS = (HAILO, ONNX_RUNTIME)
+
+    # Default batch size, and maximum time to wait for the rest of a batch after its first frame, in seconds
+    BATCH_SIZE = 1
+    BATCH_TIMEOUT = 0.01
+
+    # Padding color
+    IMAGE_PADDING_COLOR: tuple[int, int, int] = (0, 0, 0)
+
+    # Default letterboxer of the preprocessing, for callers that copy or consume each image before preprocessing the
+    # next BUFFERS ones. The pipelines that queue the images use their own one, sized with get_letterboxer_buffers
+    LETTERBOXER = Letterboxer(IMAGE_PADDING_COLOR)
+
+    # Currently models file paths
+    MODELS_NAME = [Yolo.MODEL_G, Yolo.MODEL_M, Yolo.MODEL_R]
+    NO_PARKING_MODELS_NAME = [Yolo.MODEL_G, Yolo.MODEL_R]
+    PARKING_MODELS_NAME = [Yolo.MODEL_M]
+
+    # Models run with each combined model, without and with the parking event set
+    COMBINED_MODELS_NAME = {
+        Yolo.MODEL_GR: ([Yolo.MODEL_GR], [Yolo.MODEL_M]),
+        Yolo.MODEL_GMR: ([Yolo.MODEL_GMR], [Yolo.MODEL_GMR]),
+    }
+
+    @classmethod
+    def get_models_name(cls, combined_model_name: Optional[str] = None) -> tuple[list[str], list[str]]:
+        """
+        Get the models to run without and with the parking event set.
+
+        Args:
+            combined_model_name (Optional[str]): Multi-class model that replaces the single-class ones. Defaults to None
+                (run the single-class models).
+
+        Returns:
+            tuple[list[str], list[str]]: Models to run without and with the parking event set.
+        """
+        if combined_model_name is None:
+            return cls.NO_PARKING_MODELS_NAME, cls.PARKING_MODELS_NAME
+
+        models_name = cls.COMBINED_MODELS_NAME.get(combined_model_name)
+        if models_name is None:
+            raise ValueError(f"Unknown combined model: {combined_model_name}")
+        return models_name
+
+    @staticmethod
+    def get_output_models_name(model_name: str) -> list[str]:
+        """
+        Get the models whose detections a model produces, the single-class models a combined model maps back to.
+
+        Args:
+            model_name (str): Name of the model.
+
+        Returns:
+            list[str]: Names of the output models.
+        """
+        classes_map = Yolo.COMBINED_MODELS_CLASSES.get(model_name)
+        if classes_map is None:
+            return [model_name]
+
+        return list(dict.fromkeys(output_model_name for output_model_name, _ in classes_map.values()))
+
+    @classmethod
+    def create(cls, backend: str, model_name: str, yolo_version: str, logger: Logger, input_queue: queue.Queue,
+               put_output_inference_fn, images_queue=None, max_in_flight: Optional[int] = None,
+               batch_size: int = BATCH_SIZE, batch_timeout: float = BATCH_TIMEOUT) -> 'InferenceBackend':
+        """
+        Create the inference handler of a model with the given backend. The backends are imported here, so only the
+        selected one needs its runtime installed.
+
+        Args:
+            backend (str): Inference backend, one of BACKENDS.
+            model_name (str): Name of the YOLO model.
+            yolo_version (str): YOLO version of the model files.
+            logger (Logger): Logger instance for logging messages.
+            input_queue (queue.Queue): Input queue for the frame ids and preprocessed images.
+            put_output_inference_fn: Function called with the model name, the frame id and the inference results.
+            images_queue (ImagesQueue|None): Queue for images, used by the Hailo backend. Defaults to None.
+            max_in_flight (Optional[int]): Maximum number of jobs submitted and not completed yet, used by the Hailo
+                backend. Defaults to None (the async queue size).
+            batch_size (int): Maximum number of frames of each inference job, used by the Hailo backend. The ONNX
+                Runtime backend runs one frame at a time. Defaults to BATCH_SIZE.
+            batch_timeout (float): Maximum time to wait for the rest of a batch after its first frame, in seconds, used
+                by the Hailo backend. Defaults to BATCH_TIMEOUT.
+
+        Returns:
+            InferenceBackend: The inference handler.
+        """
+        if backend == cls.HAILO:
+            from yolo.hailo import Hailo
+
+            # Get the HEF and labels file paths, and the model class colors
+            hef_file_path = Files.get_model_hailo_suite_compiled_hef_file_path(model_name, yolo_version)
+            labels_file_path = Files.get_hailo_labels_file_path(model_name)
+            model_class_colors = Yolo.get_model_classes_color_palette(model_name)
+
+            return Hailo(model_name, hef_file_path, labels_file_path, model_class_colors, images_queue=images_queue,
+                         logger=logger, input_queue=input_queue, put_output_inference_fn=put_output_inference_fn,
+                         max_in_flight=max_in_flight, batch_size=batch_size, batch_timeout=batch_timeout)
+
+        if backend == cls.ONNX_RUNTIME:
+            from yolo.onnx_runtime import OnnxRuntime
+
+            # Check the batch size, the frames are run one at a time
+            if batch_size != 1:
+                raise ValueError(f"The ONNX Runtime backend doesn't support batches, got batch size {batch_size}.")
+
+            # Get the ONNX file path exported from the best PyTorch weights
+            onnx_file_path = Files.get_model_best_onnx_path(model_name, yolo_version)
+
+            return OnnxRuntime(model_name, onnx_file_path, logger=logger, input_queue=input_queue,
+                               put_output_inference_fn=put_output_inference_fn)
+
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    @classmethod
+    def preprocess(cls, image: Image, width: int=Preprocessing.WIDTH, height: int=Preprocessing.HEIGHT,
+                   letterboxer: Optional[Letterboxer] = None) -> np.ndarray:
+        """
+        Resize image with unchanged aspect ratio using padding. Images that already have the model input size, such
+        as the frames captured from the camera low resolution stream, are returned without resizing them.
+
+        The padded image is one of the letterboxer canvases, the backends copy it into their input buffers.
+
+        Args:
+            image (Image|np.ndarray): Input image.
+            width (int): Model input width.
+            height (int): Model input height.
+            letterboxer (Optional[Letterboxer]): Letterboxer whose canvases are used. Defaults to None (LETTERBOXER).
+
+        Returns:
+            np.ndarray: Preprocessed and padded image.
+        """
+        if letterboxer is None:
+            letterboxer = cls.LETTERBOXER
+
+        padded_image, _ = letterboxer.letterbox(image, width, height)
+        return padded_image
+
+    @staticmethod
+    def get_letterboxer_buffers(max_pending: int, input_queue_size: int, handlers: int) -> int:
+        """
+        Get the number of letterboxer canvases that can be referenced at the same time by a pipeline, so none of them
+        is reused before the backends copy it. Every backend input queue gets the same images and keeps the latest
+        ones, and the backends copy each image into their input buffers as soon as they take it from the queue.
+
+        Args:
+            max_pending (int): Maximum number of images being preprocessed or waiting to be delivered.
+            input_queue_size (int): Maximum number of images in each backend input queue.
+            handlers (int): Number of backends, each one can be copying an older image than the queued ones.
+
+        Returns:
+            int: Number of canvases, counting the image being dispatched.
+        """
+        return max_pending + 1 + input_queue_size + handlers
+
+    @staticmethod
+    def _put_latest(input_queue: queue.Queue, item: tuple[int, np.ndarray]) -> bool:
+        """
+        Put an item into a bounded input queue, dropping the oldest one if it's full, so the queued images are the
+        freshest ones and the letterboxer canvases they reference aren't reused while they wait.
+
+        Args:
+            input_queue (queue.Queue): Input queue.
+            item (tuple[int, np.ndarray]): Frame id and preprocessed image.
+
+        Returns:
+            bool: True if an older item was dropped, False otherwise.
+        """
+        dropped = False
+        while True:
+            try:
+                input_queue.put_nowait(item)
+                return dropped
+            except queue.Full:
+                try:
+                    input_queue.get_nowait()
+                    dropped = True
+                except queue.Empty:
+                    pass
+
+    @classmethod
+    def get_letterbox_transform(cls, input_size: tuple[int, int], width: int = Preprocessing.WIDTH,
+                                height: int = Preprocessing.HEIGHT) -> LetterboxTransform:
+        """
+        Get the transform of the preprocessing, to map the detections back to the input images.
+
+        Args:
+            input_size (tuple[int, int]): Width and height of the input images.
+            width (int): Model input width.
+            height (int): Model input height.
+
+        Returns:
+            LetterboxTransform: The cached transform.
+        """
+        return cls.LETTERBOXER.get_transform(input_size, (width, height))
+
+    @abstractmethod
+    def get_input_shape(self) -> tuple[int, ...]:
+        """
+        Get the shape of the model's input layer.
+
+        Returns:
+            tuple[int, ...]: Height, width and channels of the model's input layer.
+        """
+
+    @abstractmethod
+    def put_image(self, frame_id: int, preprocessed_image: np.ndarray) -> None:
+        """
+        Put a preprocessed image into the input queue.
+
+        Args:
+            frame_id (int): Id of the frame, it's passed along with the inference results.
+            preprocessed_image (np.ndarray): Preprocessed image to be put into the queue.
+        """
+
+    @abstractmethod
+    def run(self) -> None:
+        """
+        Run the inference loop until the backend is stopped.
+        """
+
+    @abstractmethod
+    def get_job_statistics(self) -> dict[str, int | dict[str, float]]:
+        """
+        Get the job counters and the latency percentiles.
+
+        Returns:
+            dict[str, int | dict[str, float]]: In-flight depth, batch size, jobs submitted, completed, failed and in
+            flight, frames completed, and the latency and postprocessing time percentiles in milliseconds of the last
+            completed jobs.
+        """
+
+    @abstractmethod
+    def get_stop_event(self) -> Event:
+        """
+        Get the stop event for the backend.
+
+        Returns:
+            Event: The stop event.
+        """
+
+    @abstractmethod
+    def start(self) -> None:
+        """
+        Start the backend by clearing the stop event.
+        """
+
+    @abstractmethod
+    def stop(self) -> None:
+        """
+        Stop the backend by setting the stop event.
+        """
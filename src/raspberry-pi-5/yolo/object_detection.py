@@ -0,0 +1,282 @@
+import queue
+import threading
+from functools import partial
+from multiprocessing import Event
+from typing import Optional, TYPE_CHECKING
+
+from camera.frame_ring import FrameRing
+from camera.preprocessing_pool import PreprocessingPool
+from env import Env
+from log import Logger
+from model.image_bounding_boxes import ImageBoundingBoxes
+from model.inference_aggregator import InferenceAggregator
+from opencv.letterboxer import Letterboxer
+from utils import check_type
+from yolo import Yolo
+from yolo.inference_backend import InferenceBackend
+
+# The images queue is only imported for the type hints, since it requires the camera and the server, which aren't needed
+# to run the pipeline with the ONNX Runtime backend
+if TYPE_CHECKING:
+    from camera.images_queue import ImagesQueue
+
+# Timeout to check the stop event while waiting for a frame
+FRAME_TIMEOUT = 0.1
+
+# Maximum number of preprocessed images waiting in each inference handler input queue, the oldest ones are dropped
+INPUT_QUEUE_SIZE = 2
+
+def put_image(frame_id: int, image, parking_event: Event, inference_handlers: dict[str, InferenceBackend],
+              models_name: tuple[list[str], list[str]], inference_aggregator: InferenceAggregator,
+              stopped_inference_handlers: bool) -> bool:
+    """
+    Put a preprocessed image in the input queues of the inference handlers required by the parking event, registering
+    the frame in the inference aggregator with the models whose detections they produce.
+
+    Returns:
+        bool: Whether the inference handlers only used without the parking event are stopped.
+    """
+    no_parking_models_name, parking_models_name = models_name
+
+    # Check if the parking event is set
+    parking = parking_event.is_set()
+    if parking:
+        if not stopped_inference_handlers:
+            # Stop the inference handlers that are not used while parking
+            for model_name in no_parking_models_name:
+                if model_name not in parking_models_name:
+                    inference_handlers[model_name].stop()
+
+        stopped_inference_handlers = True
+
+    # Put the image in the inference handler input queues, a combined model produces the detections of several models
+    current_models_name = parking_models_name if parking else no_parking_models_name
+    output_models_name = [output_model_name for model_name in current_models_name
+                          for output_model_name in InferenceBackend.get_output_models_name(model_name)]
+    inference_aggregator.expect(frame_id, output_models_name)
+    for model_name in current_models_name:
+        inference_handlers[model_name].put_image(frame_id, image)
+
+    return stopped_inference_handlers
+
+def submit_image(preprocessing_pool: PreprocessingPool, stop_event: Event, frame_id: int, image) -> None:
+    """
+    Submit an image to the preprocessing pool, waiting for a free slot while the stop event is not set.
+    """
+    while not stop_event.is_set():
+        if preprocessing_pool.submit(frame_id, image, timeout=FRAME_TIMEOUT):
+            return
+
+def listen_frame_ring(frame_ring: FrameRing, stop_event: Event, preprocessing_pool: PreprocessingPool) -> None:
+    """
+    Listen to the shared memory frame ring and submit the latest frame to the preprocessing pool.
+    """
+    # Check the type of frame ring
+    check_type(frame_ring, FrameRing)
+
+    last_frame_id = FrameRing.NO_FRAME_ID
+    while not stop_event.is_set():
+        # Wait for a new frame
+        frame = frame_ring.wait_for_frame(last_frame_id, FRAME_TIMEOUT)
+        if frame is None:
+            continue
+        last_frame_id, _, image = frame
+
+        # Copy the frame out of its ring slot, since it's reused after the next slots are written, while the frame can
+        # still be waiting in the preprocessing pool or the inference handlers input queues
+        image = image.copy()
+
+        # Drop the frame if the slot was rewritten while copying it
+        if not frame_ring.is_valid(last_frame_id):
+            continue
+
+        submit_image(preprocessing_pool, stop_event, last_frame_id, image)
+
+def listen_images_queue(images_queue: 'ImagesQueue', stop_event: Event, preprocessing_pool: PreprocessingPool) -> None:
+    """
+    Listen to the images queue and submit the images to the preprocessing pool.
+    """
+    # Check the type of stop event
+    check_type(stop_event, Event)
+
+    # Get the pending image event from the images queue
+    pending_image_event = images_queue.get_pending_image_event()
+
+    # Wait for the stop event
+    while not stop_event.is_set():
+        # Wait for the pending image event
+        if not pending_image_event.wait(FRAME_TIMEOUT):
+            continue
+
+        # Get the image from the images queue, it's preprocessed by the pool
+        input_image = images_queue.get_input_image_with_id()
+        if input_image is None:
+            continue
+
+        submit_image(preprocessing_pool, stop_event, *input_image)
+
+def dispatch_preprocessed_images(preprocessing_pool: PreprocessingPool, stop_event: Event, parking_event: Event,
+                                 inference_handlers: dict[str, InferenceBackend],
+                                 models_name: tuple[list[str], list[str]], inference_aggregator: InferenceAggregator) -> None:
+    """
+    Get the preprocessed images from the pool and put them in the inference handlers based on the parking event.
+    """
+    # Check the type of parking event
+    check_type(parking_event, Event)
+
+    stopped_inference_handlers = False
+    while not stop_event.is_set():
+        # Get the next preprocessed image, the stale ones are dropped by the pool
+        result = preprocessing_pool.get_result(timeout=FRAME_TIMEOUT)
+        if result is None:
+            continue
+        frame_id, image = result
+
+        stopped_inference_handlers = put_image(frame_id, image, parking_event, inference_handlers, models_name,
+                                           inference_aggregator, stopped_inference_handlers)
+
+def aggregate_inferences(inferences_queue: queue.Queue, inference_aggregator: InferenceAggregator,
+                         images_queue: 'ImagesQueue', stop_event: Event) -> None:
+    """
+    Combine the inferences of the models for each frame, and put them in the images queue once all the models reported
+    or the frame deadline passed.
+    """
+    while not stop_event.is_set():
+        # Wait for an inference until the deadline of the oldest pending frame
+        try:
+            frame_id, model_name, inference = inferences_queue.get(
+                timeout=inference_aggregator.get_timeout(FRAME_TIMEOUT))
+        except queue.Empty:
+            pass
+        else:
+            frame_detections = inference_aggregator.add(frame_id, model_name, inference)
+            if frame_detections is not None:
+                images_queue.put_output_inference(frame_detections)
+
+        # Put the expired frames with the inferences that arrived in time
+        for frame_detections in inference_aggregator.pop_expired():
+            images_queue.put_output_inference(frame_detections)
+
+def main(logger: Logger, images_queue: 'ImagesQueue', parking_event: Event, stop_event: Event,
+         frame_ring: Optional[FrameRing] = None, preprocessing_workers: int = PreprocessingPool.WORKERS,
+         preprocessing_processes: bool = False,
+         inference_deadline: float = InferenceAggregator.DEADLINE, max_in_flight: Optional[int] = None,
+         combined_model_name: Optional[str] = None, backend: str = InferenceBackend.HAILO,
+         batch_size: int = InferenceBackend.BATCH_SIZE, batch_timeout: float = InferenceBackend.BATCH_TIMEOUT) -> None:
+    """
+    Main function to run the script.
+
+    If the frame ring is set, the frames are read from it instead of the images queue. The images are preprocessed on a
+    pool of preprocessing_workers threads, or processes if preprocessing_processes is set. The inferences of each frame
+    are put in the images queue once all its models reported or after inference_deadline seconds. Each Hailo handler
+    keeps up to max_in_flight jobs submitted, or its model async queue size if it's None, of up to batch_size frames
+    gathered for at most batch_timeout seconds.
+
+    If the combined model name is set, that multi-class model replaces the single-class ones it combines, so each frame
+    is run once, and its classes are mapped back to the single-class models detections.
+
+    The models run on the given inference backend, the Hailo accelerator or ONNX Runtime on the CPU. The Hailo runtime
+    and the camera are only imported by the code that uses them, so the ONNX Runtime backend needs neither installed.
+    """
+    # Check the type of logger
+    check_type(logger, Logger)
+
+    # Check the type of stop event
+    check_type(stop_event, Event)
+
+    # Check the type of parking event
+    check_type(parking_event, Event)
+
+    # Check the inference backend
+    if backend not in InferenceBackend.BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    # Get the YOLO version from the environment variables
+    yolo_version = Env.get_yolo_version()
+
+    # Get the models to run without and with the parking event set
+    models_name = InferenceBackend.get_models_name(combined_model_name)
+    inference_models_name = list(dict.fromkeys(models_name[0] + models_name[1]))
+
+    # Create the inference aggregator and the queue for the inferences of the inference handlers
+    inference_aggregator = InferenceAggregator(inference_deadline, logger=logger)
+    inferences_queue = queue.Queue()
+
+    def put_output_inference(model_name: str, frame_id: int, inference: ImageBoundingBoxes) -> None:
+        """
+        Put an inference in the queue of the aggregator, it's called from the inference callbacks. The inferences of the
+        combined models are split into the ones of the single-class models.
+        """
+        classes_map = Yolo.COMBINED_MODELS_CLASSES.get(model_name)
+        if classes_map is None:
+            inferences_queue.put((frame_id, model_name, inference))
+            return
+
+        for output_model_name, output_inference in inference.split_classes(classes_map).items():
+            inferences_queue.put((frame_id, output_model_name, output_inference))
+
+    # Create the inference handlers
+    inference_handlers = dict()
+    for model_name in inference_models_name:
+        # Create the queue for the model, it's only shared between the threads of this process
+        input_queue = queue.Queue(maxsize=INPUT_QUEUE_SIZE)
+
+        # Create the inference handler
+        inference_handlers[model_name] = InferenceBackend.create(backend, model_name, yolo_version, logger, input_queue,
+                                                                 put_output_inference, images_queue=images_queue,
+                                                                 max_in_flight=max_in_flight, batch_size=batch_size,
+                                                                 batch_timeout=batch_timeout)
+
+    # Create the letterboxer with a canvas for each preprocessed image that can be in the pipeline at the same time
+    letterboxer_buffers = InferenceBackend.get_letterboxer_buffers(PreprocessingPool.MAX_PENDING, INPUT_QUEUE_SIZE,
+                                                                   len(inference_models_name))
+    letterboxer = Letterboxer(InferenceBackend.IMAGE_PADDING_COLOR, buffers=letterboxer_buffers)
+
+    # Create and start the preprocessing pool
+    preprocessing_pool = PreprocessingPool(partial(InferenceBackend.preprocess, letterboxer=letterboxer),
+                                           logger=logger, workers=preprocessing_workers,
+                                           use_processes=preprocessing_processes)
+    preprocessing_pool.start()
+
+    # Create the threads
+    threads = []
+    if frame_ring:
+        thread_1 = threading.Thread(target=listen_frame_ring, args=(frame_ring, stop_event, preprocessing_pool))
+    else:
+        thread_1 = threading.Thread(target=listen_images_queue, args=(images_queue, stop_event, preprocessing_pool))
+    threads.append(thread_1)
+
+    thread_2 = threading.Thread(target=dispatch_preprocessed_images,
+                                args=(preprocessing_pool, stop_event, parking_event, inference_handlers, models_name,
+                                      inference_aggregator))
+    threads.append(thread_2)
+
+    thread_3 = threading.Thread(target=aggregate_inferences,
+                                args=(inferences_queue, inference_aggregator, images_queue, stop_event))
+    threads.append(thread_3)
+
+    inference_threads = []
+    for model_name in inference_models_name:
+        # Get the inference handler for the model
+        inference_handler = inference_handlers.get(model_name)
+
+        # Create a thread to handle the inference
+        thread = threading.Thread(target=inference_handler.run, args=())
+        inference_threads.append(thread)
+
+    # Start the threads
+    for thread in threads + inference_threads:
+        thread.start()
+
+    # Wait for the threads to finish, they return once the stop event is set
+    for thread in threads:
+        thread.join()
+
+    # Stop the inference handlers, and wait for their jobs in flight
+    for inference_handler in inference_handlers.values():
+        inference_handler.stop()
+    for thread in inference_threads:
+        thread.join()
+
+    # Stop the preprocessing pool
+    preprocessing_pool.stop()
\ No newline at end of file
@@ -0,0 +1,244 @@
+import queue
+from multiprocessing import Event
+from threading import Lock
+from time import perf_counter
+
+import numpy as np
+import onnxruntime
+
+from log import Logger
+from model.image_bounding_boxes import ImageBoundingBoxes
+from utils import check_type
+from utils.latency_histogram import LatencyHistogram
+from yolo.files import Files
+from yolo.inference_backend import InferenceBackend
+
+
+class OnnxRuntime(InferenceBackend):
+    """
+    Class to handle ONNX Runtime inference on the CPU, with the same interface as the Hailo handler.
+
+    It runs the ONNX exports of the YOLO models, so the detection pipeline can be profiled without the accelerator.
+    """
+    # Logger configuration
+    LOG_TAG = "OnnxRuntime"
+
+    # Execution providers
+    PROVIDERS = ['CPUExecutionProvider']
+
+    # Time to wait for an image before checking the stop event, in seconds
+    INPUT_TIMEOUT = 0.1
+
+    # Number of completed jobs between the job statistics logs
+    JOB_STATISTICS_PERIOD = 100
+
+    def __init__(self, model_name: str, onnx_file_path: str, logger: Logger = None, input_queue: queue.Queue = None,
+                 put_output_inference_fn=None, score_threshold: float | dict[int, float] = ImageBoundingBoxes.THRESHOLD,
+                 iou_threshold: float = ImageBoundingBoxes.IOU_THRESHOLD, intra_op_num_threads: int = 0):
+        """
+        Initialize the ONNX Runtime handler class.
+
+        Args:
+            model_name (str): Name of the YOLO model.
+            onnx_file_path (str): Path to the ONNX file exported by yolo/export.py.
+            logger (Logger): Logger instance for logging messages. Defaults to None.
+            input_queue (queue.Queue): Input queue for the frame ids and preprocessed images. Defaults to None.
+            put_output_inference_fn: Function called with the model name, the frame id and the inference results.
+                Defaults to None.
+            score_threshold (float | dict[int, float]): Score threshold for filtering detections, or the threshold of
+                each class. Defaults to ImageBoundingBoxes.THRESHOLD.
+            iou_threshold (float): IoU threshold of the non-maximum suppression. Defaults to
+                ImageBoundingBoxes.IOU_THRESHOLD.
+            intra_op_num_threads (int): Number of threads of each operator. Defaults to 0 (ONNX Runtime default).
+        """
+        # Check the type of model name
+        check_type(model_name, str)
+        self.__model_name = model_name
+
+        # Check the ONNX file path
+        check_type(onnx_file_path, str)
+        Files.ensure_directory_exists(onnx_file_path)
+        self.__onnx_file_path = onnx_file_path
+
+        # Check the type of logger
+        check_type(logger, Logger)
+        self.__logger = logger.get_sub_logger(self.LOG_TAG)
+
+        # Check the type of input queue
+        check_type(input_queue, queue.Queue)
+        self.__input_queue = input_queue
+
+        # Set the put output inference function
+        self.__put_output_inference_fn = put_output_inference_fn
+
+        # Check the type of the thresholds
+        check_type(score_threshold, (int, float, dict))
+        check_type(iou_threshold, (int, float))
+        self.__score_threshold = score_threshold
+        self.__iou_threshold = iou_threshold
+
+        # Create the stop event
+        self.__stop_event = Event()
+
+        # Create the inference session
+        check_type(intra_op_num_threads, int)
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = intra_op_num_threads
+        self.__session = onnxruntime.InferenceSession(self.__onnx_file_path, sess_options=session_options,
+                                                      providers=self.PROVIDERS)
+        self.__input_name = self.__session.get_inputs()[0].name
+
+        # Get the model input size, the exports have a static NCHW input
+        _, channels, height, width = self.__session.get_inputs()[0].shape
+        self.__input_shape = (height, width, channels)
+        self.__input_size = (width, height)
+
+        # Preallocate the input tensor
+        self.__input_tensor = np.empty((1, channels, height, width), dtype=np.float32)
+
+        # Initialize the job counters, the latencies and the postprocessing times
+        self.__jobs_lock = Lock()
+        self.__jobs_submitted = 0
+        self.__jobs_completed = 0
+        self.__jobs_failed = 0
+        self.__job_latencies = LatencyHistogram()
+        self.__postprocess_latencies = LatencyHistogram()
+
+    def get_stop_event(self) -> Event:
+        """
+        Get the stop event for the ONNX Runtime handler.
+
+        Returns:
+            Event: The stop event.
+        """
+        return self.__stop_event
+
+    def get_input_shape(self) -> tuple[int, ...]:
+        """
+        Get the shape of the model's input layer.
+
+        Returns:
+            tuple[int, ...]: Height, width and channels of the model's input layer.
+        """
+        return self.__input_shape
+
+    def put_image(self, frame_id: int, preprocessed_image: np.ndarray) -> None:
+        """
+        Put a preprocessed image into the input queue.
+
+        Args:
+            frame_id (int): Id of the frame, it's passed along with the inference results.
+            preprocessed_image (np.ndarray): Preprocessed image to be put into the queue.
+        """
+        # Check the type of frame id and preprocessed image
+        check_type(frame_id, int)
+        check_type(preprocessed_image, np.ndarray)
+
+        # Put the image, dropping the oldest one if the queue is bounded and full
+        self._put_latest(self.__input_queue, (frame_id, preprocessed_image))
+
+    def infer(self, preprocessed_image: np.ndarray) -> ImageBoundingBoxes:
+        """
+        Run the model on a preprocessed image.
+
+        Args:
+            preprocessed_image (np.ndarray): Preprocessed RGB image in HWC format.
+
+        Returns:
+            ImageBoundingBoxes: The detections, normalized by the model input size.
+        """
+        # Convert the image to the NCHW input in [0, 1], without allocating a new tensor
+        np.multiply(preprocessed_image.transpose(2, 0, 1), 1 / 255, out=self.__input_tensor[0], casting='unsafe')
+
+        output = self.__session.run(None, {self.__input_name: self.__input_tensor})[0]
+
+        # Decode the detections, recording the postprocessing time
+        postprocess_start = perf_counter()
+        inference = ImageBoundingBoxes.from_onnx(output, self.__input_size, self.__score_threshold,
+                                                 self.__iou_threshold)
+        with self.__jobs_lock:
+            self.__postprocess_latencies.add(perf_counter() - postprocess_start)
+
+        return inference
+
+    def run(self) -> None:
+        """
+        Run the inference loop.
+
+        This method continuously retrieves images from the input queue, and runs inference on them one at a time.
+        """
+        while not self.__stop_event.is_set():
+            # Get a frame id and its preprocessed image from the input queue
+            try:
+                frame_id, preprocessed_image = self.__input_queue.get(timeout=self.INPUT_TIMEOUT)
+            except queue.Empty:
+                continue
+
+            with self.__jobs_lock:
+                self.__jobs_submitted += 1
+
+            submit_time = perf_counter()
+            try:
+                inference = self.infer(preprocessed_image)
+            except Exception as e:
+                self.__record_job(perf_counter() - submit_time, failed=True)
+                self.__logger.log(f'Inference error: {e}')
+                continue
+            self.__record_job(perf_counter() - submit_time, failed=False)
+
+            self.__put_output_inference_fn(self.__model_name, frame_id, inference)
+
+    def __record_job(self, latency: float, failed: bool) -> None:
+        """
+        Record a completed job, logging the job statistics periodically.
+
+        Args:
+            latency (float): Time to run the job, in seconds.
+            failed (bool): Whether the job failed.
+        """
+        with self.__jobs_lock:
+            self.__jobs_completed += 1
+            if failed:
+                self.__jobs_failed += 1
+            self.__job_latencies.add(latency)
+            log_statistics = self.__jobs_completed % self.JOB_STATISTICS_PERIOD == 0
+
+        # Log
+        if log_statistics:
+            self.__logger.log(f"Job statistics: {self.get_job_statistics()}")
+
+    def get_job_statistics(self) -> dict[str, int | dict[str, float]]:
+        """
+        Get the job counters and the latency percentiles.
+
+        Returns:
+            dict[str, int | dict[str, float]]: In-flight depth, batch size, jobs submitted, completed, failed and in
+            flight, frames completed, and the latency and postprocessing time percentiles in milliseconds of the last
+            completed jobs.
+        """
+        with self.__jobs_lock:
+            return {
+                'in_flight_depth': 1,
+                'batch_size': 1,
+                'jobs_submitted': self.__jobs_submitted,
+                'jobs_completed': self.__jobs_completed,
+                'jobs_failed': self.__jobs_failed,
+                'jobs_in_flight': self.__jobs_submitted - self.__jobs_completed,
+                'frames_completed': self.__jobs_completed,
+                'latency': self.__job_latencies.percentiles(),
+                'postprocess': self.__postprocess_latencies.percentiles(),
+            }
+
+    def start(self) -> None:
+        """
+        Start the ONNX Runtime handler by setting the stop event to False
+        """
+        self.__stop_event.clear()
+        self.__logger.log("ONNX Runtime handler started.")
+
+    def stop(self) -> None:
+        """
+        Stop the ONNX Runtime handler by setting the stop event.
+        """
+        self.__stop_event.set()
+        self.__logger.log("ONNX Runtime handler stopped.")
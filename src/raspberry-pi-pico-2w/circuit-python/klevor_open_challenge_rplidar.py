@@ -6,6 +6,7 @@ import math
 import time
 import digitalio
 import sys
+import struct
 from adafruit_motor import servo
 from adafruit_bno08x.i2c import BNO08X_I2C
 from adafruit_bno08x import (BNO_REPORT_GYROSCOPE, BNO_REPORT_ROTATION_VECTOR)
@@ -38,10 +39,18 @@ PARKING_DELAY = 0.1
 # Difference between the sides is large enough to consider turning
 SIDE_DIFFERENCE_PERCENTAGE = 0.2
 
-# USB CDC headers
-USB_CDC_HEADER_RPLIDAR = "rplidar"
-USB_CDC_HEADER_SEPARATOR = ":"
-USB_CDC_RPLIDAR_CONTENT_SEPARATOR = ","
+# USB CDC RPLIDAR binary frame: sync bytes, sequence number, 360 distances and checksum (little endian uint16)
+USB_CDC_RPLIDAR_FRAME_SYNC = b"\xa5\x5a"
+USB_CDC_RPLIDAR_FRAME_BINS = 360
+USB_CDC_RPLIDAR_FRAME_FORMAT = "<H" + str(USB_CDC_RPLIDAR_FRAME_BINS) + "HH"
+USB_CDC_RPLIDAR_FRAME_BODY_LENGTH = struct.calcsize(USB_CDC_RPLIDAR_FRAME_FORMAT)
+USB_CDC_RPLIDAR_FRAME_CHECKSUM_MODULO = 1 << 16
+
+# USB CDC link health ping and pong messages, the pong echoes the ping content followed by the last RPLIDAR sequence
+# number (-1 if none) and the number of invalid RPLIDAR frames
+USB_CDC_PING_PREFIX = b"ping:"
+USB_CDC_PONG_PREFIX = "pong:"
+USB_CDC_PING_SEPARATOR = ","
 
 # RPLIDAR Data Configuration
 RPLIDAR_MAX_DISTANCE = 3000
@@ -94,6 +103,11 @@ data_port.reset_output_buffer()
 # RPLIDAR distances
 RPLIDAR_DISTANCES = [RPLIDAR_MAX_DISTANCE for i in range(360)]
 
+# RPLIDAR frame body buffer and last sequence number
+rplidar_frame_body = bytearray(USB_CDC_RPLIDAR_FRAME_BODY_LENGTH)
+rplidar_sequence = None
+rplidar_invalid_frames = 0
+
 # ---------- USB CDC Setup ----------
 
 def receive_message() -> str|None:
@@ -105,10 +119,45 @@ def receive_message() -> str|None:
     if data_port.in_waiting > 0:
         return data_port.readline().strip().decode("utf-8")
 
+def decode_rplidar_frame(frame_body) -> bool:
+    """
+    Decode a RPLIDAR frame body and update the distances of the full rotation at once.
+    Args:
+        frame_body (bytearray): The frame without the sync bytes.
+    Returns:
+        bool: True if the frame is valid, False otherwise.
+    """
+    global RPLIDAR_DISTANCES, rplidar_sequence
+
+    # Unpack the whole frame at once
+    values = struct.unpack_from(USB_CDC_RPLIDAR_FRAME_FORMAT, frame_body)
+    sequence = values[0]
+    distances = values[1:-1]
+
+    # Check the checksum
+    if (sequence + sum(distances)) % USB_CDC_RPLIDAR_FRAME_CHECKSUM_MODULO != values[-1]:
+        return False
+
+    # Update the distances, they're already clipped to RPLIDAR_MAX_DISTANCE by the Raspberry Pi
+    RPLIDAR_DISTANCES = distances
+    rplidar_sequence = sequence
+    return True
+
+def send_pong(ping_content: str):
+    """
+    Answer a link health ping with the last RPLIDAR sequence number and the number of invalid RPLIDAR frames.
+    Args:
+        ping_content (str): The content of the ping, echoed back.
+    """
+    sequence = -1 if rplidar_sequence is None else rplidar_sequence
+    send_message(USB_CDC_PONG_PREFIX + USB_CDC_PING_SEPARATOR.join(
+        (ping_content, str(sequence), str(rplidar_invalid_frames))))
+
 async def receive_message_handler():
     """
     Receive messages from the USB CDC data stream in a non-blocking way.
     """
+    global rplidar_invalid_frames
     while True:
         if data_port.in_waiting > 0:
             # Turn on the LED fast to indicate data reception
@@ -118,27 +167,24 @@ async def receive_message_handler():
                 led_pin.value = False
                 time.sleep(RPLIDAR_DISTANCE_TOGGLE_LED_DELAY)
 
-            # Read the message from the data port
-            message = data_port.readline().strip().decode("utf-8")
-            parts = message.split(USB_CDC_HEADER_SEPARATOR)
+            # Check if it's a RPLIDAR binary frame
+            first_byte = data_port.read(1)
+            if first_byte == USB_CDC_RPLIDAR_FRAME_SYNC[:1]:
+                if data_port.read(1) != USB_CDC_RPLIDAR_FRAME_SYNC[1:]:
+                    continue
 
-            # Check if it's a RPLIDAR message
-            if len(parts) < 2:
+                # Read the rest of the frame and decode it
+                if data_port.readinto(rplidar_frame_body) != USB_CDC_RPLIDAR_FRAME_BODY_LENGTH or \
+                        not decode_rplidar_frame(rplidar_frame_body):
+                    rplidar_invalid_frames += 1
                 continue
 
-            if parts[0] == USB_CDC_HEADER_RPLIDAR:
-                rplidar_content = parts[1].split(USB_CDC_RPLIDAR_CONTENT_SEPARATOR)
-                if len(rplidar_content) < 3:
-                    continue
-                
-                # Parse the RPLIDAR content
-                angle = int(float(rplidar_content[0]))
-                distance = int(float(rplidar_content[1]))
-                quality = int(rplidar_content[2])
-
-                # Check the distance and quality
-                if quality > 0 and distance < RPLIDAR_MAX_DISTANCE and 0 <= angle < 360:
-                    RPLIDAR_DISTANCES[angle] = distance
+            # Answer the link health pings, the rest of the text messages are discarded while running
+            line = first_byte + data_port.readline()
+            if line.startswith(USB_CDC_PING_PREFIX):
+                send_pong(line[len(USB_CDC_PING_PREFIX):].strip().decode("utf-8"))
+
+        await asyncio.sleep(0)
 
 def send_message(message: str):
     """
@@ -0,0 +1,231 @@
+import struct
+
+# ---------- CONSTANTS ----------
+
+# Frame layout before COBS encoding (little endian): type id (uint8), payload length (uint16), payload, CRC16 (uint16)
+# It must match the Raspberry Pi one in serial_communication/protocol.py
+FRAME_DELIMITER = 0
+FRAME_DELIMITER_BYTES = b"\x00"
+FRAME_HEADER_FORMAT = "<BH"
+FRAME_HEADER_LENGTH = struct.calcsize(FRAME_HEADER_FORMAT)
+FRAME_CRC_LENGTH = 2
+FRAME_MIN_LENGTH = FRAME_HEADER_LENGTH + FRAME_CRC_LENGTH
+
+# Maximum encoded frame length kept while waiting for the delimiter, larger frames are discarded
+FRAME_MAX_LENGTH = 1024
+
+# CRC16-CCITT initial value and polynomial
+CRC_INITIAL_VALUE = 0xFFFF
+CRC_POLYNOMIAL = 0x1021
+
+# COBS maximum block code
+COBS_MAX_CODE = 0xFF
+
+# Message type ids
+TYPE_STATUS = 1
+TYPE_INFERENCE = 2
+TYPE_RPLIDAR = 3
+TYPE_CAPTURE_IMAGE = 4
+TYPE_DEBUG = 5
+TYPE_ECHO = 6
+TYPE_PING = 7
+TYPE_PONG = 8
+
+# ---------- CRC ----------
+
+def _build_crc_table():
+    """
+    Build the CRC16-CCITT lookup table.
+    Returns:
+        tuple: The 256 entries of the table.
+    """
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ CRC_POLYNOMIAL) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+CRC_TABLE = _build_crc_table()
+
+def crc16(data, length=None) -> int:
+    """
+    Calculate the CRC16-CCITT of the given data.
+    Args:
+        data (bytes|bytearray|memoryview): The data.
+        length (int): Number of bytes to use from the start of the data, all of them if None.
+    Returns:
+        int: The CRC16 value.
+    """
+    crc = CRC_INITIAL_VALUE
+    table = CRC_TABLE
+    for i in range(len(data) if length is None else length):
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ data[i]]
+    return crc
+
+# ---------- COBS ----------
+
+def cobs_decode(data, length, out) -> int:
+    """
+    Decode COBS encoded data into a preallocated buffer.
+    Args:
+        data (bytearray): The encoded data, without the delimiter.
+        length (int): Number of encoded bytes.
+        out (bytearray): Buffer for the decoded data, at least as long as the encoded data.
+    Returns:
+        int: Number of decoded bytes, or -1 if the data is invalid.
+    """
+    i = 0
+    j = 0
+    while i < length:
+        code = data[i]
+        end = i + code
+        if code == 0 or end > length:
+            return -1
+
+        # Copy the block
+        block_length = code - 1
+        out[j:j + block_length] = memoryview(data)[i + 1:end]
+        j += block_length
+        i = end
+
+        # Blocks shorter than the maximum code are followed by a zero byte, except the last one
+        if code < COBS_MAX_CODE and i < length:
+            out[j] = 0
+            j += 1
+    return j
+
+def cobs_encode(data) -> bytearray:
+    """
+    Encode data with COBS.
+    Args:
+        data (bytes|bytearray): The data.
+    Returns:
+        bytearray: The encoded data, without the delimiter.
+    """
+    encoded = bytearray()
+    code_idx = 0
+    encoded.append(0)
+    code = 1
+    for byte in data:
+        if byte != 0:
+            encoded.append(byte)
+            code += 1
+        if byte == 0 or code == COBS_MAX_CODE:
+            encoded[code_idx] = code
+            code_idx = len(encoded)
+            encoded.append(0)
+            code = 1
+    encoded[code_idx] = code
+    return encoded
+
+# ---------- FRAMES ----------
+
+def decode_frame(frame, length):
+    """
+    Check a decoded frame and get its type id and payload.
+    Args:
+        frame (bytearray): The COBS decoded frame.
+        length (int): Number of bytes of the frame.
+    Returns:
+        tuple|None: The type id and a memoryview of the payload, or None if the frame is corrupted.
+    """
+    if length < FRAME_MIN_LENGTH:
+        return None
+
+    # Check the CRC
+    crc_idx = length - FRAME_CRC_LENGTH
+    if crc16(frame, crc_idx) != frame[crc_idx] | (frame[crc_idx + 1] << 8):
+        return None
+
+    # Check the payload length
+    type_id, payload_length = struct.unpack_from(FRAME_HEADER_FORMAT, frame)
+    if payload_length != crc_idx - FRAME_HEADER_LENGTH:
+        return None
+
+    return type_id, memoryview(frame)[FRAME_HEADER_LENGTH:crc_idx]
+
+def encode_frame(type_id, payload) -> bytearray:
+    """
+    Encode a payload as a delimited frame.
+    Args:
+        type_id (int): Message type id.
+        payload (bytes|bytearray): Message payload.
+    Returns:
+        bytearray: The COBS encoded frame followed by the delimiter.
+    """
+    frame = bytearray(struct.pack(FRAME_HEADER_FORMAT, type_id, len(payload)))
+    frame += payload
+    frame += struct.pack("<H", crc16(frame))
+    encoded = cobs_encode(frame)
+    encoded.append(FRAME_DELIMITER)
+    return encoded
+
+class FrameReader:
+    """
+    Read delimited frames from a serial port without allocating a buffer per frame.
+    """
+    def __init__(self, port, max_length=FRAME_MAX_LENGTH):
+        """
+        Initialize the frame reader.
+        Args:
+            port: The serial port, usually usb_cdc.data.
+            max_length (int): Maximum encoded frame length.
+        """
+        self.port = port
+        self.encoded = bytearray(max_length)
+        self.decoded = bytearray(max_length)
+        self.length = 0
+        self.overflow = False
+        self.corrupted_frames = 0
+
+        # Last bytes read from the port and the index of the first one not processed
+        self.chunk = b""
+        self.chunk_idx = 0
+
+    def read(self):
+        """
+        Read the available bytes until a whole frame is received.
+        Returns:
+            tuple|None: The type id and a memoryview of the payload, valid until the next call, or None if no valid
+            frame is available.
+        """
+        while True:
+            # Read all the available bytes at once
+            if self.chunk_idx >= len(self.chunk):
+                waiting = self.port.in_waiting
+                if waiting == 0:
+                    return None
+                self.chunk = self.port.read(waiting)
+                self.chunk_idx = 0
+
+            # Keep the frame bytes until the delimiter
+            end = self.chunk.find(FRAME_DELIMITER_BYTES, self.chunk_idx)
+            stop = len(self.chunk) if end == -1 else end
+            n = stop - self.chunk_idx
+            if self.length + n <= len(self.encoded):
+                self.encoded[self.length:self.length + n] = self.chunk[self.chunk_idx:stop]
+                self.length += n
+            else:
+                self.overflow = True
+
+            if end == -1:
+                self.chunk_idx = len(self.chunk)
+                continue
+            self.chunk_idx = end + 1
+
+            # Decode the frame
+            length = self.length
+            overflow = self.overflow
+            self.length = 0
+            self.overflow = False
+            if length == 0:
+                continue
+
+            decoded_length = -1 if overflow else cobs_decode(self.encoded, length, self.decoded)
+            frame = decode_frame(self.decoded, decoded_length) if decoded_length >= 0 else None
+            if frame is None:
+                self.corrupted_frames += 1
+                continue
+            return frame